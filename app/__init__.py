@@ -1,8 +1,10 @@
 from app.database import start_the_database
 from flask import Flask,request
 from flask_restful import Api
-from config import conf,loger
+from config import conf,loger,conf_model
 from app.api.v1.routes import routes as routes_v1
+from app.core.classify.hot_reload import model_reloader
+from app.core.classify.warmup import warmup
 
 def create_the_application():
     app = Flask(__name__)
@@ -34,4 +36,11 @@ def create_the_application():
     """Configuras as rotas da aplicação"""
     routes_v1.created_routes(api_v1)
 
+    """Aquece TensorFlow e modelos em segundo plano, sem atrasar a abertura da porta"""
+    if conf_model.get('serving.preload', True):
+        warmup.start(app)
+
+    """Acompanha a publicação de novas versões de modelos"""
+    model_reloader.start()
+
     return app
\ No newline at end of file
@@ -1,41 +1,104 @@
-import os
+import sys
 from app.api.v1.utils.identify_relationship import ClassifyRelationship
 from app.api.v1.utils.request_validators import RequestValidator
-from flask import jsonify, make_response, request
+from flask import current_app, jsonify, make_response, request
 from flask_restful import Resource
-from app.core.classify.classify import classifier
-from app.core.trainer.train_intention import TrainingIntentionPipeline
-from app.core.classify.classify_intention import classifier_intention
-from app.core.trainer.training import TrainingIntentionManangerPipeline, TrainingManangerPipeline
+from app.core.classify.classify import classifier_batch, domain_registry
+from app.core.classify.hot_reload import model_reloader
+from app.core.classify.metrics import ERRORS, metrics, stage_timer
+from app.core.classify.profiling import request_profiler
+from app.core.classify.classify_intention import classifier_intention, classifier_intention_batch, loaded_intention_bundle
+from app.core.classify.warmup import warmup
+from app.core.model.versioning import INTENTION_SLOT, existing_domain_slot, rollback_version
 from config import conf_model
-from app.core.trainer.train import TrainingPipeline
-from app.api.v1.utils.split import split_message,remove_duplicate_dicts
+from app.core.trainer.jobs import TrainingJob, training_jobs
+from app.api.v1.utils.split import split_messages,remove_duplicate_dicts
 
-class ChatTrainerManager(Resource):
-    def get(self):
-        
-        """ Treinamento do modelo de Intenções"""
-        pipeline_intention = TrainingIntentionManangerPipeline()
-        pipeline_intention.run()
+# Os pipelines de treinamento (TensorFlow, scikit-learn) são importados apenas quando um treinamento roda
 
-        """ Treinamento do modelo de classificação"""
-        pipeline_main = TrainingManangerPipeline()
-        pipeline_main.run()
+def run_core_training(job, force=False):
+    from app.core.trainer.training import TrainingIntentionManangerPipeline, TrainingManangerPipeline
 
-        """ Gera os arquivos de relacionamento das entidades"""
-        pipeline_relationship = ClassifyRelationship(['training'])
-        pipeline_relationship.generate_entity_relationship()
-        
-        return {"message": "Treinamento concluído!"}
+    """ Treinamento do modelo de Intenções"""
+    pipeline_intention = TrainingIntentionManangerPipeline()
+    pipeline_intention.run(job, force)
+
+    """ Treinamento do modelo de classificação (apenas os domínios alterados, salvo com force)"""
+    pipeline_main = TrainingManangerPipeline()
+    pipeline_main.run(job, force)
+    model_reloader.reload_async()
+
+    """ Gera os arquivos de relacionamento das entidades"""
+    job.set_stage('relationship')
+    pipeline_relationship = ClassifyRelationship(['training'])
+    pipeline_relationship.generate_entity_relationship(force)
+    pipeline_relationship.compile_entity_paths()
+
+    return {"message": "Treinamento concluído!"}
+
+def run_intention_training(job, force=False):
+    from app.core.trainer.train_intention import TrainingIntentionPipeline
+
+    """ Busca dados para treinamento"""
+    pipeline = TrainingIntentionPipeline()
+    pipeline.run(job, force)
+    model_reloader.reload_async()
+
+    return {"message": "Treinamento concluído!"}
+
+def run_object_training(job, object, force=False):
+    from app.core.trainer.train import TrainingPipeline
+
+    training = TrainingPipeline()
+    training.run(object, job, force)
+    model_reloader.reload_async()
+
+    job.set_stage('relationship')
+    classify_relation = ClassifyRelationship(['training'])
+    classify_relation.generate_entity_relationship(force)
+    classify_relation.compile_entity_paths()
+
+    return object
+
+def submit_training(kind, target, params=None):
+    """
+    Envia o treinamento para a fila de jobs em segundo plano.
+    Com ?wait=true aguarda o término (até training_jobs.wait_timeout_seconds) e responde como a
+    execução síncrona; se o prazo expirar, responde 202 com o job_id, como sem o wait.
+    """
+    try:
+        job = training_jobs.submit(kind, target, params, app=current_app._get_current_object())
+    except RuntimeError as e:
+        return {"error": str(e)}, 429
+
+    if request.args.get('wait', 'false').lower() == 'true':
+        job.wait(float(conf_model.get('training_jobs.wait_timeout_seconds', 600)))
+        if job.status == TrainingJob.COMPLETED:
+            return job.result, 200
+        if job.finished:
+            return {"error": job.error or f"Treinamento {job.status}", "job_id": job.id}, 500
+
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"{request.script_root}/api/v1/chat/train/jobs/{job.id}"
+    }, 202
+
+def force_requested():
+    """?force=true retreina tudo, ignorando os fingerprints dos treinamentos anteriores."""
+    return request.args.get('force', 'false').lower() == 'true'
+
+class ChatTrainerManager(Resource):
+    def get(self):
+        force = force_requested()
+        return submit_training('core', lambda job: run_core_training(job, force), {'force': force})
 
 class ChatTrainerIntentionResource(Resource):
+    method_decorators = [request_profiler.wrap]
+
     def get(self):
-        
-        """ Busca dados para treinamento"""
-        pipeline = TrainingIntentionPipeline()
-        pipeline.run()
-    
-        return {"message": "Treinamento concluído!"}
+        force = force_requested()
+        return submit_training('intention', lambda job: run_intention_training(job, force), {'force': force})
     
     def post(self):
         """Realiza validação da estrutura do JSON recebido"""
@@ -59,11 +122,60 @@ class ChatTrainerIntentionResource(Resource):
 
             result = classifier_intention(message,conf_model.get('processing.cleaning'))
             print(result)
-            response = make_response(jsonify(result), 200)  # Código 200 ou outro status apropriado
-            response.headers["Content-Type"] = "application/json"
+            with stage_timer('serialization'):
+                response = make_response(jsonify(result), 200)  # Código 200 ou outro status apropriado
+                response.headers["Content-Type"] = "application/json"
             return response
         
         except Exception as e:
+            ERRORS.labels('request').inc()
+            error_response = {
+                "error": f"Erro no processamento da requisição: {str(e)}"
+            }
+            return jsonify(error_response), 500
+
+class ChatTrainerIntentionBatchResource(Resource):
+    method_decorators = [request_profiler.wrap]
+
+    def post(self):
+        """Realiza validação da estrutura do JSON recebido"""
+        validation_error = RequestValidator.validate_json_request()
+        if validation_error:
+            return validation_error
+
+        try:
+            data = request.get_json()
+
+            """Realiza validação dos campos obrigatórios"""
+            required_fields = [
+                {'name': 'messages', 'type': list, 'item_type': str}
+            ]
+
+            field_validation_error = RequestValidator.validate_required_fields(data, required_fields)
+            if field_validation_error:
+                return field_validation_error
+
+            messages = data['messages']
+
+            max_messages = conf_model.get('serving.batch.max_messages', 10000)
+            if len(messages) > max_messages:
+                return {"error": f"O campo 'messages' aceita no máximo {max_messages} mensagens."}, 400
+
+            results = classifier_intention_batch(
+                messages,
+                conf_model.get('processing.cleaning'),
+                batch_size=conf_model.get('serving.batch.predict_batch_size', 256)
+            )
+            if isinstance(results, dict):
+                return results, 500
+
+            with stage_timer('serialization'):
+                response = make_response(jsonify(results), 200)
+                response.headers["Content-Type"] = "application/json"
+            return response
+
+        except Exception as e:
+            ERRORS.labels('request').inc()
             error_response = {
                 "error": f"Erro no processamento da requisição: {str(e)}"
             }
@@ -93,15 +205,10 @@ class ChatTrainerResource(Resource):
             
             object = data['object']
 
-            training = TrainingPipeline()
-            training.run(object)
-
-            classify_relation = ClassifyRelationship(['training'])
-            classify_relation.generate_entity_relationship()
-
-            response = make_response(jsonify(object), 200) 
-            response.headers["Content-Type"] = "application/json"
-            return response
+            force = force_requested()
+            return submit_training(
+                'object', lambda job: run_object_training(job, object, force), {'object': object, 'force': force}
+            )
         
         except Exception as e:
             error_response = {
@@ -110,6 +217,8 @@ class ChatTrainerResource(Resource):
             return jsonify(error_response), 500
 
 class ChatTrainerDomainResource(Resource):
+    method_decorators = [request_profiler.wrap]
+
     def post(self):
         """Realiza validação da estrutura do JSON recebido"""
         validation_error = RequestValidator.validate_json_request()
@@ -129,55 +238,148 @@ class ChatTrainerDomainResource(Resource):
                 return field_validation_error
             
             message = data['message']
-            validation_entities = []
+            cleaning_config = conf_model.get('processing.cleaning')
 
-            sub_messages = split_message(message)
-            for idx, sub_msg in enumerate(sub_messages):
-                result = classifier_intention(sub_msg,conf_model.get('processing.cleaning'))
+            """Etapa 1: classifica a intenção de todas as sub-mensagens em um único lote"""
+            sub_messages = split_messages([message])[0]
+            intention_results = classifier_intention_batch(sub_messages, cleaning_config)
+            if isinstance(intention_results, dict):
+                return intention_results, 500
 
-                classify_relation = ClassifyRelationship(result['entities'])
-                response_identify= classify_relation.run_relationship_processing()
-                string_intention = 'search' if result['intention'] == 'BUSCAR_DADO' else 'doubt'
-                validation_entities.append(response_identify)
-                validation_entities[idx]['shot_message'] = sub_msg
-                validation_entities[idx]['string_intention'] = string_intention
+            """Etapa 2: resolve o relacionamento das entidades de cada sub-mensagem"""
+            with stage_timer('relationship'):
+                classify_relation = ClassifyRelationship([])
+                validation_entities = []
+                for sub_msg, result in zip(sub_messages, intention_results):
+                    response_identify = classify_relation.run_relationship_processing(result['entities'])
+                    response_identify['shot_message'] = sub_msg
+                    response_identify['string_intention'] = 'search' if result['intention'] == 'BUSCAR_DADO' else 'doubt'
+                    validation_entities.append(response_identify)
 
             validation_entities = remove_duplicate_dicts(validation_entities)
-            
+
+            """Etapa 3: agrupa as sub-mensagens pelo modelo de domínio resolvido"""
+            groups = {}
+            for idx, item in enumerate(validation_entities):
+                if not item['success']:
+                    continue
+                domain_path = item['string_intention'] + item['path_rn']
+                groups.setdefault(domain_path, []).append((idx, item['shot_message']))
+
+            """Etapa 4: uma predição em lote por modelo de domínio"""
             trust_scores = {}
-            for item in validation_entities:
-                for chave, valor in item.items():
-                    if chave == 'shot_message':
-                        sub_msg = valor
-                    if chave == 'path_rn':
-                        string_domain = valor
-                    if chave == 'string_intention':
-                        string_intention = valor
-                sub_msg, domains, trust, mlb = classifier(sub_msg,string_intention + string_domain,conf_model.get('processing.cleaning'))
-
-                for domain in domains:
-                    index = list(mlb.classes_).index(domain)  # Localiza o índice da categoria no MultiLabelBinarizer
-                    score = trust[index]  # Associa a confiança correta
-                    
-                    # Atualiza ou adiciona a maior confiança para a categoria
-                    if domain not in trust_scores or trust_scores[domain]['trust'] < score:
-                        trust_scores[idx] = {'domain': domain, 'trust': score, 'short_message': sub_msg}
-
-            response_data = {
-                idx: {
-                    'domain': v['domain'],  # Inclui o domínio, se necessário
-                    'trust': float(v['trust']),
-                    'short_message': v['short_message']
+            for domain_path, group in groups.items():
+                cleaned_messages, predictions, bundle = classifier_batch(
+                    [sub_msg for _, sub_msg in group],
+                    domain_path,
+                    cleaning_config
+                )
+
+                for (idx, _), sub_msg, (domains, trust) in zip(group, cleaned_messages, predictions):
+                    for domain in domains:
+                        score = trust[bundle.class_index[domain]]  # Associa a confiança correta
+
+                        # Mantém a maior confiança de cada sub-mensagem
+                        if idx not in trust_scores or trust_scores[idx]['trust'] < score:
+                            trust_scores[idx] = {'domain': domain, 'trust': score, 'short_message': sub_msg}
+
+            with stage_timer('serialization'):
+                response_data = {
+                    idx: {
+                        'domain': v['domain'],  # Inclui o domínio, se necessário
+                        'trust': float(v['trust']),
+                        'short_message': v['short_message']
+                    }
+                    for idx, (_, v) in enumerate(sorted(trust_scores.items(), key=lambda item: item[0]))
                 }
-                for idx, (_, v) in enumerate(sorted(trust_scores.items(), key=lambda item: item[0]))
-            }
 
-            response = make_response(jsonify(response_data))
-            response.status_code = 200
+                response = make_response(jsonify(response_data))
+                response.status_code = 200
             return response
         
         except Exception as e:
+            ERRORS.labels('request').inc()
             error_response = {
                 "error": f"Erro no processamento da requisição: {str(e)}"
             }
-            return error_response, 500
\ No newline at end of file
+            return error_response, 500
+
+class ChatModelRollbackResource(Resource):
+    def post(self):
+        """Realiza validação da estrutura do JSON recebido"""
+        validation_error = RequestValidator.validate_json_request()
+        if validation_error:
+            return validation_error
+
+        try:
+            data = request.get_json()
+
+            """Realiza validação dos campos obrigatórios"""
+            required_fields = [
+                {'name': 'model', 'type': str}
+            ]
+
+            field_validation_error = RequestValidator.validate_required_fields(data, required_fields)
+            if field_validation_error:
+                return field_validation_error
+
+            """'intention' ou o endereço do domínio (ex.: search/customer/buy)"""
+            model = data['model']
+            slot = INTENTION_SLOT if model == 'intention' else existing_domain_slot(model)
+            if slot is None:
+                return {"error": f"Modelo não encontrado: {model}"}, 404
+
+            version = rollback_version(slot)
+            model_reloader.reload_async()
+
+            return {"model": model, "version": version}, 200
+
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        except Exception as e:
+            error_response = {
+                "error": f"Erro no processamento da requisição: {str(e)}"
+            }
+            return error_response, 500
+
+
+class TrainingJobListResource(Resource):
+    def get(self):
+        return {"jobs": [job.to_dict() for job in training_jobs.list()]}, 200
+
+class TrainingJobResource(Resource):
+    def get(self, job_id):
+        job = training_jobs.get(job_id)
+        if job is None:
+            return {"error": f"Job não encontrado: {job_id}"}, 404
+        return job.to_dict(), 200
+
+    def delete(self, job_id):
+        job = training_jobs.cancel(job_id)
+        if job is None:
+            return {"error": f"Job não encontrado: {job_id}"}, 404
+        return job.to_dict(), 202
+
+class ReadinessResource(Resource):
+    def get(self):
+        """Informa se o serviço já pode receber tráfego e quais modelos estão aquecidos."""
+        bundle = loaded_intention_bundle()
+        ready = warmup.ready
+        body = {
+            "ready": ready,
+            "tensorflow_loaded": 'tensorflow' in sys.modules,
+            "models": {
+                "intention": {"loaded": bundle is not None, "path": bundle.path if bundle is not None else None},
+                "domains": domain_registry.keys(),
+            },
+            "warmup": warmup.to_dict(),
+        }
+        return body, 200 if ready else 503
+
+class MetricsResource(Resource):
+    def get(self):
+        """Métricas de latência por etapa, cargas de modelos, caches e erros no formato texto do Prometheus."""
+        response = make_response(metrics.render(), 200)
+        response.headers["Content-Type"] = "text/plain; version=0.0.4; charset=utf-8"
+        return response
@@ -5,4 +5,10 @@ def created_routes(api):
     api.add_resource(ChatTrainerResource, '/chat/train/')
     api.add_resource(ChatTrainerManager, '/chat/train/core')
     api.add_resource(ChatTrainerIntentionResource, '/chat/train/model/intention')
-    api.add_resource(ChatTrainerDomainResource, '/chat/train/domain/')
\ No newline at end of file
+    api.add_resource(ChatTrainerIntentionBatchResource, '/chat/train/model/intention/batch')
+    api.add_resource(ChatTrainerDomainResource, '/chat/train/domain/')
+    api.add_resource(ChatModelRollbackResource, '/chat/train/rollback')
+    api.add_resource(TrainingJobListResource, '/chat/train/jobs')
+    api.add_resource(TrainingJobResource, '/chat/train/jobs/<string:job_id>')
+    api.add_resource(ReadinessResource, '/ready')
+    api.add_resource(MetricsResource, '/metrics')
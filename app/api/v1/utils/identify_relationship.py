@@ -1,87 +1,79 @@
 import pickle
-import pandas as pd
-from app.database.processing import loads_entity_relationship_training,loads_entity_origins
+from app.core.trainer.fingerprint import read_fingerprint, write_fingerprint
+from app.api.v1.utils.relationship_index import relationship_index, save_relationship_table
+from app.database.processing import loads_entity_questions_training
+from config import conf_model
 
 class ClassifyRelationship:
 
     def __init__(self,entities):
         self.entities = entities
-        self.df = loads_entity_relationship_training()
-        self.data = self.transform_df_to_dictionary()
-        self.translation_df = loads_entity_origins()
-        
-    def transform_df_to_dictionary(self):
-        df_filtered = self.df[['entity', 'weight', 'parent']]
-        result_dict = {}
-
-        for _, row in df_filtered.iterrows():
-            entity = row['entity']
-            weight = row['weight']
-            parent = row['parent']
-
-            # Se a entidade ainda não estiver no dicionário, adicioná-la
-            if entity not in result_dict:
-                result_dict[entity] = {
-                    'weight': weight,
-                    'parents': []
-                }
-            if parent:
-                result_dict[entity]['parents'].append(parent)
+        self.index = relationship_index.get()
 
-        # Remover duplicatas nas listas de dependências
-        for entity in result_dict:
-            result_dict[entity]['parents'] = list(set(result_dict[entity]['parents']))
+    @property
+    def df(self):
+        return self.index.relationship_df
 
-        return result_dict
+    @property
+    def translation_df(self):
+        return self.index.translation_df
 
     def generate_path_to_RN(self):
         """Gera o caminho para a RN com base nas entidades identificadas."""
-        filtered_entities = [entity for entity in self.entities if self.data[entity]["weight"] != 2]
-        ordered_entities = sorted(filtered_entities, key=lambda e: self.data[e]["weight"])
-        
-        translated_entities = [
-            self.translation_df.loc[self.translation_df["translation"] == entity, "entity"].values[0]
-            for entity in ordered_entities
-        ]
-
-        return "/" + "/".join(translated_entities)
+        return self.index.path(self.entities)
     
     def validate_relationship(self):
-        for entity in self.entities:
-            dependencies = self.data[entity]['parents']
-            # Ignora dependências alternativas se pelo menos uma está presente
-            if any(dep in self.entities for dep in dependencies):
-                continue
-            missing = [dep for dep in dependencies if dep not in self.entities]
-            if missing:
-                return False, missing, entity
-        return True, [], ""
+        return self.index.validate(self.entities)
 
-    def run_relationship_processing(self):
-        valid, missing, main_entity = self.validate_relationship()
+    def run_relationship_processing(self, entities=None):
+        if entities is not None:
+            self.entities = entities
 
-        if valid:
-            path = self.generate_path_to_RN()
-            result = {
-                "success": True,
-                "path_rn": path,
-                "entitie": "",
-                "missing": []
-            }
-        else:
-            result = {
-                "success": False,
-                "path_rn": "",
-                "entitie": main_entity,
-                "missing": missing
-            }
+        """Consulta a tabela compilada no treinamento e, se a combinação não estiver nela, resolve ao vivo"""
+        result = self.index.lookup(self.entities)
+        if result is None:
+            result = self.index.resolve(self.entities)
 
         return result
-    def generate_entity_relationship(self):
+
+    def generate_entity_relationship(self, force=False):
+        """Gera os arquivos de relacionamento; não regrava quando os dados não mudaram desde a última geração."""
+        self.index = relationship_index.get(check=True)
+        fingerprint = self.index.fingerprint
+        fingerprint_file = "mod/app/models/saved/entity_relationship.fingerprint.json"
+        if not force and read_fingerprint(fingerprint_file) == fingerprint:
+            return False
+
         if len(self.df) > 0:
             with open("mod/app/models/saved/entity_relationship.pkl", "wb") as f:
                 pickle.dump(self.df, f)
         
         if len(self.translation_df) > 0:
             with open("mod/app/models/saved/entity_translation.pkl", "wb") as f:
-                pickle.dump(self.translation_df, f)
\ No newline at end of file
+                pickle.dump(self.translation_df, f)
+
+        write_fingerprint(fingerprint_file, fingerprint)
+        return True
+
+    def compile_entity_paths(self):
+        """
+        Pré-calcula o resultado (validade, dependências faltantes e path_rn) das combinações de
+        entidades que o modelo de intenções pode emitir, para que o atendimento seja uma única consulta.
+        """
+        self.index = relationship_index.get(check=True)
+
+        questions = loads_entity_questions_training()
+        seen = []
+        if 'entities' in questions.columns:
+            # Mesma normalização dos rótulos do modelo de intenções (a coluna guarda '["a","b"]')
+            seen = [
+                [entity.replace('"', '').replace("'", "").strip().strip('[').strip(']') for entity in entities.split(',')]
+                for entities in questions['entities'].dropna()
+            ]
+
+        table = self.index.compile_table(seen, int(conf_model.get('serving.relationship.enumerate_limit', 12)))
+        save_relationship_table(table, self.index.fingerprint)
+
+        # Faz o próximo atendimento carregar a tabela nova
+        relationship_index.invalidate()
+        return len(table)
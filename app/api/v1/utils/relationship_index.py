@@ -0,0 +1,235 @@
+import pickle
+import threading
+import time
+from itertools import combinations
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+import pandas as pd
+from app.core.trainer.fingerprint import hash_payload, rows_payload
+from app.database.processing import (
+    loads_entity_origins, loads_entity_relationship_signature, loads_entity_relationship_training
+)
+from config import conf_model
+
+RELATIONSHIP_TABLE_FILE = "mod/app/models/saved/entity_paths.pkl"
+
+
+def relationship_fingerprint(relationship_df: pd.DataFrame, translation_df: pd.DataFrame) -> str:
+    """Hash dos dados de relacionamento e tradução; identifica para quais dados uma tabela compilada vale."""
+    return hash_payload(
+        rows_payload(relationship_df, list(relationship_df.columns)),
+        rows_payload(translation_df, list(translation_df.columns))
+    )
+
+
+class RelationshipIndex:
+    """
+    Índice imutável do grafo de relacionamento das entidades.
+
+    Cada entidade recebe um id inteiro; os pesos ficam em uma tupla indexada pelo id e os pais
+    de cada entidade em um bitset (int), de modo que validar e montar o caminho de uma lista de
+    entidades custa O(entidades), sem consultar o banco nem percorrer DataFrames.
+    """
+
+    def __init__(self, relationship_df: pd.DataFrame, translation_df: pd.DataFrame):
+        self.relationship_df = relationship_df
+        self.translation_df = translation_df
+        self.fingerprint = relationship_fingerprint(relationship_df, translation_df)
+
+        """Resultados pré-compilados no treinamento (frozenset de entidades -> resultado)"""
+        self.table: Dict[FrozenSet[str], dict] = {}
+
+        ids: Dict[str, int] = {}
+        names: List[str] = []
+        weights: List = []
+        parents: List[List[int]] = []
+
+        def intern(name):
+            entity_id = ids.get(name)
+            if entity_id is None:
+                entity_id = ids[name] = len(names)
+                names.append(name)
+                weights.append(None)
+                parents.append([])
+            return entity_id
+
+        known = set()
+        if 'error' in relationship_df.columns:
+            print(f"Relacionamentos indisponíveis: {relationship_df['error'].iloc[0]}")
+        else:
+            for entity, weight, parent in relationship_df[['entity', 'weight', 'parent']].itertuples(index=False, name=None):
+                entity_id = intern(entity)
+                # Mantém o peso da primeira ocorrência da entidade
+                if entity_id not in known:
+                    known.add(entity_id)
+                    weights[entity_id] = weight
+                if parent:
+                    parent_id = intern(parent)
+                    if parent_id not in parents[entity_id]:
+                        parents[entity_id].append(parent_id)
+
+        self.ids = ids
+        self.names = tuple(names)
+        self.weights = tuple(weights)
+        self.known = frozenset(known)
+        self.parent_ids = tuple(tuple(entity_parents) for entity_parents in parents)
+        self.parent_masks = tuple(sum(1 << parent_id for parent_id in entity_parents) for entity_parents in parents)
+
+        # translation -> entity, mantendo a primeira ocorrência como no filtro original
+        self.translation: Dict[str, str] = {}
+        if 'error' in translation_df.columns:
+            print(f"Traduções indisponíveis: {translation_df['error'].iloc[0]}")
+        else:
+            for entity, translation in translation_df[['entity', 'translation']].itertuples(index=False, name=None):
+                self.translation.setdefault(translation, entity)
+
+    def entity_id(self, entity: str) -> int:
+        """Id da entidade; entidades fora do grafo lançam KeyError, como no dicionário original."""
+        entity_id = self.ids.get(entity)
+        if entity_id is None or entity_id not in self.known:
+            raise KeyError(entity)
+        return entity_id
+
+    def validate(self, entities: List[str]) -> Tuple[bool, List[str], str]:
+        """Retorna (válido, dependências faltantes, entidade sem dependência)."""
+        entity_ids = [self.entity_id(entity) for entity in entities]
+        present = 0
+        for entity_id in entity_ids:
+            present |= 1 << entity_id
+
+        for entity, entity_id in zip(entities, entity_ids):
+            mask = self.parent_masks[entity_id]
+            # Ignora dependências alternativas se pelo menos uma está presente
+            if mask and not mask & present:
+                return False, [self.names[parent_id] for parent_id in self.parent_ids[entity_id]], entity
+        return True, [], ""
+
+    def path(self, entities: List[str]) -> str:
+        """Caminho da RN: entidades de peso diferente de 2, ordenadas pelo peso e traduzidas."""
+        weights = self.weights
+        filtered = [(weights[self.entity_id(entity)], entity) for entity in entities]
+        filtered = [item for item in filtered if item[0] != 2]
+        filtered.sort(key=lambda item: item[0])
+        return "/" + "/".join(self.translation[entity] for _, entity in filtered)
+
+    def resolve(self, entities: List[str]) -> dict:
+        """Resolve as entidades consultando o grafo."""
+        valid, missing, main_entity = self.validate(entities)
+
+        if valid:
+            return {
+                "success": True,
+                "path_rn": self.path(entities),
+                "entitie": "",
+                "missing": []
+            }
+        return {
+            "success": False,
+            "path_rn": "",
+            "entitie": main_entity,
+            "missing": missing
+        }
+
+    def lookup(self, entities: List[str]):
+        """
+        Resultado pré-compilado das entidades, ou None.
+        A tabela foi montada com as entidades em ordem alfabética e sem repetição (a ordem emitida
+        pelo modelo de intenções); outras ordens podem mudar o desempate e são resolvidas ao vivo.
+        """
+        if not self.table or any(a >= b for a, b in zip(entities, entities[1:])):
+            return None
+        result = self.table.get(frozenset(entities))
+        if result is None:
+            return None
+        return dict(result, missing=list(result["missing"]))
+
+    def compile_table(self, seen: Iterable[Iterable[str]] = (), enumerate_limit: int = 12) -> Dict[FrozenSet[str], dict]:
+        """
+        Pré-calcula o resultado das combinações de entidades: todas as combinações quando o grafo
+        tem até enumerate_limit entidades, e sempre as combinações vistas nas perguntas de treinamento.
+        """
+        candidates = {frozenset(entities) for entities in seen if entities}
+        names = sorted(self.names[entity_id] for entity_id in self.known)
+        if len(names) <= enumerate_limit:
+            for size in range(1, len(names) + 1):
+                candidates.update(frozenset(group) for group in combinations(names, size))
+
+        table = {}
+        for key in candidates:
+            try:
+                table[key] = self.resolve(sorted(key))
+            except KeyError:
+                # Entidades fora do grafo continuam sendo tratadas pela resolução ao vivo
+                continue
+        return table
+
+    def __len__(self):
+        return len(self.known)
+
+
+def save_relationship_table(table, fingerprint, path=RELATIONSHIP_TABLE_FILE):
+    with open(path, "wb") as f:
+        pickle.dump({"fingerprint": fingerprint, "table": table}, f)
+
+
+def load_relationship_table(fingerprint, path=RELATIONSHIP_TABLE_FILE) -> Dict[FrozenSet[str], dict]:
+    """Carrega a tabela compilada; tabelas geradas a partir de outros dados são ignoradas."""
+    try:
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+        return {}
+    if data.get("fingerprint") != fingerprint:
+        return {}
+    return data.get("table", {})
+
+
+class RelationshipIndexHolder:
+    """
+    Mantém o índice compartilhado pelo processo e o reconstrói quando as tabelas mudam.
+    A assinatura das tabelas é consultada no máximo a cada check_seconds.
+    """
+
+    def __init__(self, check_seconds=30):
+        self.check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self._index = None
+        self._signature = None
+        self._checked_at = 0.0
+
+        """Contadores"""
+        self.builds = 0
+
+    def get(self, check=False) -> RelationshipIndex:
+        requested_at = time.monotonic()
+        index = self._index
+        if index is not None and not check and requested_at - self._checked_at < self.check_seconds:
+            return index
+
+        with self._lock:
+            # Outra thread pode ter verificado as tabelas enquanto esta aguardava o lock
+            if self._index is not None and (
+                self._checked_at >= requested_at
+                or (not check and time.monotonic() - self._checked_at < self.check_seconds)
+            ):
+                return self._index
+
+            checked_at = time.monotonic()
+            signature = loads_entity_relationship_signature()
+            if self._index is None or (signature is not None and signature != self._signature):
+                index = RelationshipIndex(loads_entity_relationship_training(), loads_entity_origins())
+                index.table = load_relationship_table(index.fingerprint)
+                self._index = index
+                self._signature = signature
+                self.builds += 1
+            self._checked_at = checked_at
+            return self._index
+
+    def invalidate(self):
+        with self._lock:
+            self._index = None
+            self._signature = None
+
+
+relationship_index = RelationshipIndexHolder(
+    check_seconds=float(conf_model.get('serving.relationship.check_seconds', 30))
+)
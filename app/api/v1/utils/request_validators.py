@@ -1,8 +1,10 @@
 from flask import request
+from app.core.classify.metrics import timed_stage
 from typing import Tuple, Dict, Any, List
 
 class RequestValidator:
     @staticmethod
+    @timed_stage('validation')
     def validate_json_request() -> Tuple[Dict[str, Any], int]:
         try:
             data = request.get_json(force=False)
@@ -25,6 +27,7 @@ class RequestValidator:
             }, 400
     
     @staticmethod
+    @timed_stage('validation')
     def validate_required_fields(data: dict, required_fields: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], int]:
         """
         Valida se todos os campos obrigatórios estão presentes e são do tipo correto.
@@ -54,6 +57,11 @@ class RequestValidator:
             elif field_type == str:
                 if not isinstance(data[field_name], str):
                     type_errors.append(f"O campo '{field_name}' deve ser uma string.")
+            elif field_type == list:
+                if not isinstance(data[field_name], list):
+                    type_errors.append(f"O campo '{field_name}' deve ser uma lista.")
+                elif 'item_type' in field and not all(isinstance(item, field['item_type']) for item in data[field_name]):
+                    type_errors.append(f"Todos os itens do campo '{field_name}' devem ser do tipo {field['item_type'].__name__}.")
             # Pode adicionar mais tipos conforme necessário
         
         if missing_fields:
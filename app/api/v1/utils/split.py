@@ -1,4 +1,5 @@
 import re
+from config import conf_model
 
 def split_message(message):
     # Expressão regular para dividir o texto após pontuações ou palavras específicas
@@ -10,6 +11,24 @@ def split_message(message):
     
     return final_messages
 
+def split_messages(messages, mode=None, batch_size=None):
+    """
+    Segmenta várias mensagens de uma vez.
+
+    mode 'regex' usa o split_message em cada mensagem; mode 'spacy' encontra as frases com o
+    senter do spaCy em lotes (nlp.pipe) e aplica a divisão por conjunções dentro de cada frase.
+    """
+    mode = mode or conf_model.get('segmentation.mode', 'regex')
+    if mode != 'spacy':
+        return [split_message(message) for message in messages]
+
+    from app.core.data.nlp import shared_spacy
+    batch_size = batch_size or int(conf_model.get('segmentation.batch_size', 64))
+    return [
+        [clause for sentence in sentences for clause in split_message(sentence)]
+        for sentences in shared_spacy.sentences(messages, batch_size=batch_size)
+    ]
+
 def remove_duplicate_dicts(list_of_dicts):
     # Função para converter listas em tuplas dentro do dicionário
     def make_hashable(d):
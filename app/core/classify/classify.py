@@ -1,61 +1,104 @@
+import os
 import pickle
-from tensorflow.keras.models import load_model
-from app.core.data.cleaner import TextCleaner
-
-def classifier(message,domain,config):
-    try:
-
-        # Carrega modelo e componentes
-        model, tokenizer, mlb = load_components(domain)
-        
-        cleaner = TextCleaner(config)
-        message = cleaner.clean_text(message)
-
-        if message:
-            # Processa e classifica
-            domains, trust = predict_domain(
-                message,
-                tokenizer,
-                model,
-                mlb,
-                confidence_threshold=0.6
-            )
-        return message, domains, trust, mlb  # Retorna mlb também
-
-    except Exception as e:
-        return f"\nErro: {str(e)}"
-
-def load_components(domain):
-    try:
-        domain_split = domain.split('/')
-        domain_convert = f'{domain_split[0]}_{domain_split[1]}_{domain_split[2]}'
-
-        # Carrega o modelo
-        model = load_model(f'mod/app/models/saved/{domain}/{domain_convert}_best_model.keras')
-    
-        # Carrega o tokenizer
-        with open(f'mod/app/models/saved/{domain}/{domain_convert}_tokenizer.pkl', 'rb') as f:
-            tokenizer = pickle.load(f)
-        
-        # Carrega o MultiLabelBinarizer
-        with open(f'mod/app/models/saved/{domain}/{domain_convert}_mlb.pkl', 'rb') as f:
-            mlb = pickle.load(f)
-        
-        return model, tokenizer, mlb
-    except Exception as e:
-       print(f"\nErro ao carregar componentes: {str(e)}")
-       return None, None, None
-
-
-def predict_domain(text, tokenizer, model, mlb, confidence_threshold=0.6):
-    
-    sequence = tokenizer.transform([text])
-    
-    predictions = model.predict(sequence, verbose=0)[0]
-
-    selected_domains = [
-        domain for domain, prob in zip(mlb.classes_, predictions)
-        if prob >= 0.6
-    ]
-    
-    return selected_domains, predictions
+import numpy as np
+from typing import Any, Dict, NamedTuple
+from app.core.classify.inference import load_inference_model
+from app.core.classify.metrics import MODEL_LOADS, stage_timer
+from app.core.classify.profiling import touch_model
+from app.core.classify.registry import ModelRegistry
+from app.core.classify.result_cache import artifact_version, domain_result_cache
+from app.core.classify.scheduler import inference_scheduler
+from app.core.data.cleaner import shared_cleaner
+from app.core.model.versioning import domain_slot, resolve_artifact_dir
+from config import conf_model
+
+
+class DomainBundle(NamedTuple):
+    """Componentes de um modelo de domínio com o mapa classe -> índice pré-calculado."""
+    model: Any
+    tokenizer: Any
+    mlb: Any
+    class_index: Dict[str, int]
+    version: float
+    path: str
+
+
+def domain_artifact_dir(domain):
+    """Diretório da versão atual dos artefatos de um domínio."""
+    return resolve_artifact_dir(domain_slot(domain))
+
+def _domain_files(domain):
+    """Retorna os caminhos do modelo, tokenizer e MultiLabelBinarizer da versão atual de um domínio."""
+    domain_split = domain.split('/')
+    domain_convert = f'{domain_split[0]}_{domain_split[1]}_{domain_split[2]}'
+    base = os.path.join(domain_artifact_dir(domain), domain_convert)
+    return f'{base}_best_model.keras', f'{base}_tokenizer.pkl', f'{base}_mlb.pkl'
+
+def _load_components_from_disk(domain):
+    """Desserializa os componentes do domínio e estima o espaço ocupado pelos arquivos."""
+    model_file, tokenizer_file, mlb_file = _domain_files(domain)
+
+    # Carrega o tokenizer
+    with open(tokenizer_file, 'rb') as f:
+        tokenizer = pickle.load(f)
+
+    # Carrega o modelo no modo de inferência configurado
+    model, model_file = load_inference_model(model_file, tokenizer.config['max_length'])
+
+    # Carrega o MultiLabelBinarizer
+    with open(mlb_file, 'rb') as f:
+        mlb = pickle.load(f)
+
+    MODEL_LOADS.labels('domain').inc()
+    class_index = {label: index for index, label in enumerate(mlb.classes_)}
+    version = artifact_version(model_file, tokenizer_file, mlb_file)
+
+    size = sum(os.path.getsize(file) for file in (model_file, tokenizer_file, mlb_file))
+    return DomainBundle(model, tokenizer, mlb, class_index, version, os.path.dirname(model_file)), size
+
+domain_registry = ModelRegistry(
+    loader=_load_components_from_disk,
+    memory_budget_bytes=int(conf_model.get('serving.registry.memory_budget_mb', 512)) * 1024 * 1024
+)
+
+def get_domain_bundle(domain):
+    """Retorna o DomainBundle do domínio a partir do registro de modelos."""
+    return domain_registry.get(domain)
+
+def classifier_batch(messages, domain, config, confidence_threshold=0.6):
+    """
+    Classifica várias mensagens do mesmo domínio com uma única predição.
+
+    Returns:
+        tuple: (mensagens limpas, lista de (domínios selecionados, confianças) por mensagem, DomainBundle)
+    """
+    bundle = get_domain_bundle(domain)
+    touch_model(domain, bundle.path)
+
+    with stage_timer('cleaning'):
+        cleaner = shared_cleaner(config)
+        cleaned_messages = cleaner.clean_many(messages).tolist()
+
+    # Consulta o cache pelo texto normalizado e pela versão do modelo
+    results = [domain_result_cache.get((domain, bundle.version, cleaned)) for cleaned in cleaned_messages]
+    missing = [idx for idx, result in enumerate(results) if result is None]
+
+    if missing:
+        # Prediz apenas os textos distintos que não estão no cache
+        pending_texts = list(dict.fromkeys(cleaned_messages[idx] for idx in missing))
+        with stage_timer('tokenization'):
+            sequences = bundle.tokenizer.transform(pending_texts)
+        with stage_timer('domain_inference'):
+            predictions = np.asarray(inference_scheduler.predict(domain, bundle.model, sequences))
+
+        labels = np.asarray(bundle.mlb.classes_, dtype=object)
+        selected = predictions >= confidence_threshold
+
+        decoded = {}
+        for row, cleaned in enumerate(pending_texts):
+            decoded[cleaned] = (labels[selected[row]].tolist(), predictions[row])
+            domain_result_cache.put((domain, bundle.version, cleaned), decoded[cleaned])
+        for idx in missing:
+            results[idx] = decoded[cleaned_messages[idx]]
+
+    return cleaned_messages, results, bundle
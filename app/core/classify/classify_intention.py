@@ -1,91 +1,238 @@
+import os
 import pickle
+import threading
 import numpy as np
-from tensorflow.keras.models import load_model
-from app.core.data.cleaner import TextCleaner
+from typing import Any, NamedTuple
+from app.core.classify.inference import load_inference_model
+from app.core.classify.metrics import ERRORS, MODEL_LOADS, stage_timer
+from app.core.classify.profiling import touch_model
+from app.core.classify.result_cache import artifact_version, intention_result_cache
+from app.core.classify.scheduler import inference_scheduler
+from app.core.data.cleaner import shared_cleaner
+from app.core.model.versioning import INTENTION_SLOT, MODELS_ROOT, resolve_artifact_dir
+
+
+class IntentionBundle(NamedTuple):
+    """Componentes imutáveis do modelo de intenções, compartilhados entre as requisições."""
+    model: Any
+    tokenizer: Any
+    mlb: Any
+    intention_encoder: Any
+    object_encoder: Any
+    intention_labels: np.ndarray
+    object_labels: np.ndarray
+    entity_labels: np.ndarray
+    version: float
+    path: str
+
+
+_bundle = None
+_bundle_lock = threading.Lock()
 
 
 def classifier_intention(message, config):
     """
     Classifica uma mensagem com base no modelo treinado, com prints para debug.
     """
-    model, tokenizer, mlb, intention_encoder, object_encoder = load_components()
+    results = classifier_intention_batch([message], config)
+    if isinstance(results, dict):
+        return results
+    return results[0]
 
-    if not all([model, tokenizer, mlb, intention_encoder, object_encoder]):
+
+def classifier_intention_batch(messages, config, batch_size=None):
+    """
+    Classifica uma lista de mensagens com uma única chamada ao modelo.
+    As mensagens são limpas em lote, tokenizadas em uma única matriz e decodificadas de forma vetorizada.
+    """
+    bundle = get_intention_bundle()
+
+    if bundle is None:
         print("Falha ao carregar os componentes necessários para a classificação.")
         return {"error": "Falha ao carregar os componentes necessários para a classificação."}
 
+    if not messages:
+        return []
+    touch_model('intention', bundle.path)
+
     try:
-        # Limpa e tokeniza a mensagem
-        cleaner = TextCleaner(config)
-        cleaned_message = cleaner.clean_text(message)
-        
-        sequence = tokenizer.transform([cleaned_message])
-
-        # Realiza a predição
-        predictions = model.predict(sequence, verbose=0)
-
-        # Decodifica as previsões
-        # Intenção
-        intention_prediction_index = np.argmax(predictions[0])  # Predição de 'intention'
-        intention_prediction = intention_encoder.inverse_transform([intention_prediction_index])[0]
-        intention_confidence = np.max(predictions[0])  # Confiança da predição de intenção
-
-        # Objeto
-        object_prediction_index = np.argmax(predictions[1])  # Predição de 'object'
-        object_prediction = object_encoder.inverse_transform([object_prediction_index])[0]
-        object_confidence = np.max(predictions[1])  # Confiança da predição de objeto
-
-        # Entidades
-        entities_prediction = [
-            entity.replace('"', '').replace("'", "").strip().strip('[').strip(']')
-            for entity, prob in zip(mlb.classes_, predictions[2][0])
-            if prob >= 0.99999  # Limiar de confiança
-        ]
-        entities_confidence = [
-            float(prob) for prob in predictions[2][0] if prob >= 0.99999
-        ]  # Confiança das entidades
-
-        return {
-            "message": message,
-            "intention": intention_prediction,
-            "intention_confidence": float(intention_confidence),  # Confiança da intenção
-            "object": object_prediction,
-            "object_confidence": float(object_confidence),  # Confiança do objeto
-            "entities": entities_prediction,
-            "entities_confidence": entities_confidence,  # Confiança das entidades
-        }
+        # Limpa as mensagens
+        with stage_timer('cleaning'):
+            cleaner = shared_cleaner(config)
+            cleaned_messages = cleaner.clean_many(messages).tolist()
+
+        # Consulta o cache pelo texto normalizado e pela versão do modelo
+        results = [intention_result_cache.get((bundle.version, cleaned)) for cleaned in cleaned_messages]
+        missing = [idx for idx, result in enumerate(results) if result is None]
+
+        if missing:
+            # Tokeniza e prediz apenas os textos distintos que não estão no cache
+            pending_texts = list(dict.fromkeys(cleaned_messages[idx] for idx in missing))
+            with stage_timer('tokenization'):
+                sequences = bundle.tokenizer.transform(pending_texts)
+
+            # Realiza a predição
+            with stage_timer('intention_inference'):
+                predictions = inference_scheduler.predict('intention', bundle.model, sequences, batch_size=batch_size)
+
+            decoded = dict(zip(pending_texts, decode_intention_predictions(bundle, pending_texts, predictions)))
+            for cleaned, result in decoded.items():
+                intention_result_cache.put((bundle.version, cleaned), result)
+            for idx in missing:
+                results[idx] = decoded[cleaned_messages[idx]]
+
+        return [{**result, "message": message} for message, result in zip(messages, results)]
 
     except Exception as e:
+        ERRORS.labels('intention').inc()
         print(f"Erro durante a classificação: {str(e)}")
         return {"error": f"Erro durante a classificação: {str(e)}"}
 
 
+def decode_intention_predictions(bundle, messages, predictions, entities_threshold=0.99999):
+    """Decodifica as três saídas do modelo (intenção, objeto e entidades) para cada mensagem."""
+    intention_probs, object_probs, entities_probs = (np.asarray(p) for p in predictions)
+    rows = np.arange(len(messages))
+
+    # Intenção
+    intention_indexes = intention_probs.argmax(axis=1)
+    intention_predictions = bundle.intention_labels[intention_indexes]
+    intention_confidences = intention_probs[rows, intention_indexes].astype(float)
+
+    # Objeto
+    object_indexes = object_probs.argmax(axis=1)
+    object_predictions = bundle.object_labels[object_indexes]
+    object_confidences = object_probs[rows, object_indexes].astype(float)
+
+    # Entidades
+    entities_mask = entities_probs >= entities_threshold  # Limiar de confiança
+
+    return [
+        {
+            "message": message,
+            "intention": str(intention_predictions[i]),
+            "intention_confidence": float(intention_confidences[i]),  # Confiança da intenção
+            "object": str(object_predictions[i]),
+            "object_confidence": float(object_confidences[i]),  # Confiança do objeto
+            "entities": bundle.entity_labels[entities_mask[i]].tolist(),
+            "entities_confidence": entities_probs[i][entities_mask[i]].astype(float).tolist(),  # Confiança das entidades
+        }
+        for i, message in enumerate(messages)
+    ]
 
-def load_components():
+
+def get_intention_bundle():
+    """
+    Retorna o pacote de inferência do modelo de intenções, carregando-o apenas uma vez.
+    Falhas de carregamento não são memorizadas, para que um treinamento posterior seja aproveitado.
+    """
+    global _bundle
+    if _bundle is not None:
+        return _bundle
+
+    with _bundle_lock:
+        if _bundle is None:
+            _bundle = _load_bundle()
+    return _bundle
+
+
+def _load_bundle():
+    """Lê os artefatos da versão atual e monta o pacote; retorna None em caso de falha."""
+    path = _intention_dir()
+    components = load_components(path)
+    if not all(component is not None for component in components):
+        return None
+
+    MODEL_LOADS.labels('intention').inc()
+    version = artifact_version(os.path.join(path, "intention_best_model.keras"))
+    return build_intention_bundle(*components, version=version, path=path)
+
+
+def loaded_intention_bundle():
+    """Retorna o pacote já carregado, sem disparar o carregamento."""
+    return _bundle
+
+
+def current_intention_dir():
+    return _intention_dir()
+
+
+def reload_intention_bundle():
+    """
+    Carrega a versão atual do modelo sem interromper o atendimento: o pacote antigo continua
+    servindo até que o novo esteja carregado e aquecido, e então é trocado de uma só vez.
+    """
+    global _bundle
+    new_bundle = _load_bundle()
+    if new_bundle is None:
+        return False
+
+    with _bundle_lock:
+        _bundle = new_bundle
+    intention_result_cache.clear()
+    return True
+
+
+def build_intention_bundle(model, tokenizer, mlb, intention_encoder, object_encoder, version=0.0, path=None):
+    """Monta o pacote com os rótulos pré-calculados para a decodificação por argmax."""
+    entity_labels = np.array([
+        entity.replace('"', '').replace("'", "").strip().strip('[').strip(']')
+        for entity in mlb.classes_
+    ], dtype=object)
+
+    return IntentionBundle(
+        model=model,
+        tokenizer=tokenizer,
+        mlb=mlb,
+        intention_encoder=intention_encoder,
+        object_encoder=object_encoder,
+        intention_labels=np.asarray(intention_encoder.classes_, dtype=object),
+        object_labels=np.asarray(object_encoder.classes_, dtype=object),
+        entity_labels=entity_labels,
+        version=version,
+        path=path,
+    )
+
+
+def preload_intention_model():
+    """Carrega o modelo de intenções antecipadamente, evitando o custo na primeira requisição."""
+    bundle = get_intention_bundle()
+    if bundle is None:
+        print("Modelo de intenções indisponível para pré-carregamento.")
+    return bundle is not None
+
+
+def _intention_dir():
+    """Diretório da versão atual do modelo de intenções (ou o diretório legado)."""
+    return resolve_artifact_dir(INTENTION_SLOT, legacy_dir=MODELS_ROOT)
+
+
+def load_components(path=None):
     """
     Carrega o modelo treinado e seus componentes.
     """
+    path = path or _intention_dir()
     try:
-        # Carrega o modelo
-        model = load_model("mod/app/models/saved/intention_best_model.keras")
-
         # Carrega o tokenizer
-        with open("mod/app/models/saved/intention_tokenizer.pkl", "rb") as f:
+        with open(os.path.join(path, "intention_tokenizer.pkl"), "rb") as f:
             tokenizer = pickle.load(f)
 
+        # Carrega o modelo no modo de inferência configurado
+        model, _ = load_inference_model(os.path.join(path, "intention_best_model.keras"), tokenizer.config['max_length'])
+
         # Carrega o MultiLabelBinarizer
-        with open("mod/app/models/saved/intention_mlb.pkl", "rb") as f:
+        with open(os.path.join(path, "intention_mlb.pkl"), "rb") as f:
             mlb = pickle.load(f)
 
         # Carrega os encoders de intenção e objeto
-        with open("mod/app/models/saved/intention_encoder.pkl", "rb") as f:
+        with open(os.path.join(path, "intention_encoder.pkl"), "rb") as f:
             intention_encoder = pickle.load(f)
 
-        with open("mod/app/models/saved/object_encoder.pkl", "rb") as f:
+        with open(os.path.join(path, "object_encoder.pkl"), "rb") as f:
             object_encoder = pickle.load(f)
 
         return model, tokenizer, mlb, intention_encoder, object_encoder
 
     except Exception as e:
         print(f"Erro ao carregar componentes: {str(e)}")
-        return None, None, None, None, None
\ No newline at end of file
+        return None, None, None, None, None
@@ -0,0 +1,73 @@
+import threading
+import time
+from app.core.classify.classify import domain_artifact_dir, domain_registry
+from app.core.classify.classify_intention import current_intention_dir, loaded_intention_bundle, reload_intention_bundle
+from config import conf_model
+
+
+class ModelReloader:
+    """
+    Mantém os modelos servidos alinhados com o ponteiro CURRENT de cada slot.
+
+    Quando um treinamento publica uma nova versão, o modelo é carregado e aquecido em
+    segundo plano e trocado de uma só vez; até lá a versão anterior continua atendendo.
+    """
+
+    def __init__(self, poll_seconds=10):
+        self.poll_seconds = poll_seconds
+        self._lock = threading.Lock()
+        self._thread = None
+
+        """Contadores"""
+        self.reloads = 0
+        self.failures = 0
+
+    def check(self):
+        """Recarrega os modelos carregados cuja versão publicada mudou. Retorna os modelos trocados."""
+        reloaded = []
+        with self._lock:
+            bundle = loaded_intention_bundle()
+            if bundle is not None and bundle.path != current_intention_dir():
+                if reload_intention_bundle():
+                    reloaded.append('intention')
+                else:
+                    self.failures += 1
+
+            for domain in domain_registry.keys():
+                bundle = domain_registry.peek(domain)
+                if bundle is None or bundle.path == domain_artifact_dir(domain):
+                    continue
+                try:
+                    domain_registry.refresh(domain)
+                    reloaded.append(domain)
+                except Exception as e:
+                    self.failures += 1
+                    print(f"Erro ao recarregar o modelo {domain}: {str(e)}")
+
+            self.reloads += len(reloaded)
+
+        if reloaded:
+            print(f"Modelos recarregados: {reloaded}")
+        return reloaded
+
+    def reload_async(self):
+        """Dispara a verificação em segundo plano, sem bloquear a requisição atual."""
+        threading.Thread(target=self.check, name='model-reload', daemon=True).start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.poll_seconds)
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Erro ao verificar novas versões de modelos: {str(e)}")
+
+    def start(self):
+        """Inicia a verificação periódica (desativada quando poll_seconds <= 0)."""
+        if self._thread is not None or not self.poll_seconds or self.poll_seconds <= 0:
+            return
+        self._thread = threading.Thread(target=self._watch, name='model-watcher', daemon=True)
+        self._thread.start()
+
+
+model_reloader = ModelReloader(poll_seconds=float(conf_model.get('serving.reload.poll_seconds', 10)))
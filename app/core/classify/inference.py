@@ -0,0 +1,120 @@
+import os
+import threading
+import numpy as np
+from app.core.model.export import tflite_file_for
+from config import conf_model
+
+# O TensorFlow é importado apenas ao carregar o primeiro modelo, para não atrasar a subida do servidor
+
+
+class InferenceModel:
+    """
+    Envolve um modelo Keras em uma função rastreada com assinatura fixa (None, max_length).
+
+    Evita o custo do model.predict (pipeline tf.data e callbacks) a cada chamada,
+    mantendo a mesma interface predict(inputs, batch_size, verbose).
+    """
+
+    def __init__(self, model, max_length):
+        import tensorflow as tf
+
+        self.keras_model = model
+        self.max_length = max_length
+        self._int32 = tf.int32
+        self._convert = tf.convert_to_tensor
+        self._function = tf.function(
+            lambda inputs: model(inputs, training=False),
+            input_signature=[tf.TensorSpec(shape=(None, max_length), dtype=tf.int32)],
+            reduce_retracing=True
+        )
+        self.warmup()
+
+    def warmup(self):
+        """Executa uma predição vazia para rastrear o grafo no carregamento, e não na primeira requisição."""
+        self.predict(np.zeros((1, self.max_length), dtype=np.int32))
+
+    def _call(self, inputs):
+        outputs = self._function(self._convert(inputs, dtype=self._int32))
+        if isinstance(outputs, (list, tuple)):
+            return [output.numpy() for output in outputs]
+        return outputs.numpy()
+
+    def predict(self, inputs, batch_size=None, verbose=0):
+        inputs = np.asarray(inputs, dtype=np.int32)
+        if not batch_size or len(inputs) <= batch_size:
+            return self._call(inputs)
+
+        # Lotes grandes são processados em blocos para limitar o uso de memória
+        chunks = [self._call(inputs[start:start + batch_size]) for start in range(0, len(inputs), batch_size)]
+        if isinstance(chunks[0], list):
+            return [np.concatenate(parts, axis=0) for parts in zip(*chunks)]
+        return np.concatenate(chunks, axis=0)
+
+
+class TFLiteModel:
+    """
+    Executa um artefato .tflite exportado no treinamento usando o interpretador TFLite em CPU.
+
+    O interpretador não é thread-safe, por isso cada chamada é serializada por um lock.
+    """
+
+    def __init__(self, model_file, max_length, num_threads=None):
+        import tensorflow as tf
+
+        self.model_file = model_file
+        self.max_length = max_length
+        self._interpreter = tf.lite.Interpreter(model_path=model_file, num_threads=num_threads)
+        self._runner = self._interpreter.get_signature_runner()
+        self._input_name = next(iter(self._runner.get_input_details()))
+        self._output_names = sorted(self._runner.get_output_details())
+        self._lock = threading.Lock()
+        self.warmup()
+
+    def warmup(self):
+        self.predict(np.zeros((1, self.max_length), dtype=np.int32))
+
+    def _call(self, inputs):
+        with self._lock:
+            outputs = self._runner(**{self._input_name: inputs})
+        if len(self._output_names) == 1:
+            return outputs[self._output_names[0]]
+        return [outputs[name] for name in self._output_names]
+
+    def predict(self, inputs, batch_size=None, verbose=0):
+        inputs = np.asarray(inputs, dtype=np.int32)
+        if not batch_size or len(inputs) <= batch_size:
+            return self._call(inputs)
+
+        chunks = [self._call(inputs[start:start + batch_size]) for start in range(0, len(inputs), batch_size)]
+        if isinstance(chunks[0], list):
+            return [np.concatenate(parts, axis=0) for parts in zip(*chunks)]
+        return np.concatenate(chunks, axis=0)
+
+
+def prepare_for_inference(model, max_length):
+    """Retorna o modelo no modo de inferência configurado em serving.inference_mode ('direct' ou 'predict')."""
+    if conf_model.get('serving.inference_mode', 'direct') == 'direct':
+        return InferenceModel(model, max_length)
+    return model
+
+
+def load_inference_model(model_file, max_length):
+    """
+    Carrega o modelo para servir conforme serving.inference_mode.
+    No modo 'tflite' usa o artefato exportado, se existir, sem carregar a pilha Keras.
+
+    Returns:
+        tuple: (modelo, arquivo efetivamente carregado)
+    """
+    if conf_model.get('serving.inference_mode', 'direct') == 'tflite':
+        tflite_file = tflite_file_for(model_file)
+        if os.path.exists(tflite_file):
+            return TFLiteModel(tflite_file, max_length, conf_model.get('serving.tflite_threads', None)), tflite_file
+
+    from tensorflow.keras.models import load_model
+
+    if conf_model.get('serving.inference_mode', 'direct') == 'tflite':
+        print(f"Artefato TFLite não encontrado, usando o modelo Keras: {model_file}")
+        return InferenceModel(load_model(model_file), max_length), model_file
+
+    return prepare_for_inference(load_model(model_file), max_length), model_file
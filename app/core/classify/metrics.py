@@ -0,0 +1,314 @@
+import bisect
+import functools
+import threading
+import time
+from typing import Callable, Dict, List, Sequence, Tuple
+from config import conf_model
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Shards:
+    """
+    Vetor de contadores com uma cópia por thread. Cada thread escreve apenas na sua cópia,
+    sem lock; o lock é usado só no primeiro registro da thread e na leitura (scrape).
+    Cópias de threads encerradas são somadas a um acumulado e descartadas.
+    """
+
+    def __init__(self, size):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: List[Tuple[threading.Thread, list]] = []
+        self._retired = [0] * size
+
+    def get(self) -> list:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = [0] * len(self._retired)
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def total(self) -> list:
+        with self._lock:
+            alive = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    alive.append((thread, shard))
+                else:
+                    self._retired = [a + b for a, b in zip(self._retired, shard)]
+            self._shards = alive
+            return [sum(values) for values in zip(self._retired, *(shard for _, shard in alive))]
+
+
+class _CounterChild:
+    def __init__(self, metric):
+        self._metric = metric
+        self._shards = _Shards(1)
+
+    def inc(self, amount=1):
+        if self._metric.enabled:
+            self._shards.get()[0] += amount
+
+    def samples(self, labels):
+        return [('_total', labels, self._shards.total()[0])]
+
+
+class _HistogramChild:
+    def __init__(self, metric):
+        self._metric = metric
+        self._bounds = metric.buckets
+        # [contagem por bucket..., +Inf, soma]
+        self._shards = _Shards(len(self._bounds) + 2)
+
+    def observe(self, value):
+        if self._metric.enabled:
+            shard = self._shards.get()
+            shard[bisect.bisect_left(self._bounds, value)] += 1
+            shard[-1] += value
+
+    def time(self):
+        return _Timer(self)
+
+    def samples(self, labels):
+        total = self._shards.total()
+        samples, cumulative = [], 0
+        for bound, count in zip(self._bounds + (float('inf'),), total[:-1]):
+            cumulative += count
+            samples.append(('_bucket', labels + (('le', _format_value(bound)),), cumulative))
+        samples.append(('_sum', labels, total[-1]))
+        samples.append(('_count', labels, cumulative))
+        return samples
+
+
+class _Timer:
+    """Context manager que registra a duração do bloco no histograma."""
+
+    __slots__ = ('_child', '_start')
+
+    def __init__(self, child):
+        self._child = child
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._child.observe(time.perf_counter() - self._start)
+        return False
+
+
+class _Metric:
+    type = None
+    child_class = None
+
+    def __init__(self, registry, name, help, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.registry.enabled
+
+    @property
+    def family(self):
+        """Nome usado em HELP/TYPE (contadores levam o sufixo _total, como nas amostras)."""
+        return self.name + '_total' if self.type == 'counter' else self.name
+
+    def labels(self, *values):
+        """Retorna a série dos valores de rótulo informados, criando-a na primeira vez."""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self.child_class(self)
+        return child
+
+    def collect(self):
+        with self._lock:
+            children = list(self._children.items())
+        samples = []
+        for values, child in children:
+            samples.extend(child.samples(tuple(zip(self.labelnames, values))))
+        return samples
+
+
+class Counter(_Metric):
+    type = 'counter'
+    child_class = _CounterChild
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+
+class Histogram(_Metric):
+    type = 'histogram'
+    child_class = _HistogramChild
+
+    def __init__(self, registry, name, help, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(registry, name, help, labelnames)
+        self.buckets = tuple(sorted(float(bound) for bound in buckets))
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+
+class MetricsRegistry:
+    """
+    Métricas do serviço no formato texto do Prometheus.
+
+    Contadores e histogramas são gravados sem lock no caminho das requisições (uma cópia por
+    thread, somadas no scrape). Estatísticas que os componentes já mantêm (registro de modelos,
+    caches, agendador) são lidas apenas no scrape, por coletores registrados.
+
+    :param enabled: Desligado, as gravações retornam imediatamente.
+    :param buckets: Limites padrão dos histogramas, em segundos.
+    """
+
+    def __init__(self, enabled=True, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], list]] = []
+
+    def counter(self, name, help, labelnames=()) -> Counter:
+        metric = Counter(self, name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help, labelnames=(), buckets=None) -> Histogram:
+        metric = Histogram(self, name, help, labelnames, buckets or self.buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], list]):
+        """
+        Registra uma função chamada no scrape que retorna uma lista de
+        (nome, tipo, ajuda, [(rótulos: dict, valor), ...]).
+        """
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.family} {metric.help}')
+            lines.append(f'# TYPE {metric.family} {metric.type}')
+            for suffix, labels, value in metric.collect():
+                lines.append(f'{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}')
+
+        for collector in self._collectors:
+            try:
+                families = collector()
+            except Exception as e:
+                print(f"Erro ao coletar métricas: {str(e)}")
+                continue
+            for name, type, help, samples in families:
+                lines.append(f'# HELP {name} {help}')
+                lines.append(f'# TYPE {name} {type}')
+                for labels, value in samples:
+                    lines.append(f'{name}{_format_labels(tuple(labels.items()))} {_format_value(value)}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _format_value(value) -> str:
+    return '+Inf' if value == float('inf') else str(value)
+
+
+metrics = MetricsRegistry(
+    enabled=bool(conf_model.get('serving.metrics.enabled', True)),
+    buckets=conf_model.get('serving.metrics.buckets', None) or DEFAULT_BUCKETS
+)
+
+""" Métricas do caminho de classificação"""
+STAGE_SECONDS = metrics.histogram(
+    'chat_stage_duration_seconds', 'Duração de cada etapa do atendimento, em segundos.', ['stage']
+)
+MODEL_LOADS = metrics.counter(
+    'chat_model_loads', 'Modelos carregados do disco (inclui recargas após novos treinamentos).', ['model']
+)
+ERRORS = metrics.counter('chat_errors', 'Erros tratados no atendimento, por etapa.', ['stage'])
+
+
+def stage_timer(stage) -> _Timer:
+    """Mede a duração de um bloco: `with stage_timer('cleaning'): ...`"""
+    return STAGE_SECONDS.labels(stage).time()
+
+
+def timed_stage(stage):
+    """Decorador equivalente ao stage_timer para funções inteiras."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _serving_collector():
+    """Lê os contadores já mantidos pelo registro de modelos, caches, agendador e recarregador."""
+    from app.core.classify.classify import domain_registry
+    from app.core.classify.hot_reload import model_reloader
+    from app.core.classify.result_cache import domain_result_cache, intention_result_cache
+    from app.core.classify.scheduler import inference_scheduler
+    from app.database.pool import read_pool
+    from config import loger
+
+    registry = domain_registry.stats()
+    logging_stats = loger.stats()
+    pool = read_pool.stats()
+    caches = {'intention': intention_result_cache.stats(), 'domain': domain_result_cache.stats()}
+    scheduler = inference_scheduler.stats()
+
+    return [
+        ('chat_domain_registry_entries', 'gauge', 'Modelos de domínio carregados em memória.', [({}, registry['entries'])]),
+        ('chat_domain_registry_memory_bytes', 'gauge', 'Memória estimada dos modelos de domínio carregados.',
+         [({}, registry['memory_in_use_bytes'])]),
+        ('chat_domain_registry_hits_total', 'counter', 'Acessos ao registro de modelos já carregados.', [({}, registry['hits'])]),
+        ('chat_domain_registry_misses_total', 'counter', 'Acessos ao registro que exigiram carga.', [({}, registry['misses'])]),
+        ('chat_domain_registry_evictions_total', 'counter', 'Modelos descartados pelo orçamento de memória.',
+         [({}, registry['evictions'])]),
+        ('chat_result_cache_entries', 'gauge', 'Resultados em cache.',
+         [({'cache': name}, stats['entries']) for name, stats in caches.items()]),
+        ('chat_result_cache_hits_total', 'counter', 'Acertos do cache de resultados.',
+         [({'cache': name}, stats['hits']) for name, stats in caches.items()]),
+        ('chat_result_cache_misses_total', 'counter', 'Faltas do cache de resultados.',
+         [({'cache': name}, stats['misses']) for name, stats in caches.items()]),
+        ('chat_result_cache_evictions_total', 'counter', 'Resultados descartados pelo limite do cache.',
+         [({'cache': name}, stats['evictions']) for name, stats in caches.items()]),
+        ('chat_scheduler_queue_depth', 'gauge', 'Requisições aguardando lote no agendador de inferência.',
+         [({'model': name}, stats['queue_depth']) for name, stats in scheduler.items()]),
+        ('chat_scheduler_batches_total', 'counter', 'Lotes executados pelo agendador de inferência.',
+         [({'model': name}, stats['batches']) for name, stats in scheduler.items()]),
+        ('chat_scheduler_rejected_total', 'counter', 'Requisições executadas fora do lote por fila cheia.',
+         [({'model': name}, stats['rejected']) for name, stats in scheduler.items()]),
+        ('chat_model_reloads_total', 'counter', 'Modelos trocados por novas versões publicadas.', [({}, model_reloader.reloads)]),
+        ('chat_model_reload_failures_total', 'counter', 'Falhas ao recarregar novas versões.', [({}, model_reloader.failures)]),
+        ('chat_db_pool_connections', 'gauge', 'Conexões abertas no pool de leitura do banco.', [({}, pool['opened'])]),
+        ('chat_db_pool_acquired_total', 'counter', 'Conexões emprestadas pelo pool de leitura.', [({}, pool['acquired'])]),
+        ('chat_db_pool_waits_total', 'counter', 'Empréstimos que aguardaram uma conexão livre.', [({}, pool['waits'])]),
+    ] + ([
+        ('chat_log_queue_size', 'gauge', 'Registros de log aguardando gravação.', [({}, logging_stats['queue_size'])]),
+        ('chat_log_records_enqueued_total', 'counter', 'Registros de log enfileirados.', [({}, logging_stats['enqueued'])]),
+        ('chat_log_records_dropped_total', 'counter', 'Registros de log descartados com a fila cheia.',
+         [({}, logging_stats['dropped'])]),
+    ] if logging_stats else [])
+
+
+metrics.register_collector(_serving_collector)
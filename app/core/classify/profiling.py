@@ -0,0 +1,214 @@
+import cProfile
+import functools
+import glob
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, Optional
+from flask import request
+from config import conf, conf_model, loger
+
+""" Modelos usados pela requisição em perfilamento (None quando não há perfil ativo)"""
+_touched_models: ContextVar[Optional[Dict[str, str]]] = ContextVar('touched_models', default=None)
+
+
+def touch_model(name, path=None):
+    """Registra o modelo usado pela requisição atual; sem perfil ativo, não faz nada."""
+    models = _touched_models.get()
+    if models is not None:
+        models[name] = path
+
+
+class StackSampler:
+    """
+    Perfilador por amostragem: uma thread lê a pilha da thread da requisição a cada intervalo
+    e acumula as pilhas no formato "collapsed" (uma linha `f1;f2;f3 contagem`, aceito por flamegraph.pl).
+    Tem a mesma interface do cProfile.Profile (enable, disable, dump_stats).
+    """
+
+    def __init__(self, thread_id, interval_ms=1.0):
+        self.thread_id = thread_id
+        self.interval = interval_ms / 1000.0
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def enable(self):
+        self._thread = threading.Thread(target=self._sample, name='profile-sampler', daemon=True)
+        self._thread.start()
+
+    def disable(self):
+        self._stop.set()
+        self._thread.join()
+
+    def dump_stats(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f'{stack} {count}\n')
+
+
+class RequestProfiler:
+    """
+    Perfilamento opcional por requisição, desligado por padrão.
+
+    Com `enabled`, uma requisição é perfilada quando traz o cabeçalho (ex.: X-Profile: 1) ou o
+    parâmetro de consulta (ex.: ?profile=1) configurados, ou quando cai na fração amostrada do
+    tráfego. O valor pode escolher o modo ('cprofile' grava .prof para o pstats; 'sampling' grava
+    pilhas .collapsed). Cada perfil tem um .json ao lado com o id da requisição, o tamanho da
+    mensagem e os modelos usados.
+
+    Um único perfil roda por vez; requisições que chegam enquanto outra é perfilada seguem normalmente.
+
+    :param directory: Diretório dos perfis (padrão: subpasta profiles do diretório de logs).
+    :param max_files: Quantidade máxima de perfis mantidos; os mais antigos são apagados.
+    """
+
+    MODES = ('cprofile', 'sampling')
+
+    def __init__(self, enabled=False, directory=None, header='X-Profile', query='profile', sample_rate=0.0,
+                 mode='cprofile', interval_ms=1.0, max_files=200):
+        self.enabled = enabled
+        self.directory = directory
+        self.header = header
+        self.query = query
+        self.sample_rate = sample_rate
+        self.mode = mode if mode in self.MODES else 'cprofile'
+        self.interval_ms = interval_ms
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    def _requested_mode(self):
+        """Modo pedido pela requisição atual, ou None quando ela não deve ser perfilada."""
+        flag = request.headers.get(self.header) or request.args.get(self.query)
+        if flag is not None:
+            flag = flag.strip().lower()
+            if flag in self.MODES:
+                return flag
+            return self.mode if flag in ('1', 'true', 'yes') else None
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return self.mode
+        return None
+
+    def wrap(self, method):
+        """Decorador para os métodos dos Resources (usado em method_decorators)."""
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return method(*args, **kwargs)
+
+            mode = self._requested_mode()
+            if mode is None or not self._lock.acquire(blocking=False):
+                return method(*args, **kwargs)
+            try:
+                return self._profile(mode, method, args, kwargs)
+            finally:
+                self._lock.release()
+        return wrapper
+
+    def _profile(self, mode, method, args, kwargs):
+        # O id vira parte do nome do arquivo, então apenas caracteres seguros são aceitos
+        request_id = re.sub(r'[^A-Za-z0-9_-]', '', request.headers.get('X-Request-ID', ''))[:64] or uuid.uuid4().hex[:12]
+        models = {}
+        token = _touched_models.set(models)
+
+        profiler = cProfile.Profile() if mode == 'cprofile' else StackSampler(threading.get_ident(), self.interval_ms)
+        start = time.perf_counter()
+        profiler.enable()
+        result = None
+        try:
+            result = method(*args, **kwargs)
+            return result
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - start
+            _touched_models.reset(token)
+            try:
+                self._write(profiler, mode, request_id, elapsed, models, result)
+            except Exception as e:
+                print(f"Erro ao gravar o perfil da requisição: {str(e)}")
+
+    def _write(self, profiler, mode, request_id, elapsed, models, result):
+        os.makedirs(self.directory, exist_ok=True)
+        endpoint = (request.endpoint or 'request').replace('/', '_')
+        base = os.path.join(self.directory, f'{time.strftime("%Y%m%d_%H%M%S")}_{endpoint}_{request_id}')
+
+        profile_file = base + ('.prof' if mode == 'cprofile' else '.collapsed')
+        profiler.dump_stats(profile_file)
+
+        with open(base + '.json', 'w', encoding='utf-8') as f:
+            json.dump({
+                "request_id": request_id,
+                "method": request.method,
+                "path": request.path,
+                "endpoint": request.endpoint,
+                "mode": mode,
+                "status": _status_of(result),
+                "seconds": elapsed,
+                "message_length": _message_length(),
+                "models": models,
+                "profile": os.path.basename(profile_file),
+            }, f, ensure_ascii=False, indent=2)
+
+        loger.log('INFO', f'Perfil da requisição {request_id} gravado em {profile_file}')
+        self._prune()
+
+    def _prune(self):
+        """Mantém apenas os max_files perfis mais recentes (cada perfil tem o arquivo de dados e o .json)."""
+        metadata = sorted(glob.glob(os.path.join(self.directory, '*.json')), key=os.path.getmtime)
+        for file in metadata[:max(len(metadata) - self.max_files, 0)]:
+            for path in glob.glob(os.path.splitext(glob.escape(file))[0] + '.*'):
+                os.remove(path)
+
+
+def _message_length():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return None
+    if isinstance(data.get('message'), str):
+        return len(data['message'])
+    if isinstance(data.get('messages'), list):
+        return sum(len(message) for message in data['messages'] if isinstance(message, str))
+    return None
+
+
+def _status_of(result):
+    """Status da resposta, seja ela um Response, uma tupla (corpo, status) ou apenas o corpo."""
+    if hasattr(result, 'status_code'):
+        return result.status_code
+    if isinstance(result, tuple) and len(result) > 1 and isinstance(result[1], int):
+        return result[1]
+    return 200 if result is not None else 500
+
+
+def _default_directory():
+    return os.path.join(os.path.dirname(conf.get_log_config()['debug_file']), 'profiles')
+
+
+request_profiler = RequestProfiler(
+    enabled=bool(conf_model.get('serving.profiling.enabled', False)),
+    directory=conf_model.get('serving.profiling.directory', None) or _default_directory(),
+    header=conf_model.get('serving.profiling.header', 'X-Profile'),
+    query=conf_model.get('serving.profiling.query', 'profile'),
+    sample_rate=float(conf_model.get('serving.profiling.sample_rate', 0.0)),
+    mode=conf_model.get('serving.profiling.mode', 'cprofile'),
+    interval_ms=float(conf_model.get('serving.profiling.interval_ms', 1.0)),
+    max_files=int(conf_model.get('serving.profiling.max_files', 200))
+)
@@ -0,0 +1,152 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+
+
+class ModelRegistry:
+    """
+    Registro de modelos carregados compartilhado por todo o processo.
+
+    Mantém os componentes já desserializados em memória, indexados por uma chave
+    (por exemplo o caminho do domínio), e descarta os menos usados recentemente
+    quando o orçamento de memória é ultrapassado.
+
+    :param loader: Função que recebe a chave e retorna (componentes, tamanho_em_bytes).
+    :param memory_budget_bytes: Orçamento máximo estimado de memória para os componentes.
+    """
+
+    def __init__(self, loader: Callable[[str], Tuple[Any, int]], memory_budget_bytes: int):
+        self.loader = loader
+        self.memory_budget_bytes = memory_budget_bytes
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self._loading: Dict[str, threading.Lock] = {}
+        self._memory_in_use = 0
+
+        """Gerações: invalidações e recargas durante um carregamento impedem que ele seja inserido"""
+        self._generation = 0
+        self._key_generations: Dict[str, int] = {}
+
+        """Contadores"""
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+        self.load_time_total = 0.0
+
+    def get(self, key: str) -> Any:
+        """Retorna os componentes da chave, carregando-os do disco apenas na primeira vez."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            key_lock = self._loading.setdefault(key, threading.Lock())
+
+        # Apenas uma thread carrega cada chave, as demais aguardam o resultado
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    return entry[0]
+
+                generation = self._generation_of(key)
+
+            try:
+                start = time.perf_counter()
+                components, size = self.loader(key)
+                elapsed = time.perf_counter() - start
+
+                with self._lock:
+                    self.loads += 1
+                    self.load_time_total += elapsed
+                    # Uma invalidação durante a carga torna o resultado obsoleto: ele é usado só por esta chamada
+                    if self._generation_of(key) == generation:
+                        self._entries[key] = (components, size)
+                        self._memory_in_use += size
+                        self._evict()
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+
+        return components
+
+    def _generation_of(self, key):
+        return self._generation, self._key_generations.get(key, 0)
+
+    def _bump(self, key):
+        self._key_generations[key] = self._key_generations.get(key, 0) + 1
+
+    def _evict(self):
+        """Remove as entradas menos usadas até respeitar o orçamento (mantém ao menos uma)."""
+        while self._memory_in_use > self.memory_budget_bytes and len(self._entries) > 1:
+            _, (_, size) = self._entries.popitem(last=False)
+            self._memory_in_use -= size
+            self.evictions += 1
+
+    def refresh(self, key: str) -> Any:
+        """
+        Recarrega a chave em segundo plano: a entrada atual continua servindo enquanto
+        a nova é carregada e só então é substituída.
+        """
+        start = time.perf_counter()
+        components, size = self.loader(key)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.loads += 1
+            self.load_time_total += elapsed
+            self._bump(key)
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._memory_in_use -= old[1]
+            self._entries[key] = (components, size)
+            self._memory_in_use += size
+            self._evict()
+        return components
+
+    def peek(self, key: str) -> Any:
+        """Retorna os componentes já carregados da chave (ou None), sem afetar contadores e ordem LRU."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry is not None else None
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries.keys())
+
+    def invalidate(self, key: str = None):
+        """Descarta uma chave específica ou, se não informada, todo o registro."""
+        with self._lock:
+            if key is None:
+                self._generation += 1
+                self._key_generations.clear()
+                self._entries.clear()
+                self._memory_in_use = 0
+                return
+            self._bump(key)
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._memory_in_use -= entry[1]
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna os contadores de uso do registro."""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "memory_in_use_bytes": self._memory_in_use,
+                "memory_budget_bytes": self.memory_budget_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else 0.0,
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "load_time_total": self.load_time_total,
+                "load_time_avg": self.load_time_total / self.loads if self.loads else 0.0,
+            }
@@ -0,0 +1,102 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+from config import conf_model
+
+_MISSING = object()
+
+
+class ResultCache:
+    """
+    Cache limitado de resultados de classificação, com expiração (TTL) e descarte LRU.
+
+    As chaves devem incluir a versão do modelo e o texto já normalizado pelo TextCleaner,
+    para que mensagens equivalentes reaproveitem o mesmo resultado.
+    """
+
+    def __init__(self, max_entries=10000, ttl_seconds=3600, enabled=True):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+        """Contadores"""
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, default=None) -> Any:
+        if not self.enabled:
+            return default
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Descarta todos os resultados, usado quando novos artefatos são treinados."""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+def artifact_version(*files) -> float:
+    """Versão de um modelo derivada da data de modificação mais recente dos seus artefatos."""
+    return max((os.path.getmtime(file) for file in files if os.path.exists(file)), default=0.0)
+
+
+def _create_cache():
+    return ResultCache(
+        max_entries=int(conf_model.get('serving.result_cache.max_entries', 10000)),
+        ttl_seconds=float(conf_model.get('serving.result_cache.ttl_seconds', 3600)),
+        enabled=conf_model.get('serving.result_cache.enabled', True)
+    )
+
+
+intention_result_cache = _create_cache()
+domain_result_cache = _create_cache()
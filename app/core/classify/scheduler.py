@@ -0,0 +1,209 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Dict
+import numpy as np
+from config import conf_model
+
+
+class _PendingRequest:
+    __slots__ = ('model', 'inputs', 'future')
+
+    def __init__(self, model, inputs):
+        self.model = model
+        self.inputs = inputs
+        self.future = Future()
+
+
+class _ModelQueue:
+    """
+    Fila de um modelo com uma thread que agrupa as requisições pendentes em lotes.
+    A thread termina após idle_seconds sem requisições e a fila é descartada (on_close).
+    """
+
+    def __init__(self, name, max_batch_size, max_wait, max_queue_depth, idle_seconds=300.0, on_close=None):
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_queue_depth = max_queue_depth
+        self.idle_seconds = idle_seconds
+        self.on_close = on_close
+        self.closed = False
+
+        self.condition = threading.Condition()
+        self.pending = deque()
+        self.pending_rows = 0
+
+        """Métricas"""
+        self.requests = 0
+        self.batches = 0
+        self.batched_rows = 0
+        self.max_observed_depth = 0
+        self.rejected = 0
+
+        self.thread = threading.Thread(target=self._run, name=f'inference-{name}', daemon=True)
+        self.thread.start()
+
+    def submit(self, model, inputs):
+        """Enfileira a requisição; retorna None se a fila estiver cheia ou já encerrada."""
+        request = _PendingRequest(model, inputs)
+        with self.condition:
+            if self.closed:
+                return None
+            if len(self.pending) >= self.max_queue_depth:
+                self.rejected += 1
+                return None
+            self.pending.append(request)
+            self.pending_rows += len(inputs)
+            self.requests += 1
+            self.max_observed_depth = max(self.max_observed_depth, len(self.pending))
+            self.condition.notify()
+        return request.future
+
+    def _next_batch(self):
+        """
+        Aguarda o lote encher ou o tempo máximo de espera expirar e retira as requisições da fila.
+        Retorna None quando a fila ficou ociosa por idle_seconds e foi encerrada.
+        """
+        with self.condition:
+            idle_deadline = time.monotonic() + self.idle_seconds
+            while not self.pending:
+                remaining = idle_deadline - time.monotonic()
+                if remaining <= 0:
+                    self.closed = True
+                    return None
+                self.condition.wait(remaining)
+
+            deadline = time.monotonic() + self.max_wait
+            while self.pending_rows < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+
+            # Apenas requisições do mesmo modelo entram no lote (o modelo pode ter sido trocado)
+            model = self.pending[0].model
+            batch, rows = [], 0
+            while self.pending and self.pending[0].model is model:
+                size = len(self.pending[0].inputs)
+                if batch and rows + size > self.max_batch_size:
+                    break
+                request = self.pending.popleft()
+                self.pending_rows -= size
+                batch.append(request)
+                rows += size
+            return model, batch, rows
+
+    def _run(self):
+        while True:
+            next_batch = self._next_batch()
+            if next_batch is None:
+                if self.on_close is not None:
+                    self.on_close(self)
+                return
+
+            model, batch, rows = next_batch
+            try:
+                inputs = np.concatenate([request.inputs for request in batch], axis=0)
+                outputs = model.predict(inputs, batch_size=self.max_batch_size, verbose=0)
+                multi_output = isinstance(outputs, (list, tuple))
+
+                # Devolve a cada requisição apenas as suas linhas
+                offset = 0
+                for request in batch:
+                    size = len(request.inputs)
+                    if multi_output:
+                        request.future.set_result([output[offset:offset + size] for output in outputs])
+                    else:
+                        request.future.set_result(outputs[offset:offset + size])
+                    offset += size
+            except Exception as e:
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+
+            with self.condition:
+                self.batches += 1
+                self.batched_rows += rows
+
+    def stats(self) -> Dict[str, Any]:
+        with self.condition:
+            return {
+                "queue_depth": len(self.pending),
+                "max_queue_depth": self.max_observed_depth,
+                "requests": self.requests,
+                "rejected": self.rejected,
+                "batches": self.batches,
+                "avg_batch_size": self.batched_rows / self.batches if self.batches else 0.0,
+            }
+
+
+class InferenceScheduler:
+    """
+    Agrupa requisições concorrentes de inferência do mesmo modelo em um único lote.
+
+    O lote é executado quando atinge max_batch_size linhas ou quando max_wait_ms expira
+    desde a chegada da primeira requisição. Requisições maiores que o lote, filas cheias
+    ou o agendador desabilitado executam a predição diretamente na thread chamadora.
+
+    Cada modelo tem sua fila e thread, encerradas após idle_seconds sem uso (há um modelo
+    por domínio). A espera pelo resultado do lote é limitada a result_timeout_seconds.
+    """
+
+    def __init__(self, enabled=True, max_batch_size=32, max_wait_ms=5, max_queue_depth=1024, idle_seconds=300.0,
+                 result_timeout_seconds=30.0):
+        self.enabled = enabled
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queue_depth = max_queue_depth
+        self.idle_seconds = idle_seconds
+        self.result_timeout_seconds = result_timeout_seconds
+
+        self._lock = threading.Lock()
+        self._queues: Dict[str, _ModelQueue] = {}
+
+    def _get_queue(self, name):
+        with self._lock:
+            queue = self._queues.get(name)
+            if queue is None or queue.closed:
+                queue = _ModelQueue(
+                    name, self.max_batch_size, self.max_wait, self.max_queue_depth, self.idle_seconds, self._discard
+                )
+                self._queues[name] = queue
+            return queue
+
+    def _discard(self, queue):
+        """Remove a fila encerrada por ociosidade (se ainda for a fila atual do modelo)."""
+        with self._lock:
+            if self._queues.get(queue.name) is queue:
+                del self._queues[queue.name]
+
+    def predict(self, name, model, inputs, batch_size=None):
+        """Executa a predição de `inputs` no modelo identificado por `name`, agrupando com outras threads."""
+        if not self.enabled or len(inputs) >= self.max_batch_size:
+            return model.predict(inputs, batch_size=batch_size, verbose=0)
+
+        future = self._get_queue(name).submit(model, inputs)
+        if future is None:
+            return model.predict(inputs, batch_size=batch_size, verbose=0)
+
+        try:
+            return future.result(timeout=self.result_timeout_seconds)
+        except FutureTimeoutError:
+            raise TimeoutError(f"Lote de inferência do modelo {name} não concluído em {self.result_timeout_seconds}s.")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            queues = dict(self._queues)
+        return {name: queue.stats() for name, queue in queues.items()}
+
+
+inference_scheduler = InferenceScheduler(
+    enabled=conf_model.get('serving.scheduler.enabled', True),
+    max_batch_size=int(conf_model.get('serving.scheduler.max_batch_size', 32)),
+    max_wait_ms=float(conf_model.get('serving.scheduler.max_wait_ms', 5)),
+    max_queue_depth=int(conf_model.get('serving.scheduler.max_queue_depth', 1024)),
+    idle_seconds=float(conf_model.get('serving.scheduler.idle_seconds', 300)),
+    result_timeout_seconds=float(conf_model.get('serving.scheduler.result_timeout_seconds', 30))
+)
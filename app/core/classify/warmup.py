@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict
+from config import conf_model
+
+
+class Warmup:
+    """
+    Aquece em segundo plano, depois que o servidor já está atendendo, tudo o que antes era
+    carregado na importação: TensorFlow, modelo de intenções, modelos de domínio configurados,
+    tabela de sinônimos e índice de relacionamento.
+
+    Cada etapa registra status e duração, expostos pelo endpoint de prontidão.
+    """
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    READY = 'ready'
+    FAILED = 'failed'
+
+    def __init__(self, domains=None):
+        self.domains = list(domains or [])
+        self.steps: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.started_at = None
+        self.finished_at = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _run_step(self, name, action):
+        with self._lock:
+            self.steps[name] = {"status": self.RUNNING, "seconds": None, "error": None}
+        start = time.perf_counter()
+        try:
+            result = action()
+            status = self.READY if result is not False else self.FAILED
+            error = None if result is not False else "indisponível"
+        except Exception as e:
+            status, error = self.FAILED, str(e)
+            print(f"Erro no aquecimento de {name}: {error}")
+        with self._lock:
+            self.steps[name] = {"status": status, "seconds": time.perf_counter() - start, "error": error}
+
+    def _run(self, app):
+        from app.core.classify.classify import get_domain_bundle
+        from app.core.classify.classify_intention import preload_intention_model
+        from app.core.data.cleaner import word_replacement_table
+        from app.api.v1.utils.relationship_index import relationship_index
+
+        self._run_step('tensorflow', lambda: __import__('tensorflow'))
+        self._run_step('intention', preload_intention_model)
+        for domain in self.domains:
+            self._run_step(f'domain:{domain}', lambda domain=domain: get_domain_bundle(domain))
+
+        # Consultas ao banco precisam do contexto da aplicação
+        with app.app_context():
+            self._run_step('synonyms', word_replacement_table.get)
+            self._run_step('relationship', relationship_index.get)
+
+        with self._lock:
+            self.finished_at = time.time()
+
+    def start(self, app):
+        """Dispara o aquecimento em uma thread daemon; retorna imediatamente."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.started_at = time.time()
+            for name in ['tensorflow', 'intention'] + [f'domain:{domain}' for domain in self.domains] + ['synonyms', 'relationship']:
+                self.steps[name] = {"status": self.PENDING, "seconds": None, "error": None}
+            self._thread = threading.Thread(target=self._run, args=(app,), name='warmup', daemon=True)
+            self._thread.start()
+
+    def wait(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def ready(self):
+        """Pronto quando o aquecimento terminou e o modelo de intenções está carregado (ou quando não há aquecimento)."""
+        with self._lock:
+            if self.started_at is None:
+                return True
+            return self.finished_at is not None and self.steps.get('intention', {}).get('status') == self.READY
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "elapsed": ((self.finished_at or time.time()) - self.started_at) if self.started_at else None,
+                "steps": {name: dict(step) for name, step in self.steps.items()},
+            }
+
+
+warmup = Warmup(domains=conf_model.get('serving.warmup.domains', []))
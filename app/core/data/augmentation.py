@@ -2,6 +2,9 @@ import random
 from typing import List, Tuple
 import pandas as pd
 
+""" Versão da expansão: incrementar quando os templates ou a lógica de aumento mudarem"""
+AUGMENTER_VERSION = 1
+
 class DataAugmenterIntention:
     def __init__(self, templates: List[str] = None):
         self.templates = templates or [
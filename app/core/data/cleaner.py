@@ -1,32 +1,138 @@
-from app.database.processing import loads_word_replacements
+from app.database.processing import loads_word_replacements, loads_word_replacements_signature
+from app.core.data.phrases import PhraseReplacer, load_phrase_replacer
+from config import conf_model
 from typing import Dict
+import pandas as pd
+import threading
+import hashlib
+import pickle
 import unicodedata
+import json
+import time
 import re
-import pickle
+
+WORD_REPLACEMENTS_DEFAULT = {
+    # Perguntas
+    'qual': 'qual',
+    'quanto': 'qual',
+    'quais': 'qual',
+    'onde': 'local',
+    'como': 'modo',
+    'quando': 'tempo',
+    'porquê': 'motivo',
+    'por que': 'motivo',
+    'quem': 'pessoa',
+
+    # Verbs and actions
+    'tem': 'existe',
+    'há': 'existe',
+    'possui': 'existe',
+}
+
+""" Versão da limpeza: incrementar sempre que a lógica de limpeza ou de troca de palavras mudar,
+para que os fingerprints dos modelos e as chaves do cache de treinamento sejam refeitos.
+    2 -> chaves dos sinônimos normalizadas como o texto e expressões com várias palavras (trie)"""
+CLEANER_VERSION = 2
+
+""" Artefatos gerados no treinamento: o dicionário de sinônimos e a trie já compilada"""
+WORD_REPLACEMENTS_FILE = "mod/app/models/saved/word_replacements.pkl"
+PHRASE_REPLACER_FILE = "mod/app/models/saved/word_replacements_trie.pkl"
+
+""" Abaixo desse tamanho a limpeza texto a texto é mais rápida que as operações vetorizadas do pandas"""
+VECTORIZE_MIN_ROWS = 64
+
+
+def cleaning_signature() -> Dict[str, object]:
+    """Identifica a limpeza aplicada: versão do código e conteúdo dos sinônimos padrão."""
+    defaults = json.dumps(WORD_REPLACEMENTS_DEFAULT, sort_keys=True, ensure_ascii=False)
+    return {
+        'version': CLEANER_VERSION,
+        'defaults': hashlib.sha256(defaults.encode('utf-8')).hexdigest(),
+    }
+
+
+class WordReplacementTable:
+    """
+    Tabela de sinônimos do banco compartilhada pelo processo.
+
+    A tabela só é recarregada quando sua assinatura (hash do conteúdo) muda;
+    a assinatura é consultada no máximo a cada check_seconds.
+    """
+
+    def __init__(self, check_seconds=30):
+        self.check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self._replacements = None
+        self._signature = None
+        self._checked_at = 0.0
+
+        """Contadores"""
+        self.reloads = 0
+
+    def get(self, check=False) -> Dict[str, str]:
+        """Retorna os sinônimos do banco. Com check=True a assinatura é consultada imediatamente."""
+        requested_at = time.monotonic()
+        replacements = self._replacements
+        if replacements is not None and not check and requested_at - self._checked_at < self.check_seconds:
+            return replacements
+
+        with self._lock:
+            # Outra thread pode ter verificado a tabela enquanto esta aguardava o lock
+            if self._replacements is not None and (
+                self._checked_at >= requested_at
+                or (not check and time.monotonic() - self._checked_at < self.check_seconds)
+            ):
+                return self._replacements
+
+            checked_at = time.monotonic()
+            signature = loads_word_replacements_signature()
+            if self._replacements is None or (signature is not None and signature != self._signature):
+                replacements = loads_word_replacements()
+                # A consulta retorna {"error": ...} quando a tabela está vazia ou indisponível
+                self._replacements = {} if 'error' in replacements else replacements
+                self._signature = signature
+                self.reloads += 1
+            self._checked_at = checked_at
+            return self._replacements
+
+    def invalidate(self):
+        """Força a recarga da tabela na próxima consulta."""
+        with self._lock:
+            self._replacements = None
+            self._signature = None
+
+
+word_replacement_table = WordReplacementTable(
+    check_seconds=float(conf_model.get('serving.cleaner.synonyms_check_seconds', 30))
+)
+
+
+def normalization_key(config: Dict) -> str:
+    """Identifica a normalização das chaves dos sinônimos: configuração de limpeza e versão do código."""
+    return json.dumps({'config': config, 'version': CLEANER_VERSION}, sort_keys=True, default=str)
+
 
 class TextCleaner:
-    def __init__(self, config: Dict):
+    def __init__(self, config: Dict, word_replacements_database: Dict[str, str] = None, replacer: PhraseReplacer = None):
         self.config = config
-        self.word_replacements_default = {
-            # Perguntas
-            'qual': 'qual',
-            'quanto': 'qual',
-            'quais': 'qual',
-            'onde': 'local',
-            'como': 'modo',
-            'quando': 'tempo',
-            'porquê': 'motivo',
-            'por que': 'motivo',
-            'quem': 'pessoa',
-            
-            # Verbs and actions
-            'tem': 'existe',
-            'há': 'existe',
-            'possui': 'existe',
-        }
-        self.word_replacements_database = loads_word_replacements()
+        self.word_replacements_default = WORD_REPLACEMENTS_DEFAULT
+        if word_replacements_database is None:
+            word_replacements_database = word_replacement_table.get(check=True)
+        self.word_replacements_database = word_replacements_database
+
+        """Tabela final montada e compilada uma única vez por instância (ou reaproveitada do treinamento)"""
+        self.word_replacements = {**self.word_replacements_default, **self.word_replacements_database}
+        if replacer is None:
+            replacer = PhraseReplacer(
+                self.word_replacements, key_normalizer=self._prepare_text, normalization=normalization_key(config)
+            )
+        self.replacer = replacer
 
     def clean_text(self, text: str) -> str:
+        return self._normalize_words(self._prepare_text(text))
+
+    def _prepare_text(self, text: str) -> str:
+        """Caixa, acentos e pontuação; aplicado também às chaves dos sinônimos para que casem com o texto limpo."""
         if self.config['lowercase']:
             text = text.lower()
         
@@ -36,7 +142,29 @@ class TextCleaner:
         if self.config['remove_punctuation']:
             text = self._remove_punctuation(text)
 
-        return self._normalize_words(text)
+        return text
+
+    def clean_many(self, texts) -> pd.Series:
+        """
+        Limpa vários textos de uma vez: caixa, acentos e pontuação são tratados com
+        as operações de string do pandas; apenas a troca de palavras é feita texto a texto.
+        Mantém o índice quando recebe uma Series.
+        """
+        series = texts if isinstance(texts, pd.Series) else pd.Series(list(texts), dtype=object)
+        if len(series) < VECTORIZE_MIN_ROWS:
+            return pd.Series([self.clean_text(text) for text in series], index=series.index, dtype=object)
+
+        series = series.astype(str)
+        if self.config['lowercase']:
+            series = series.str.lower()
+
+        if self.config['remove_accents_and_special_characters']:
+            series = series.str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii')
+
+        if self.config['remove_punctuation']:
+            series = series.str.replace(r'[^\w\s]', '', regex=True)
+
+        return series.map(self._normalize_words)
 
     def _remove_accents_and_special_characters(self, text: str) -> str:
         """ Remove todos os acentos e caracteres especiais"""
@@ -46,13 +174,38 @@ class TextCleaner:
         return re.sub(r'[^\w\s]', '', text)
     
     def _normalize_words(self, text: str) -> str:
-        word_replacements = {**self.word_replacements_default,**self.word_replacements_database}
-        words = text.split()
-        return ' '.join(word_replacements.get(word, word) for word in words)
+        """Troca palavras e expressões pela forma canônica (casamento mais longo primeiro)."""
+        return self.replacer.replace(text)
     
     def generate_word_replacements(self):
-        word_replacements = {**self.word_replacements_default,**self.word_replacements_database}
+        """Salva o dicionário de sinônimos e, em arquivo próprio, a trie compilada usada pela inferência."""
+        if len(self.word_replacements) > 0:
+            with open(WORD_REPLACEMENTS_FILE, "wb") as f:
+                pickle.dump(self.word_replacements, f)
+            self.replacer.save(PHRASE_REPLACER_FILE)
+
+
+_shared_cleaners: Dict[str, TextCleaner] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_cleaner(config: Dict) -> TextCleaner:
+    """
+    Retorna o TextCleaner compartilhado para a configuração informada.
+    A instância é refeita apenas quando a tabela de sinônimos do banco muda; nesse caso a trie
+    gravada no treinamento é reaproveitada se tiver sido gerada com os mesmos sinônimos.
+    """
+    replacements = word_replacement_table.get()
+    key = json.dumps(config, sort_keys=True, default=str)
 
-        if len(word_replacements) > 0:
-            with open("mod/app/models/saved/word_replacements.pkl", "wb") as f:
-                pickle.dump(word_replacements, f)
\ No newline at end of file
+    cleaner = _shared_cleaners.get(key)
+    if cleaner is None or cleaner.word_replacements_database is not replacements:
+        with _shared_lock:
+            cleaner = _shared_cleaners.get(key)
+            if cleaner is None or cleaner.word_replacements_database is not replacements:
+                replacer = load_phrase_replacer(
+                    PHRASE_REPLACER_FILE, {**WORD_REPLACEMENTS_DEFAULT, **replacements}, normalization_key(config)
+                )
+                cleaner = TextCleaner(config, replacements, replacer)
+                _shared_cleaners[key] = cleaner
+    return cleaner
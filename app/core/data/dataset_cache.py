@@ -0,0 +1,195 @@
+"""
+Cache em disco dos conjuntos de treinamento já pré-processados.
+
+Cada entrada fica em <raiz>/<chave>/ com:
+
+    manifest.json   -> metadados (linhas, formatos e dtypes das matrizes, data de criação)
+    frame.pkl       -> DataFrame limpo e aumentado
+    <nome>.npy      -> matrizes tokenizadas, lidas com memory-map
+    <nome>.pkl      -> objetos auxiliares (tokenizer, binarizador, rótulos)
+
+A chave é um hash do conteúdo de origem e da configuração de processamento, de modo
+que qualquer alteração gera uma nova entrada e as antigas são descartadas pelo prune.
+O limite é o espaço em disco (há uma entrada de codificação por domínio), e não a quantidade de entradas.
+"""
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+from typing import Any, Dict, NamedTuple, Optional
+import numpy as np
+import pandas as pd
+from config import conf_model
+
+MANIFEST_FILE = 'manifest.json'
+FRAME_FILE = 'frame.pkl'
+
+
+class CachedDataset(NamedTuple):
+    frame: Optional[pd.DataFrame]
+    arrays: Dict[str, np.ndarray]
+    objects: Dict[str, Any]
+    manifest: Dict[str, Any]
+
+
+def frame_key(df: pd.DataFrame, columns, *parts) -> str:
+    """Chave de conteúdo: hash das linhas (independente da ordem) mais as partes serializáveis em JSON."""
+    digest = hashlib.sha256()
+    if df is not None and len(df) > 0:
+        columns = [column for column in columns if column in df.columns]
+        row_hashes = pd.util.hash_pandas_object(df[columns].astype(str), index=False).values
+        digest.update(np.sort(row_hashes).tobytes())
+    digest.update(json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class DatasetCache:
+    """
+    Cache endereçado por conteúdo dos dados de treinamento.
+
+    :param root: Diretório raiz do cache.
+    :param max_bytes: Espaço máximo em disco; as entradas usadas há mais tempo são removidas primeiro.
+    :param max_entries: Limite opcional de entradas (0 desliga).
+    :param enabled: Permite desligar o cache pela configuração.
+    """
+
+    def __init__(self, root, max_bytes=2 * 1024 ** 3, max_entries=0, enabled=True):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.enabled = enabled
+
+    def _entry_dir(self, key):
+        return os.path.join(self.root, key)
+
+    def load(self, key: str) -> Optional[CachedDataset]:
+        """Retorna a entrada da chave, ou None se não existir ou estiver incompleta."""
+        if not self.enabled:
+            return None
+
+        path = self._entry_dir(key)
+        try:
+            with open(os.path.join(path, MANIFEST_FILE), 'r') as f:
+                manifest = json.load(f)
+
+            frame = None
+            if manifest.get('frame'):
+                frame = pd.read_pickle(os.path.join(path, FRAME_FILE))
+
+            arrays = {
+                name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+                for name in manifest.get('arrays', {})
+            }
+
+            objects = {}
+            for name in manifest.get('objects', []):
+                with open(os.path.join(path, f'{name}.pkl'), 'rb') as f:
+                    objects[name] = pickle.load(f)
+        except (FileNotFoundError, ValueError, EOFError, pickle.UnpicklingError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"Entrada de cache {key} inválida, será recriada: {str(e)}")
+            return None
+
+        # Atualiza a data de uso para que o prune descarte primeiro as entradas esquecidas
+        os.utime(os.path.join(path, MANIFEST_FILE))
+        return CachedDataset(frame, arrays, objects, manifest)
+
+    def store(self, key: str, frame=None, arrays=None, objects=None, meta=None):
+        """
+        Grava a entrada em um diretório temporário e o renomeia ao final,
+        para que uma gravação interrompida nunca seja lida como válida.
+        """
+        if not self.enabled:
+            return None
+
+        arrays = arrays or {}
+        objects = objects or {}
+        path = self._entry_dir(key)
+        temporary = f'{path}.{os.getpid()}.tmp'
+
+        try:
+            shutil.rmtree(temporary, ignore_errors=True)
+            os.makedirs(temporary)
+
+            if frame is not None:
+                frame.to_pickle(os.path.join(temporary, FRAME_FILE))
+
+            for name, array in arrays.items():
+                np.save(os.path.join(temporary, f'{name}.npy'), np.ascontiguousarray(array))
+
+            for name, value in objects.items():
+                with open(os.path.join(temporary, f'{name}.pkl'), 'wb') as f:
+                    pickle.dump(value, f)
+
+            manifest = {
+                'key': key,
+                'created_at': time.time(),
+                'bytes': _directory_size(temporary),
+                'frame': frame is not None,
+                'rows': len(frame) if frame is not None else None,
+                'arrays': {name: {'shape': list(np.shape(array)), 'dtype': str(np.asarray(array).dtype)} for name, array in arrays.items()},
+                'objects': list(objects),
+                'meta': meta or {},
+            }
+            with open(os.path.join(temporary, MANIFEST_FILE), 'w') as f:
+                json.dump(manifest, f, default=str)
+
+            shutil.rmtree(path, ignore_errors=True)
+            os.replace(temporary, path)
+        except OSError as e:
+            shutil.rmtree(temporary, ignore_errors=True)
+            print(f"Erro ao gravar o cache de dados {key}: {str(e)}")
+            return None
+
+        self.prune()
+        return path
+
+    def prune(self):
+        """Remove as entradas usadas há mais tempo até respeitar max_bytes e max_entries (mantém ao menos uma)."""
+        if (not self.max_bytes and not self.max_entries) or not os.path.isdir(self.root):
+            return
+
+        entries = []
+        for entry in os.listdir(self.root):
+            manifest = os.path.join(self.root, entry, MANIFEST_FILE)
+            try:
+                with open(manifest, 'r') as f:
+                    size = json.load(f).get('bytes')
+                if size is None:
+                    size = _directory_size(self._entry_dir(entry))
+                entries.append((os.path.getmtime(manifest), entry, size))
+            except (FileNotFoundError, ValueError):
+                continue
+
+        entries.sort()
+        total = sum(size for _, _, size in entries)
+        while len(entries) > 1 and (
+            (self.max_bytes and total > self.max_bytes) or (self.max_entries and len(entries) > self.max_entries)
+        ):
+            _, entry, size = entries.pop(0)
+            shutil.rmtree(self._entry_dir(entry), ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def _directory_size(path) -> int:
+    total = 0
+    for directory, _, files in os.walk(path):
+        for file in files:
+            try:
+                total += os.path.getsize(os.path.join(directory, file))
+            except OSError:
+                pass
+    return total
+
+
+dataset_cache = DatasetCache(
+    root=conf_model.get('training_cache.path', 'mod/app/models/cache/datasets'),
+    max_bytes=int(float(conf_model.get('training_cache.max_size_mb', 2048)) * 1024 * 1024),
+    max_entries=int(conf_model.get('training_cache.max_entries', 0) or 0),
+    enabled=bool(conf_model.get('training_cache.enabled', True))
+)
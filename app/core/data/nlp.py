@@ -0,0 +1,60 @@
+import os
+import threading
+from typing import Iterable, List, Sequence
+from config import conf_model
+
+SPACY_MODEL_PATH = 'mod/app/models/pt_core_news_md-3.8.0'
+
+
+class SharedSpacy:
+    """
+    Pipeline do spaCy compartilhado pelo processo e carregado apenas no primeiro uso.
+
+    Somente os componentes informados são carregados (por padrão apenas o senter, que tem
+    tok2vec próprio); parser, NER e os demais ficam fora, o que reduz o tempo de carga e a memória.
+    """
+
+    def __init__(self, model_path=SPACY_MODEL_PATH, components: Sequence[str] = ('senter',)):
+        self.model_path = model_path
+        self.components = list(components)
+        self._nlp = None
+        self._lock = threading.Lock()
+
+    def _pipeline_names(self):
+        import spacy
+        config = spacy.util.load_config(os.path.join(self.model_path, 'config.cfg'))
+        return list(config['nlp']['pipeline'])
+
+    def get(self):
+        if self._nlp is not None:
+            return self._nlp
+
+        with self._lock:
+            if self._nlp is None:
+                import spacy
+                exclude = [name for name in self._pipeline_names() if name not in self.components]
+                nlp = spacy.load(self.model_path, exclude=exclude)
+                # O senter vem desabilitado nos modelos que também têm parser
+                for name in self.components:
+                    if name in nlp.disabled:
+                        nlp.enable_pipe(name)
+                self._nlp = nlp
+        return self._nlp
+
+    @property
+    def loaded(self):
+        return self._nlp is not None
+
+    def sentences(self, texts: Iterable[str], batch_size=64, n_process=1) -> List[List[str]]:
+        """Segmenta vários textos em frases com nlp.pipe, em lotes."""
+        nlp = self.get()
+        return [
+            [sentence.text.strip() for sentence in doc.sents if sentence.text.strip()]
+            for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+        ]
+
+
+shared_spacy = SharedSpacy(
+    model_path=conf_model.get('segmentation.spacy_model', SPACY_MODEL_PATH),
+    components=conf_model.get('segmentation.components', ['senter'])
+)
@@ -0,0 +1,104 @@
+import pickle
+from typing import Callable, Dict, List, Optional
+
+""" Chave reservada nos nós da trie que guarda a substituição da frase terminada ali"""
+_END = None
+
+
+class PhraseReplacer:
+    """
+    Substituição de palavras e expressões (ex.: 'por que' -> 'motivo') compilada em uma trie de tokens.
+
+    A substituição percorre os tokens uma única vez e, em cada posição, aplica a expressão
+    mais longa que casar; o custo não depende da quantidade de sinônimos cadastrados.
+
+    :param replacements: Dicionário expressão -> substituição; expressões com espaços são permitidas.
+    :param key_normalizer: Função aplicada às expressões antes de compilar, para que fiquem
+                           no mesmo formato do texto já limpo (caixa, acentos e pontuação).
+    :param normalization: Identificação da normalização usada, conferida ao reaproveitar a trie salva.
+    """
+
+    def __init__(self, replacements: Dict[str, str], key_normalizer: Optional[Callable[[str], str]] = None,
+                 normalization: Optional[str] = None):
+        self.source = dict(replacements)
+        self.normalization = normalization
+        self.replacements = {}
+        self.trie = {}
+        self.max_phrase_length = 0
+
+        for phrase, replacement in replacements.items():
+            key = key_normalizer(phrase) if key_normalizer else phrase
+            tokens = key.split()
+            if not tokens:
+                continue
+
+            node = self.trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node[_END] = replacement
+
+            self.replacements[' '.join(tokens)] = replacement
+            self.max_phrase_length = max(self.max_phrase_length, len(tokens))
+
+    def __len__(self):
+        return len(self.replacements)
+
+    def replace_tokens(self, tokens: List[str]) -> List[str]:
+        trie = self.trie
+        output = []
+        position = 0
+        total = len(tokens)
+
+        while position < total:
+            node = trie.get(tokens[position])
+            if node is None:
+                output.append(tokens[position])
+                position += 1
+                continue
+
+            # Avança enquanto houver caminho na trie, guardando o último ponto em que uma expressão terminou
+            match, match_end = node.get(_END), position + 1
+            cursor = position + 1
+            while cursor < total:
+                node = node.get(tokens[cursor])
+                if node is None:
+                    break
+                cursor += 1
+                if _END in node:
+                    match, match_end = node[_END], cursor
+
+            if match is None:
+                output.append(tokens[position])
+                position += 1
+            else:
+                output.append(match)
+                position = match_end
+
+        return output
+
+    def replace(self, text: str) -> str:
+        return ' '.join(self.replace_tokens(text.split()))
+
+    def save(self, path: str):
+        with open(path, 'wb') as f:
+            pickle.dump(self, f)
+
+
+def load_phrase_replacer(path: str, replacements: Dict[str, str], normalization: Optional[str] = None) -> Optional[PhraseReplacer]:
+    """
+    Carrega a trie compilada no treinamento, se ela foi gerada com os mesmos sinônimos e a mesma
+    normalização; caso contrário (ou se o arquivo não existir) retorna None e a trie deve ser montada.
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+    except (FileNotFoundError, EOFError, AttributeError, pickle.UnpicklingError):
+        return None
+
+    if (
+        not isinstance(data, PhraseReplacer)
+        or getattr(data, 'normalization', None) != normalization
+        or getattr(data, 'source', None) != replacements
+    ):
+        return None
+    return data
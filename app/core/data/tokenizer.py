@@ -1,6 +1,10 @@
 from tensorflow.keras.preprocessing.text import Tokenizer
 from tensorflow.keras.preprocessing.sequence import pad_sequences
 
+""" Versão da tokenização e codificação dos rótulos: incrementar quando os tokenizers ou a codificação
+mudarem, para que as matrizes guardadas no cache de treinamento sejam refeitas"""
+ENCODER_VERSION = 1
+
 class TokenizerWrapperIntention:
     def __init__(self, config):
         self.config = config
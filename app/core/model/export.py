@@ -0,0 +1,50 @@
+import os
+
+
+def tflite_file_for(model_file):
+    """Retorna o caminho do artefato TFLite correspondente a um arquivo .keras."""
+    if model_file.endswith('_best_model.keras'):
+        return model_file[:-len('_best_model.keras')] + '_model.tflite'
+    return os.path.splitext(model_file)[0] + '.tflite'
+
+
+def export_tflite_model(model, output_file, max_length, quantization='none'):
+    """Converte um modelo Keras para TFLite, somente inferência; quantization: 'none', 'float16' ou 'dynamic_int8'."""
+    import tensorflow as tf
+
+    function = tf.function(lambda inputs: model(inputs, training=False))
+    concrete_function = function.get_concrete_function(
+        tf.TensorSpec(shape=(None, max_length), dtype=tf.int32, name='inputs')
+    )
+
+    converter = tf.lite.TFLiteConverter.from_concrete_functions([concrete_function], model)
+
+    # Camadas recorrentes (LSTM/GRU com recurrent_dropout) podem exigir operações do TensorFlow
+    converter.target_spec.supported_ops = [
+        tf.lite.OpsSet.TFLITE_BUILTINS,
+        tf.lite.OpsSet.SELECT_TF_OPS
+    ]
+    converter._experimental_lower_tensor_list_ops = False
+
+    if quantization == 'float16':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == 'dynamic_int8':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    elif quantization != 'none':
+        raise ValueError(f"Quantização desconhecida: {quantization}")
+
+    with open(output_file, 'wb') as f:
+        f.write(converter.convert())
+
+    return output_file
+
+
+def export_tflite(model_file, max_length, quantization='none'):
+    """Carrega um arquivo .keras salvo e exporta o artefato TFLite ao lado dele."""
+    from tensorflow.keras.models import load_model
+
+    model = load_model(model_file)
+    output_file = export_tflite_model(model, tflite_file_for(model_file), max_length, quantization)
+    print(f"Modelo TFLite exportado: {output_file}")
+    return output_file
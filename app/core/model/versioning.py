@@ -0,0 +1,139 @@
+"""
+Cada modelo ocupa um "slot" (diretório) com a estrutura:
+
+    <slot>/versions/<versão>/...artefatos...
+    <slot>/CURRENT   -> versão servida
+    <slot>/PREVIOUS  -> versão anterior, usada no rollback
+
+O treinamento escreve sempre em uma versão nova e só então troca o ponteiro CURRENT,
+de forma atômica. Slots sem CURRENT usam os artefatos legados gravados diretamente no diretório.
+"""
+import os
+import shutil
+from datetime import datetime
+
+MODELS_ROOT = 'mod/app/models/saved'
+INTENTION_SLOT = os.path.join(MODELS_ROOT, 'intention')
+
+CURRENT_FILE = 'CURRENT'
+PREVIOUS_FILE = 'PREVIOUS'
+VERSIONS_DIR = 'versions'
+
+
+def domain_slot(domain_address):
+    """Retorna o slot do modelo de um domain_address (ex.: search/customer/buy)."""
+    return os.path.join(MODELS_ROOT, domain_address)
+
+
+def existing_domain_slot(domain_address):
+    """
+    Slot de um domain_address recebido de fora (ex.: pela API).
+    Lança ValueError para caminhos absolutos ou com '..' e retorna None se o slot não existir.
+    """
+    parts = domain_address.replace('\\', '/').split('/')
+    if not domain_address or os.path.isabs(domain_address) or os.path.splitdrive(domain_address)[0] or '..' in parts:
+        raise ValueError(f"Endereço de domínio inválido: {domain_address}")
+
+    root = os.path.realpath(MODELS_ROOT)
+    slot = os.path.realpath(domain_slot(domain_address))
+    if slot == root or os.path.commonpath([root, slot]) != root or not os.path.isdir(slot):
+        return None
+    return domain_slot(domain_address)
+
+
+def _read_pointer(slot, pointer):
+    try:
+        with open(os.path.join(slot, pointer), 'r') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _write_pointer(slot, pointer, version_id):
+    """Grava o ponteiro em um arquivo temporário e o substitui de forma atômica."""
+    target = os.path.join(slot, pointer)
+    temporary = f'{target}.{os.getpid()}.tmp'
+    with open(temporary, 'w') as f:
+        f.write(version_id)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, target)
+
+
+def current_version(slot):
+    """Retorna a versão apontada por CURRENT, ou None se o slot ainda não for versionado."""
+    return _read_pointer(slot, CURRENT_FILE)
+
+
+def previous_version(slot):
+    return _read_pointer(slot, PREVIOUS_FILE)
+
+
+def version_dir(slot, version_id):
+    return os.path.join(slot, VERSIONS_DIR, version_id)
+
+
+def resolve_artifact_dir(slot, legacy_dir=None):
+    """Diretório de onde os artefatos devem ser lidos: a versão atual ou o diretório legado."""
+    version_id = current_version(slot)
+    if version_id:
+        return version_dir(slot, version_id)
+    return legacy_dir or slot
+
+
+def list_versions(slot):
+    """Lista as versões existentes no slot, da mais antiga para a mais recente."""
+    versions_path = os.path.join(slot, VERSIONS_DIR)
+    if not os.path.isdir(versions_path):
+        return []
+    return sorted(entry for entry in os.listdir(versions_path) if os.path.isdir(os.path.join(versions_path, entry)))
+
+
+def create_version_dir(slot):
+    """Cria o diretório de uma nova versão (ainda não publicada) e retorna seu caminho."""
+    version_id = datetime.now().strftime('%Y%m%d%H%M%S%f')
+    path = version_dir(slot, version_id)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def publish_version(path, keep_versions=3):
+    """
+    Publica uma versão criada por create_version_dir trocando o ponteiro CURRENT.
+    A versão anterior é registrada em PREVIOUS e versões antigas além de keep_versions são removidas.
+    """
+    slot = os.path.dirname(os.path.dirname(os.path.normpath(path)))
+    version_id = os.path.basename(os.path.normpath(path))
+
+    old_version = current_version(slot)
+    if old_version and old_version != version_id:
+        _write_pointer(slot, PREVIOUS_FILE, old_version)
+    _write_pointer(slot, CURRENT_FILE, version_id)
+
+    _prune_versions(slot, keep_versions)
+    print(f"Versão publicada: {slot} -> {version_id}")
+    return version_id
+
+
+def rollback_version(slot):
+    """Volta o ponteiro CURRENT para a versão anterior (PREVIOUS), trocando os dois ponteiros."""
+    old_version = previous_version(slot)
+    if not old_version or not os.path.isdir(version_dir(slot, old_version)):
+        raise ValueError(f"Nenhuma versão anterior disponível para rollback em: {slot}")
+
+    active_version = current_version(slot)
+    _write_pointer(slot, CURRENT_FILE, old_version)
+    if active_version:
+        _write_pointer(slot, PREVIOUS_FILE, active_version)
+    return old_version
+
+
+def _prune_versions(slot, keep_versions):
+    if not keep_versions:
+        return
+
+    protected = {current_version(slot), previous_version(slot)}
+    versions = list_versions(slot)
+    for version_id in versions[:-keep_versions]:
+        if version_id not in protected:
+            shutil.rmtree(version_dir(slot, version_id), ignore_errors=True)
@@ -0,0 +1,39 @@
+import os
+from app.core.model.export import export_tflite
+from app.core.model.versioning import publish_version
+from app.core.trainer.fingerprint import write_fingerprint
+
+
+class DomainTrainingMixin:
+    """
+    Etapas por domain_address comuns a TrainingPipeline e TrainingManangerPipeline.
+
+    A classe que a usa fornece config, fingerprints, encode_training_data, train_model e cross_validate.
+    """
+
+    def export_components(self, path, name):
+        """Exporta o melhor modelo salvo para TFLite, somente inferência e opcionalmente quantizado."""
+        export_config = self.config.get('export', {}).get('tflite', {})
+        if not export_config.get('enabled', False):
+            return None
+
+        try:
+            return export_tflite(
+                os.path.join(path, f'{name}_best_model.keras'),
+                self.config['processing']['max_length'],
+                export_config.get('quantization', 'none')
+            )
+        except Exception as e:
+            print(f"\nErro ao exportar o modelo TFLite: {str(e)}")
+            return None
+
+    def train_domain(self, df, domain_address, fingerprint=None):
+        """Treina, valida, exporta e publica o modelo de um domain_address; retorna as métricas dos folds."""
+        X, y = self.encode_training_data(df,domain_address)
+        name,path = self.train_model(X, y,domain_address)
+        histories, fold_results  = self.cross_validate(X, y,name,path)
+        self.export_components(path,name)
+        write_fingerprint(path, fingerprint or self.fingerprints.get(domain_address))
+        publish_version(path, self.config.get('versioning', {}).get('keep_versions', 3))
+
+        return [{metric: float(value) for metric, value in fold.items()} for fold in fold_results]
@@ -0,0 +1,86 @@
+import hashlib
+import json
+import os
+import pandas as pd
+from app.core.model.versioning import domain_slot, resolve_artifact_dir
+from app.core.data.augmentation import AUGMENTER_VERSION
+from app.core.data.cleaner import cleaning_signature, word_replacement_table
+
+FINGERPRINT_FILE = 'fingerprint.json'
+
+DOMAIN_CONFIG_SECTIONS = ['model', 'processing', 'training', 'export']
+INTENTION_CONFIG_SECTIONS = ['model_intention', 'processing', 'training', 'export']
+INTENTION_SGD_CONFIG_SECTIONS = ['processing']
+
+
+def hash_payload(*parts) -> str:
+    """Gera um hash estável (sha256) de estruturas serializáveis em JSON."""
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def rows_payload(df: pd.DataFrame, columns) -> list:
+    """Linhas do DataFrame ordenadas, para que a ordem de leitura do banco não altere o hash."""
+    if df is None or len(df) == 0:
+        return []
+    return sorted(tuple(str(value) for value in row) for row in df[columns].itertuples(index=False, name=None))
+
+
+def config_payload(config: dict, sections) -> dict:
+    return {section: config.get(section) for section in sections}
+
+
+def synonyms_payload() -> list:
+    return sorted(word_replacement_table.get(check=True).items())
+
+
+def preprocessing_payload() -> dict:
+    """Versões do código de limpeza e expansão e sinônimos padrão: mudanças nelas exigem novo pré-processamento."""
+    return {'cleaner': cleaning_signature(), 'augmenter': AUGMENTER_VERSION}
+
+
+def dataset_fingerprint(df: pd.DataFrame, columns, config: dict, sections, synonyms=None) -> str:
+    """Fingerprint de um conjunto de treinamento inteiro: linhas, sinônimos, pré-processamento e seções relevantes da configuração."""
+    synonyms = synonyms_payload() if synonyms is None else synonyms
+    columns = [column for column in columns if df is not None and column in df.columns]
+    return hash_payload(rows_payload(df, columns), synonyms, preprocessing_payload(), config_payload(config, sections))
+
+
+def domain_fingerprints(df: pd.DataFrame, config: dict, synonyms=None) -> dict:
+    """Fingerprint de cada domain_address: perguntas do domínio, sinônimos, pré-processamento e seções relevantes da configuração."""
+    synonyms = synonyms_payload() if synonyms is None else synonyms
+    preprocessing = preprocessing_payload()
+    settings = config_payload(config, DOMAIN_CONFIG_SECTIONS)
+    columns = [column for column in ['question', 'intention', 'domain_name'] if column in df.columns]
+
+    return {
+        domain_address: hash_payload(rows_payload(group, columns), synonyms, preprocessing, settings)
+        for domain_address, group in df.groupby('domain_address')
+    }
+
+
+def read_fingerprint(path) -> str:
+    """Lê o fingerprint salvo em um diretório de artefatos ou em um arquivo .json."""
+    file = path if path.endswith('.json') else os.path.join(path, FINGERPRINT_FILE)
+    try:
+        with open(file, 'r') as f:
+            return json.load(f).get('fingerprint')
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def write_fingerprint(path, fingerprint):
+    """Grava o fingerprint ao lado dos artefatos treinados."""
+    if not fingerprint:
+        return
+    file = path if path.endswith('.json') else os.path.join(path, FINGERPRINT_FILE)
+    with open(file, 'w') as f:
+        json.dump({'fingerprint': fingerprint}, f)
+
+
+def changed_domains(fingerprints: dict) -> list:
+    """Domínios cujo fingerprint difere do salvo na versão publicada (ou que nunca foram treinados)."""
+    return [
+        domain_address for domain_address, fingerprint in fingerprints.items()
+        if read_fingerprint(resolve_artifact_dir(domain_slot(domain_address))) != fingerprint
+    ]
@@ -0,0 +1,259 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional
+from config import conf_model
+
+
+class TrainingCancelled(Exception):
+    """Lançada dentro do pipeline quando o job de treinamento é cancelado."""
+
+
+class ProgressReporter:
+    """Interface de acompanhamento usada pelos pipelines; esta implementação não faz nada."""
+
+    def set_stage(self, stage: str):
+        pass
+
+    def set_total(self, total: int):
+        pass
+
+    def set_parallelism(self, workers: int):
+        pass
+
+    def start_item(self, item: str):
+        pass
+
+    def finish_item(self, item: str, **details):
+        pass
+
+    def check_cancelled(self):
+        pass
+
+
+class TrainingJob(ProgressReporter):
+    """Estado de um treinamento executado em segundo plano."""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+    def __init__(self, kind: str, params: Optional[Dict[str, Any]] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params or {}
+        self.status = self.QUEUED
+        self.stage = None
+        self.error = None
+        self.result = None
+
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+        self.total = 0
+        self.done = 0
+        self.parallelism = 1
+        self.current = None
+        self.items: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+        self.future = None
+        self._cancel_event = threading.Event()
+        self._lock = threading.Lock()
+
+    # Acompanhamento -------------------------------------------------------
+
+    def set_stage(self, stage):
+        with self._lock:
+            self.stage = stage
+
+    def set_total(self, total):
+        with self._lock:
+            self.total = total
+            self.done = 0
+
+    def set_parallelism(self, workers):
+        """Quantidade de itens treinados ao mesmo tempo, usada na estimativa do tempo restante."""
+        with self._lock:
+            self.parallelism = max(int(workers), 1)
+
+    def start_item(self, item):
+        self.check_cancelled()
+        with self._lock:
+            self.current = item
+            self.items[item] = {"status": self.RUNNING, "started_at": time.time(), "elapsed": None}
+
+    def finish_item(self, item, **details):
+        with self._lock:
+            entry = self.items.setdefault(item, {"started_at": time.time()})
+            entry.update(details)
+            entry["status"] = self.COMPLETED
+            entry["elapsed"] = time.time() - entry["started_at"]
+            self.done += 1
+            if self.current == item:
+                self.current = None
+
+    def check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise TrainingCancelled(f"Job {self.id} cancelado")
+
+    # Ciclo de vida --------------------------------------------------------
+
+    def cancel(self):
+        """Cancela o job: se ainda estiver na fila não será executado; se estiver rodando, para no próximo ponto de verificação."""
+        self._cancel_event.set()
+        if self.future is not None and self.future.cancel():
+            with self._lock:
+                self.status = self.CANCELLED
+                self.finished_at = time.time()
+
+    def wait(self, timeout=None):
+        """Aguarda o término do job por até timeout segundos; ao expirar o job segue em segundo plano."""
+        if self.future is not None:
+            try:
+                self.future.exception(timeout=timeout)
+            except (CancelledError, FutureTimeoutError):
+                pass
+        return self
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (self.COMPLETED, self.FAILED, self.CANCELLED)
+
+    def _eta(self, now):
+        """Estimativa do tempo restante: tempo médio dos itens concluídos, dividido entre os itens treinados em paralelo."""
+        if self.status != self.RUNNING or not self.total or not self.done:
+            return None
+        durations = [item["elapsed"] for item in self.items.values() if item.get("elapsed") is not None]
+        if not durations:
+            return None
+        remaining = max(self.total - self.done, 0)
+        if not remaining:
+            return 0.0
+        return remaining * (sum(durations) / len(durations)) / min(self.parallelism, remaining)
+
+    def to_dict(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            elapsed = None
+            if self.started_at:
+                elapsed = (self.finished_at or now) - self.started_at
+            return {
+                "job_id": self.id,
+                "kind": self.kind,
+                "params": self.params,
+                "status": self.status,
+                "stage": self.stage,
+                "progress": {
+                    "total": self.total,
+                    "done": self.done,
+                    "current": self.current,
+                    "items": {name: dict(item) for name, item in self.items.items()},
+                },
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "elapsed": elapsed,
+                "eta": self._eta(now),
+                "error": self.error,
+                "result": self.result,
+            }
+
+
+class TrainingJobManager:
+    """
+    Executa os treinamentos em um executor próprio, fora das threads do servidor.
+
+    max_concurrent limita quantos treinamentos rodam ao mesmo tempo (os demais aguardam na fila),
+    para que o treinamento não dispute CPU com as threads de inferência.
+    """
+
+    def __init__(self, max_concurrent=1, max_queued=10, max_history=100):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.max_history = max_history
+
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix='training')
+        self._jobs: "OrderedDict[str, TrainingJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, target: Callable[[TrainingJob], Any], params=None, app=None) -> TrainingJob:
+        """
+        Enfileira um treinamento. `target` recebe o job para reportar progresso.
+        Se `app` for informado, o treinamento roda dentro do contexto da aplicação Flask.
+        """
+        with self._lock:
+            queued = sum(1 for job in self._jobs.values() if job.status == TrainingJob.QUEUED)
+            if queued >= self.max_queued:
+                raise RuntimeError("Fila de treinamentos cheia, tente novamente mais tarde.")
+
+            job = TrainingJob(kind, params)
+            self._jobs[job.id] = job
+            self._prune()
+
+        job.future = self._executor.submit(self._execute, job, target, app)
+        return job
+
+    def _execute(self, job, target, app):
+        with job._lock:
+            if job._cancel_event.is_set():
+                job.status = TrainingJob.CANCELLED
+                job.finished_at = time.time()
+                return None
+            job.status = TrainingJob.RUNNING
+            job.started_at = time.time()
+
+        try:
+            if app is not None:
+                with app.app_context():
+                    result = target(job)
+            else:
+                result = target(job)
+            status, error = TrainingJob.COMPLETED, None
+        except TrainingCancelled:
+            result, status, error = None, TrainingJob.CANCELLED, None
+        except Exception as e:
+            result, status, error = None, TrainingJob.FAILED, str(e)
+            print(f"Erro no treinamento {job.id}: {error}")
+
+        with job._lock:
+            job.result = result
+            job.status = status
+            job.error = error
+            job.current = None
+            job.finished_at = time.time()
+            for item in job.items.values():
+                if item.get("status") == TrainingJob.RUNNING:
+                    item["status"] = status
+        return result
+
+    def _prune(self):
+        """Mantém apenas os max_history jobs mais recentes já finalizados."""
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished_at is not None]
+        for job_id in finished[:max(len(self._jobs) - self.max_history, 0)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[TrainingJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> Optional[TrainingJob]:
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel()
+        return job
+
+
+training_jobs = TrainingJobManager(
+    max_concurrent=int(conf_model.get('training_jobs.max_concurrent', 1)),
+    max_queued=int(conf_model.get('training_jobs.max_queued', 10)),
+    max_history=int(conf_model.get('training_jobs.max_history', 100))
+)
@@ -0,0 +1,85 @@
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from config import conf_model
+
+
+def _init_worker(intra_op_threads, inter_op_threads):
+    """Limita as threads do TensorFlow em cada processo para que N treinamentos não disputem os mesmos núcleos."""
+    os.environ['TF_NUM_INTRAOP_THREADS'] = str(intra_op_threads)
+    os.environ['TF_NUM_INTEROP_THREADS'] = str(inter_op_threads)
+
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+
+
+def _train_domain_worker(pipeline_class, df, domain_address, fingerprint):
+    """Executado no processo filho: cria um pipeline próprio e treina um único domain_address."""
+    return pipeline_class().train_domain(df, domain_address, fingerprint)
+
+
+def run_domain_training(pipeline, df, domain_addresses, job, fingerprints=None):
+    """
+    Treina os modelos de cada domain_address, sequencialmente ou em um pool de processos.
+
+    Com training_parallel.workers > 1 cada domínio é treinado em um processo separado
+    (contexto 'spawn'), com as threads do TensorFlow limitadas por processo, e as métricas
+    dos folds de cada domínio são agregadas de volta. Apenas um domínio por processo é
+    submetido por vez, de modo que cada item é marcado como iniciado quando de fato começa.
+
+    Returns:
+        dict: domain_address -> métricas dos folds da validação cruzada.
+    """
+    workers = int(conf_model.get('training_parallel.workers', 0) or 0)
+    fingerprints = fingerprints or {}
+    results = {}
+
+    if workers <= 1 or len(domain_addresses) <= 1:
+        for domain_address in domain_addresses:
+            job.start_item(domain_address)
+            results[domain_address] = pipeline.train_domain(df, domain_address, fingerprints.get(domain_address))
+            job.finish_item(domain_address, fold_results=results[domain_address])
+        return results
+
+    workers = min(workers, len(domain_addresses))
+    job.set_parallelism(workers)
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker,
+        initargs=(
+            int(conf_model.get('training_parallel.intra_op_threads', 1)),
+            int(conf_model.get('training_parallel.inter_op_threads', 1))
+        )
+    )
+
+    pending = list(domain_addresses)
+    futures = {}
+    try:
+        while pending or futures:
+            # Completa os processos livres; o domínio começa a treinar assim que é submetido
+            while pending and len(futures) < workers:
+                domain_address = pending.pop(0)
+                job.start_item(domain_address)
+                df_domain = df[df['domain_address'] == domain_address]
+                future = executor.submit(
+                    _train_domain_worker, type(pipeline), df_domain, domain_address, fingerprints.get(domain_address)
+                )
+                futures[future] = domain_address
+
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                domain_address = futures.pop(future)
+                results[domain_address] = future.result()
+                job.finish_item(domain_address, fold_results=results[domain_address])
+            job.check_cancelled()
+    except BaseException:
+        # Cancelamento ou falha: os domínios ainda não submetidos não são treinados
+        for future in futures:
+            future.cancel()
+        raise
+    finally:
+        executor.shutdown(wait=True)
+
+    return results
@@ -3,20 +3,28 @@ import pickle
 from sklearn.preprocessing import MultiLabelBinarizer
 from app.core.data.augmentation import DataAugmenter
 from app.core.data.cleaner import TextCleaner
-from app.core.data.tokenizer import TokenizerWrapper
+from app.core.data.dataset_cache import dataset_cache, frame_key
+from app.core.data.tokenizer import ENCODER_VERSION, TokenizerWrapper
 from app.core.model.architectures.factory import ModelFactory
+from app.core.trainer.jobs import ProgressReporter
+from app.core.trainer.domain import DomainTrainingMixin
+from app.core.trainer.parallel import run_domain_training
+from app.core.trainer.fingerprint import changed_domains, domain_fingerprints, preprocessing_payload
+from app.core.model.versioning import create_version_dir, domain_slot
 from app.core.trainer.trainer import ModelTrainer
 from config import conf_model
 from app.database.processing import loads_questions
 from app.core.data.balancing import performing_data_balancing
 
 
-class TrainingPipeline:
+class TrainingPipeline(DomainTrainingMixin):
     def __init__(self):
         self.tokenizer = None
         self.mlb = None
         self.model = None
         self.history = None
+        self.fold_results = {}
+        self.fingerprints = {}
         self.config = conf_model.get_all()
 
     def _ensure_directory(self, path):
@@ -24,28 +32,54 @@ class TrainingPipeline:
         if not os.path.exists(path):
             os.makedirs(path)
             
-    def process_training_data(self,object):
+    def process_training_data(self,object,force=False):
         """Carrega inicialmente os dados iniciais"""
         df =  loads_questions(object)
+
+        """Mantém apenas os domínios cujos dados ou configurações mudaram desde o último treinamento"""
+        self.fingerprints = domain_fingerprints(df, self.config)
+        if not force:
+            df = df[df['domain_address'].isin(changed_domains(self.fingerprints))]
+
         df_intention = df[['intention']].drop_duplicates()
         df_address = df[['intention','domain_address','domain_name' ]].drop_duplicates()
+        expanded_df = df
 
-        """Faz os tratamentos de expanção e limpesa das questões"""
+        """Faz os tratamentos de expanção e limpesa das questões, reaproveitando o cache quando os dados de origem não mudaram"""
         if len(df) > 0:
-            df_balanced = performing_data_balancing(df, self.config['processing']['target_samples'])
+            cleaner = TextCleaner(self.config['processing']['cleaning'])
+            key = frame_key(
+                df, list(df.columns), 'domain', cleaner.word_replacements_database, preprocessing_payload(),
+                self.config['processing']
+            )
 
-            augmenter = DataAugmenter(max_variations_per_question=self.config['processing']['max_variations'])
-            expanded_df = augmenter.expand_dataset(df_balanced)
+            cached = dataset_cache.load(key)
+            if cached is not None:
+                expanded_df = cached.frame
+            else:
+                df_balanced = performing_data_balancing(df, self.config['processing']['target_samples'])
+
+                augmenter = DataAugmenter(max_variations_per_question=self.config['processing']['max_variations'])
+                expanded_df = augmenter.expand_dataset(df_balanced)
+
+                expanded_df['question'] = cleaner.clean_many(expanded_df['question'])
+                dataset_cache.store(key, frame=expanded_df)
 
-            cleaner = TextCleaner(self.config['processing']['cleaning'])
-            expanded_df['question'] = expanded_df['question'].apply(cleaner.clean_text)
-            
             cleaner.generate_word_replacements()
         return df_intention, df_address,expanded_df
 
     def encode_training_data(self, df, domain_address):
         df_filtered = df[df['domain_address'] == domain_address]
-        
+
+        """Reaproveita as matrizes já tokenizadas quando as questões do domínio não mudaram"""
+        key = frame_key(df_filtered, ['question', 'domain_name'], 'domain_encoding', ENCODER_VERSION, self.config['processing'])
+        cached = dataset_cache.load(key)
+        if cached is not None:
+            self.tokenizer = cached.objects['tokenizer']
+            self.mlb = cached.objects['mlb']
+            print("Classes reconhecidas:", self.mlb.classes_)
+            return cached.arrays['X'], cached.arrays['y']
+
         """Tokeniza e codifica os dados de treinamento."""
         self.tokenizer = TokenizerWrapper(self.config['processing'])
         X = self.tokenizer.fit_transform(df_filtered['question'])
@@ -56,6 +90,12 @@ class TrainingPipeline:
 
         print("Classes reconhecidas:", self.mlb.classes_)
 
+        dataset_cache.store(
+            key,
+            arrays={'X': X, 'y': y},
+            objects={'tokenizer': self.tokenizer, 'mlb': self.mlb},
+            meta={'domain_address': domain_address}
+        )
         return X, y
     
     def save_components(self, path,name):
@@ -86,8 +126,9 @@ class TrainingPipeline:
             verbose=1
         )
 
+        # Cada treinamento grava em uma nova versão, publicada apenas ao final
         name = domain_address.replace('/', '_')
-        path = 'mod/app/models/saved/' + domain_address + '/'
+        path = create_version_dir(domain_slot(domain_address))
         self.save_components(path,name)
 
         return name,path
@@ -103,15 +144,23 @@ class TrainingPipeline:
 
         return trainer.train_with_cross_validation(model_factory=model_factory_wrapped, X=X, y=y)
 
-    def run(self, object):
+    def run(self, object, job=None, force=False):
         """ Roda a pipeline completa de treinamento"""
-        df_intention, df_address, df = self.process_training_data(object)
-        
+        job = job or ProgressReporter()
+
+        job.set_stage('preprocessing')
+        df_intention, df_address, df = self.process_training_data(object, force)
+
+        # Um mesmo domain_address pode aparecer com vários domain_name, mas é treinado uma única vez
+        domain_addresses = []
         for index,row in df_intention.iterrows():
             df_rotate = df_address[df_address['intention'] == row.intention]
             for index_address,row_address in df_rotate.iterrows():
-                X, y = self.encode_training_data(df,row_address.domain_address)
-                name,path = self.train_model(X, y,row_address.domain_address)
-                histories, fold_results  = self.cross_validate(X, y,name,path)
+                if row_address.domain_address not in domain_addresses:
+                    domain_addresses.append(row_address.domain_address)
+
+        job.set_stage('domains')
+        job.set_total(len(domain_addresses))
+        self.fold_results = run_domain_training(self, df, domain_addresses, job, self.fingerprints)
             
         return {'message': 'treinamento concluído'}
\ No newline at end of file
@@ -1,3 +1,4 @@
+import os
 import pickle
 import numpy as np
 from sklearn.calibration import LabelEncoder
@@ -5,8 +6,15 @@ from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import MultiLabelBinarizer
 from app.core.data.augmentation import DataAugmenterIntention
 from app.core.data.cleaner import TextCleaner
-from app.core.data.tokenizer import TokenizerWrapperIntention
+from app.core.data.dataset_cache import dataset_cache, frame_key
+from app.core.data.tokenizer import ENCODER_VERSION, TokenizerWrapperIntention
 from app.core.model.architectures.factory import ModelFactory
+from app.core.model.export import export_tflite_model
+from app.core.trainer.jobs import ProgressReporter
+from app.core.trainer.fingerprint import (
+    INTENTION_CONFIG_SECTIONS, dataset_fingerprint, preprocessing_payload, read_fingerprint, write_fingerprint
+)
+from app.core.model.versioning import INTENTION_SLOT, create_version_dir, publish_version, resolve_artifact_dir
 from app.database.processing import loads_entity_questions_training
 from app.core.data.balancing import performing_data_balancing_intention
 from config import conf_model
@@ -23,32 +31,51 @@ class TrainingIntentionPipeline:
         self.mlb = None
         self.intention_encoder = None
         self.object_encoder = None
+        self.version_path = None
+        self.fingerprint = None
 
     def _ensure_directory(self, path):
         """Garante que o diretório exista."""
         Path(path).mkdir(parents=True, exist_ok=True)
 
     def save_components(self):
-        """Salva o modelo e os componentes."""
-        self._ensure_directory('mod/app/models/saved')
-        self.model.save('mod/app/models/saved/intention_best_model.keras')
+        """Salva o modelo e os componentes em uma nova versão (ainda não publicada)."""
+        self.version_path = create_version_dir(INTENTION_SLOT)
+        self.model.save(os.path.join(self.version_path, 'intention_best_model.keras'))
 
-        with open('mod/app/models/saved/intention_tokenizer.pkl', 'wb') as f:
+        with open(os.path.join(self.version_path, 'intention_tokenizer.pkl'), 'wb') as f:
             pickle.dump(self.tokenizer, f)
 
-        with open('mod/app/models/saved/intention_mlb.pkl', 'wb') as f:
+        with open(os.path.join(self.version_path, 'intention_mlb.pkl'), 'wb') as f:
             pickle.dump(self.mlb, f)
 
         # Salvar os encoders de intenção e objeto
-        with open('mod/app/models/saved/intention_encoder.pkl', 'wb') as f:
+        with open(os.path.join(self.version_path, 'intention_encoder.pkl'), 'wb') as f:
             pickle.dump(self.intention_encoder, f)
         
-        with open('mod/app/models/saved/object_encoder.pkl', 'wb') as f:
+        with open(os.path.join(self.version_path, 'object_encoder.pkl'), 'wb') as f:
             pickle.dump(self.object_encoder, f)
         
 
         print("\nModelo e componentes salvos com sucesso!")
 
+    def export_components(self):
+        """Exporta o modelo de intenções para TFLite, somente inferência e opcionalmente quantizado."""
+        export_config = self.config.get('export', {}).get('tflite', {})
+        if not export_config.get('enabled', False) or self.model is None:
+            return None
+
+        try:
+            return export_tflite_model(
+                self.model,
+                os.path.join(self.version_path, 'intention_model.tflite'),
+                self.config['processing']['max_length'],
+                export_config.get('quantization', 'none')
+            )
+        except Exception as e:
+            print(f"\nErro ao exportar o modelo TFLite: {str(e)}")
+            return None
+
     def process_entities(self, df):
         """Transforma entidades em formato binário para treinamento."""
         self.mlb = MultiLabelBinarizer()
@@ -56,12 +83,30 @@ class TrainingIntentionPipeline:
         y_entities = self.mlb.fit_transform(df['entities'])
         return y_entities, self.mlb
 
-    def processing_data_for_training(self):
-        """Processa e prepara os dados para treinamento."""
-        # Carregar os dados de treinamento
+    def load_training_data(self):
+        """Carrega os dados de treinamento e calcula o fingerprint sobre as linhas ainda não processadas."""
         df = loads_entity_questions_training()
+        self.fingerprint = dataset_fingerprint(
+            df, ['question', 'intention', 'object', 'entities'], self.config, INTENTION_CONFIG_SECTIONS
+        )
+        return df
+
+    def processing_data_for_training(self, df=None):
+        """Processa e prepara os dados para treinamento."""
+        if df is None:
+            df = self.load_training_data()
 
         if df is not None and len(df) > 0:
+            cleaner = TextCleaner(self.config['processing']['cleaning'])
+
+            # Reaproveita o conjunto já processado quando os dados de origem não mudaram
+            key = frame_key(
+                df, list(df.columns), 'intention', cleaner.word_replacements_database, preprocessing_payload(),
+                self.config['processing']
+            )
+            cached = dataset_cache.load(key)
+            if cached is not None:
+                return cached.frame
 
             # Balancear os dados
             df_balanced = performing_data_balancing_intention(df, self.config['processing']['target_samples'])
@@ -71,22 +116,41 @@ class TrainingIntentionPipeline:
             expanded_df = augmenter.expand_dataset(df_balanced)
 
             # Limpar os textos
-            cleaner = TextCleaner(self.config['processing']['cleaning'])
-            expanded_df['question'] = expanded_df['question'].apply(cleaner.clean_text)
+            expanded_df['question'] = cleaner.clean_many(expanded_df['question'])
 
+            dataset_cache.store(key, frame=expanded_df)
             return expanded_df
 
         return df
     
     def encode_training_data(self, df):
         """Tokeniza e codifica os dados de treinamento."""
-        self.tokenizer = TokenizerWrapperIntention(self.config['processing'])
-        X = self.tokenizer.fit_transform(df['question'])
+        # Reaproveita as matrizes já tokenizadas quando as questões não mudaram. A chave não depende da
+        # ordem das linhas, por isso os rótulos são guardados na mesma entrada, alinhados com X
+        key = frame_key(
+            df, ['question', 'intention', 'object', 'entities'], 'intention_encoding', ENCODER_VERSION,
+            self.config['processing']
+        )
+        cached = dataset_cache.load(key)
+        if cached is not None:
+            self.tokenizer = cached.objects['tokenizer']
+            self.mlb = cached.objects['mlb']
+            return (
+                cached.arrays['X'], cached.objects['y_intention'], cached.objects['y_object'],
+                cached.arrays['y_entities'], self.mlb
+            )
 
         y_intention = df['intention'].values
         y_object = df['object'].values
+        self.tokenizer = TokenizerWrapperIntention(self.config['processing'])
+        X = self.tokenizer.fit_transform(df['question'])
         y_entities, mlb = self.process_entities(df)
 
+        dataset_cache.store(
+            key,
+            arrays={'X': X, 'y_entities': y_entities},
+            objects={'tokenizer': self.tokenizer, 'mlb': mlb, 'y_intention': y_intention, 'y_object': y_object}
+        )
         return X, y_intention, y_object, y_entities, mlb
     
     def train_model(self, X, y_intention, y_object, y_entities, mlb):
@@ -142,13 +206,34 @@ class TrainingIntentionPipeline:
         print("Treinamento concluído.")
 
 
-    def run(self):
+    def is_up_to_date(self):
+        """Indica se a versão publicada foi treinada com os mesmos dados e configurações."""
+        return self.fingerprint is not None and read_fingerprint(resolve_artifact_dir(INTENTION_SLOT)) == self.fingerprint
+
+    def run(self, job=None, force=False):
         """Executa o pipeline completo."""
-        df = self.processing_data_for_training()
+        job = job or ProgressReporter()
+
+        job.set_stage('preprocessing')
+        # O fingerprint é verificado antes do balanceamento, expansão e limpeza
+        df = self.load_training_data()
+        if not force and self.is_up_to_date():
+            print("\nModelo de intenções sem alterações, treinamento ignorado.")
+            return {'message': 'modelo de intenções sem alterações', 'skipped': True}
+
+        df = self.processing_data_for_training(df)
+
         if len(df) > 0:
             # Gera os dados tokenizados e codificados
             X, y_intention, y_object, y_entities, mlb = self.encode_training_data(df)
             
             # Passa os dados processados para o treinamento
+            job.set_stage('training')
+            job.check_cancelled()
             self.train_model(X, y_intention, y_object, y_entities, mlb)
-        self.save_components()
\ No newline at end of file
+        job.set_stage('saving')
+        job.check_cancelled()
+        self.save_components()
+        self.export_components()
+        write_fingerprint(self.version_path, self.fingerprint)
+        publish_version(self.version_path, self.config.get('versioning', {}).get('keep_versions', 3))
\ No newline at end of file
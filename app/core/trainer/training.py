@@ -7,22 +7,32 @@ from sklearn.linear_model import SGDClassifier
 from sklearn.pipeline import make_pipeline
 from sklearn.metrics import classification_report
 from sklearn.preprocessing import MultiLabelBinarizer
-import spacy
 from app.core.data.augmentation import DataAugmenter, DataAugmenterIntention
 from app.core.data.balancing import performing_data_balancing, performing_data_balancing_intention
 from app.core.data.cleaner import TextCleaner
-from app.core.data.tokenizer import TokenizerWrapper
+from app.core.data.dataset_cache import dataset_cache, frame_key
+from app.core.data.tokenizer import ENCODER_VERSION, TokenizerWrapper
 from app.core.model.architectures.factory import ModelFactory
+from app.core.trainer.jobs import ProgressReporter
+from app.core.trainer.domain import DomainTrainingMixin
+from app.core.trainer.parallel import run_domain_training
+from app.core.trainer.fingerprint import (
+    INTENTION_SGD_CONFIG_SECTIONS, changed_domains, dataset_fingerprint, domain_fingerprints, preprocessing_payload,
+    read_fingerprint, write_fingerprint
+)
+from app.core.model.versioning import create_version_dir, domain_slot
 from app.core.trainer.trainer import ModelTrainer
 from config import conf_model
 from app.database.processing import loads_entity_questions_training, loads_questions_all
 
-class TrainingManangerPipeline:
+class TrainingManangerPipeline(DomainTrainingMixin):
     def __init__(self):
         self.tokenizer = None
         self.mlb = None
         self.model = None
         self.history = None
+        self.fold_results = {}
+        self.fingerprints = {}
         self.config = conf_model.get_all()
 
     def _ensure_directory(self, path):
@@ -43,28 +53,54 @@ class TrainingManangerPipeline:
 
         print("\nModelo e componentes salvos com sucesso!")
 
-    def process_training_data(self):
+    def process_training_data(self, force=False):
         """Carrega inicialmente os dados iniciais"""
         df =  loads_questions_all()
+
+        """Mantém apenas os domínios cujos dados ou configurações mudaram desde o último treinamento"""
+        self.fingerprints = domain_fingerprints(df, self.config)
+        if not force:
+            df = df[df['domain_address'].isin(changed_domains(self.fingerprints))]
+
         df_intention = df[['intention']].drop_duplicates()
         df_address = df[['intention','domain_address','domain_name' ]].drop_duplicates()
+        expanded_df = df
 
-        """Faz os tratamentos de expanção e limpesa das questões"""
+        """Faz os tratamentos de expanção e limpesa das questões, reaproveitando o cache quando os dados de origem não mudaram"""
         if df is not None and len(df) > 0:
-            df_balanced = performing_data_balancing(df, self.config['processing']['target_samples'])
+            cleaner = TextCleaner(self.config['processing']['cleaning'])
+            key = frame_key(
+                df, list(df.columns), 'domain', cleaner.word_replacements_database, preprocessing_payload(),
+                self.config['processing']
+            )
 
-            augmenter = DataAugmenter(max_variations_per_question=self.config['processing']['max_variations'])
-            expanded_df = augmenter.expand_dataset(df_balanced)
+            cached = dataset_cache.load(key)
+            if cached is not None:
+                expanded_df = cached.frame
+            else:
+                df_balanced = performing_data_balancing(df, self.config['processing']['target_samples'])
+
+                augmenter = DataAugmenter(max_variations_per_question=self.config['processing']['max_variations'])
+                expanded_df = augmenter.expand_dataset(df_balanced)
+
+                expanded_df['question'] = cleaner.clean_many(expanded_df['question'])
+                dataset_cache.store(key, frame=expanded_df)
 
-            cleaner = TextCleaner(self.config['processing']['cleaning'])
-            expanded_df['question'] = expanded_df['question'].apply(cleaner.clean_text)
-            
             cleaner.generate_word_replacements()
         return df_intention, df_address,expanded_df
 
     def encode_training_data(self, df, domain_address):
         df_filtered = df[df['domain_address'] == domain_address]
-        
+
+        """Reaproveita as matrizes já tokenizadas quando as questões do domínio não mudaram"""
+        key = frame_key(df_filtered, ['question', 'domain_name'], 'domain_encoding', ENCODER_VERSION, self.config['processing'])
+        cached = dataset_cache.load(key)
+        if cached is not None:
+            self.tokenizer = cached.objects['tokenizer']
+            self.mlb = cached.objects['mlb']
+            print("Classes reconhecidas:", self.mlb.classes_)
+            return cached.arrays['X'], cached.arrays['y']
+
         """Tokeniza e codifica os dados de treinamento."""
         self.tokenizer = TokenizerWrapper(self.config['processing'])
         X = self.tokenizer.fit_transform(df_filtered['question'])
@@ -75,6 +111,12 @@ class TrainingManangerPipeline:
 
         print("Classes reconhecidas:", self.mlb.classes_)
 
+        dataset_cache.store(
+            key,
+            arrays={'X': X, 'y': y},
+            objects={'tokenizer': self.tokenizer, 'mlb': self.mlb},
+            meta={'domain_address': domain_address}
+        )
         return X, y
     
     def train_model(self, X, y,domain_address):
@@ -92,8 +134,9 @@ class TrainingManangerPipeline:
             verbose=1
         )
 
+        # Cada treinamento grava em uma nova versão, publicada apenas ao final
         name = domain_address.replace('/', '_')
-        path = 'mod/app/models/saved/' + domain_address + '/'
+        path = create_version_dir(domain_slot(domain_address))
         self.save_components(path,name)
 
         return name,path
@@ -108,31 +151,48 @@ class TrainingManangerPipeline:
             )
 
         return trainer.train_with_cross_validation(model_factory=model_factory_wrapped, X=X, y=y)
-    
-    def run(self):
+
+    def run(self, job=None, force=False):
         """ Roda a pipeline completa de treinamento"""
-        df_intention, df_address, df = self.process_training_data()
-        
+        job = job or ProgressReporter()
+
+        job.set_stage('preprocessing')
+        df_intention, df_address, df = self.process_training_data(force)
+
+        # Um mesmo domain_address pode aparecer com vários domain_name, mas é treinado uma única vez
+        domain_addresses = []
         for index,row in df_intention.iterrows():
             df_rotate = df_address[df_address['intention'] == row.intention]
             for index_address,row_address in df_rotate.iterrows():
-                X, y = self.encode_training_data(df,row_address.domain_address)
-                name,path = self.train_model(X, y,row_address.domain_address)
-                histories, fold_results  = self.cross_validate(X, y,name,path)
+                if row_address.domain_address not in domain_addresses:
+                    domain_addresses.append(row_address.domain_address)
+
+        job.set_stage('domains')
+        job.set_total(len(domain_addresses))
+        self.fold_results = run_domain_training(self, df, domain_addresses, job, self.fingerprints)
             
         return {'message': 'treinamento concluído'}
 
 class TrainingIntentionManangerPipeline:
+    MODEL_FILE = "mod/app/models/saved/model_predicting_intentions.joblib"
+    FINGERPRINT_FILE = "mod/app/models/saved/model_predicting_intentions.fingerprint.json"
+
     def __init__(self):
         self.model = None
+        self.fingerprint = None
         self.config = conf_model.get_all()
-        self.nlp = spacy.load('mod/app/models/pt_core_news_md-3.8.0')
 
-    def processing_data_for_training(self):
-        """Processa e prepara os dados para treinamento."""
-        # Carregar os dados de treinamento
+    def load_training_data(self):
+        """Carrega os dados de treinamento e calcula o fingerprint sobre as linhas ainda não processadas."""
         df = loads_entity_questions_training()
         df = df[['question','intention']]
+        self.fingerprint = dataset_fingerprint(df, ['question', 'intention'], self.config, INTENTION_SGD_CONFIG_SECTIONS)
+        return df
+
+    def processing_data_for_training(self, df=None):
+        """Processa e prepara os dados para treinamento."""
+        if df is None:
+            df = self.load_training_data()
 
         if df is not None and len(df) > 0:
             df_balanced = performing_data_balancing_intention(df, self.config['processing']['target_samples'])
@@ -141,7 +201,7 @@ class TrainingIntentionManangerPipeline:
             expanded_df = augmenter.expand_dataset(df_balanced)
 
             cleaner = TextCleaner(self.config['processing']['cleaning'])
-            expanded_df['question'] = expanded_df['question'].apply(cleaner.clean_text)
+            expanded_df['question'] = cleaner.clean_many(expanded_df['question'])
 
             return expanded_df
 
@@ -164,14 +224,33 @@ class TrainingIntentionManangerPipeline:
 
     def save_components(self):
         """Salva o modelo e os componentes."""
-        joblib.dump(self.model, "mod/app/models/saved/model_predicting_intentions.joblib")
+        joblib.dump(self.model, self.MODEL_FILE)
+        write_fingerprint(self.FINGERPRINT_FILE, self.fingerprint)
 
         print("\nModelo salvo com sucesso!")
 
-    def run(self):
+    def is_up_to_date(self):
+        """Indica se o modelo salvo foi treinado com os mesmos dados e configurações."""
+        return (
+            self.fingerprint is not None
+            and os.path.exists(self.MODEL_FILE)
+            and read_fingerprint(self.FINGERPRINT_FILE) == self.fingerprint
+        )
+
+    def run(self, job=None, force=False):
         """Executa o pipeline completo."""
-        df = self.processing_data_for_training()
+        job = job or ProgressReporter()
+
+        job.set_stage('intention_sgd_preprocessing')
+        # O fingerprint é verificado antes do balanceamento, expansão e limpeza
+        df = self.load_training_data()
+        if not force and self.is_up_to_date():
+            print("\nModelo de intenções (SGD) sem alterações, treinamento ignorado.")
+            return
+
+        df = self.processing_data_for_training(df)
 
         if df is not None and len(df) > 0:
+            job.set_stage('intention_sgd_training')
             self.train_model(df)
             self.save_components()
\ No newline at end of file
@@ -1,6 +1,7 @@
 import os
 from flask_sqlalchemy import SQLAlchemy
 from config import loger,conf
+from app.database.pool import read_pool
 
 # Instância do SQLAlchemy
 db = SQLAlchemy()
@@ -10,12 +11,16 @@ def start_the_database(app):
         current_dir = os.path.dirname(os.path.abspath(__file__))
         root_dir = os.path.dirname(os.path.dirname(current_dir))
 
-        db_path = os.path.join(root_dir, 'data.db')
+        # DATA_DB_PATH permite apontar para outro banco (ex.: banco sintético dos benchmarks)
+        db_path = os.environ.get('DATA_DB_PATH') or os.path.join(root_dir, 'data.db')
 
         app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
         app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
         db.init_app(app)
+
+        # As consultas de leitura usam o pool de conexões somente leitura, com o banco em modo WAL
+        read_pool.configure(db_path)
     except FileNotFoundError as e:
         #loger.log('ERROR',f'Erro ao inicializar o banco de dados: {e}')
         print(f'Erro no arquivo de banco de dados: {e}')
@@ -0,0 +1,220 @@
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from config import conf_model
+
+
+class SQLiteReadPool:
+    """
+    Pool de conexões somente leitura ao data.db, compartilhado pelas threads do servidor.
+
+    - O banco é colocado em modo WAL: leitores trabalham sobre um snapshot e não esperam por um
+      treinamento (ou outro processo) que esteja lendo ou gravando o mesmo arquivo. O modo fica
+      gravado no próprio data.db e cria os arquivos data.db-wal/data.db-shm ao lado dele;
+      database.wal: false mantém o modo atual do arquivo. Ao encerrar o processo o WAL é
+      consolidado no data.db (checkpoint), para que uma cópia só do data.db tenha todos os commits.
+    - As conexões são abertas com mode=ro e query_only, e reutilizadas entre as requisições;
+      o cache de comandos do sqlite3 (cached_statements) mantém as consultas já preparadas.
+    - Cada consulta é um snapshot próprio; snapshot() agrupa várias consultas no mesmo snapshot.
+
+    :param size: Máximo de conexões abertas; acima disso as threads aguardam uma conexão livre.
+    :param timeout_seconds: Espera máxima por uma conexão livre.
+    :param busy_timeout_ms: Espera do SQLite por bloqueios (só ocorrem fora do modo WAL).
+    """
+
+    def __init__(self, size=8, timeout_seconds=5.0, busy_timeout_ms=5000, cache_size_kb=8192, mmap_size_mb=64,
+                 cached_statements=256, wal=True):
+        self.size = size
+        self.timeout_seconds = timeout_seconds
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size_mb = mmap_size_mb
+        self.cached_statements = cached_statements
+        self.wal = wal
+
+        self.path = None
+        self.journal_mode = None
+        self._checkpoint_at_exit = False
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+
+        """Contadores"""
+        self.acquired = 0
+        self.waits = 0
+        self.wait_time_total = 0.0
+
+    def configure(self, path):
+        """Aponta o pool para o banco (descartando conexões de outro caminho) e ativa o WAL."""
+        with self._lock:
+            self.path = os.path.abspath(path)
+            self._close_idle()
+        self.journal_mode = self._enable_wal() if self.wal else None
+
+        if self.journal_mode == 'wal' and not self._checkpoint_at_exit:
+            self._checkpoint_at_exit = True
+            atexit.register(self.close)
+
+    def _enable_wal(self):
+        """O modo WAL é gravado no arquivo, então basta ativá-lo uma vez com uma conexão de escrita."""
+        try:
+            connection = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000.0)
+            try:
+                previous = connection.execute("PRAGMA journal_mode").fetchone()[0]
+                mode = connection.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+                if mode != previous:
+                    print(f"{self.path}: journal_mode alterado de {previous} para {mode} "
+                          f"(database.wal: false mantém o modo do arquivo)")
+                return mode
+            finally:
+                connection.close()
+        except sqlite3.Error as e:
+            print(f"Não foi possível ativar o modo WAL em {self.path}: {str(e)}")
+            return None
+
+    def checkpoint(self):
+        """Consolida o WAL no arquivo do banco e o esvazia; as conexões do pool são somente leitura e não o fazem."""
+        if self.path is None or self.journal_mode != 'wal':
+            return None
+        try:
+            connection = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000.0)
+            try:
+                return connection.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+            finally:
+                connection.close()
+        except sqlite3.Error as e:
+            print(f"Não foi possível consolidar o WAL em {self.path}: {str(e)}")
+            return None
+
+    def _open(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            Path(self.path).as_uri() + '?mode=ro',
+            uri=True,
+            timeout=self.busy_timeout_ms / 1000.0,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=self.cached_statements,
+        )
+        connection.execute("PRAGMA query_only=ON")
+        connection.execute(f"PRAGMA cache_size=-{int(self.cache_size_kb)}")
+        connection.execute(f"PRAGMA mmap_size={int(self.mmap_size_mb) * 1024 * 1024}")
+        return connection
+
+    def _acquire(self) -> sqlite3.Connection:
+        if self.path is None:
+            raise RuntimeError("Banco de dados não inicializado: chame start_the_database antes das consultas.")
+
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                if self._opened < self.size:
+                    self._opened += 1
+                    create = True
+                else:
+                    create = False
+            if create:
+                try:
+                    connection = self._open()
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            else:
+                start = time.perf_counter()
+                try:
+                    connection = self._idle.get(timeout=self.timeout_seconds)
+                except queue.Empty:
+                    raise TimeoutError(f"Nenhuma conexão livre em {self.timeout_seconds}s (pool com {self.size} conexões).")
+                with self._lock:
+                    self.waits += 1
+                    self.wait_time_total += time.perf_counter() - start
+
+        with self._lock:
+            self.acquired += 1
+        return connection
+
+    def _release(self, connection, broken=False):
+        if broken:
+            connection.close()
+            with self._lock:
+                self._opened -= 1
+            return
+        if connection.in_transaction:
+            connection.rollback()
+        self._idle.put(connection)
+
+    @contextmanager
+    def connection(self):
+        """Empresta uma conexão do pool; ela volta ao pool ao final do bloco."""
+        connection = self._acquire()
+        broken = False
+        try:
+            yield connection
+        except sqlite3.DatabaseError as e:
+            # Conexões com erro de banco (ex.: arquivo substituído) são descartadas
+            broken = not isinstance(e, sqlite3.OperationalError)
+            raise
+        finally:
+            self._release(connection, broken)
+
+    @contextmanager
+    def snapshot(self):
+        """Executa várias consultas sobre o mesmo snapshot do banco."""
+        with self.connection() as connection:
+            connection.execute("BEGIN")
+            yield connection
+            connection.execute("COMMIT")
+
+    def fetch_all(self, sql, params: Optional[Dict[str, Any]] = None) -> List[tuple]:
+        with self.connection() as connection:
+            return connection.execute(sql, params or {}).fetchall()
+
+    def fetch_one(self, sql, params: Optional[Dict[str, Any]] = None) -> Optional[tuple]:
+        with self.connection() as connection:
+            return connection.execute(sql, params or {}).fetchone()
+
+    def _close_idle(self):
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            connection.close()
+            self._opened -= 1
+
+    def close(self):
+        """Fecha as conexões livres e consolida o WAL no data.db."""
+        with self._lock:
+            self._close_idle()
+        self.checkpoint()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "path": self.path,
+                "journal_mode": self.journal_mode,
+                "size": self.size,
+                "opened": self._opened,
+                "idle": self._idle.qsize(),
+                "acquired": self.acquired,
+                "waits": self.waits,
+                "wait_time_total": self.wait_time_total,
+            }
+
+
+read_pool = SQLiteReadPool(
+    size=int(conf_model.get('database.pool.size', 8)),
+    timeout_seconds=float(conf_model.get('database.pool.timeout_seconds', 5)),
+    busy_timeout_ms=int(conf_model.get('database.pool.busy_timeout_ms', 5000)),
+    cache_size_kb=int(conf_model.get('database.pool.cache_size_kb', 8192)),
+    mmap_size_mb=int(conf_model.get('database.pool.mmap_size_mb', 64)),
+    cached_statements=int(conf_model.get('database.pool.cached_statements', 256)),
+    wal=bool(conf_model.get('database.wal', True))
+)
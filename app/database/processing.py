@@ -1,36 +1,61 @@
-from . import db
+from .pool import read_pool
 import pandas as pd
-from sqlalchemy import text
+import hashlib
 from typing import Union, Dict, List
-from sqlalchemy.engine.row import Row
+
+# As consultas rodam no pool de conexões somente leitura (app/database/pool.py), e não em uma sessão
+# do Flask-SQLAlchemy por chamada: não dependem do contexto da aplicação e não bloqueiam atrás de gravações
 
 def loads_word_replacements() -> Union[Dict[str, str], Dict[str, str]]:
-    query = text("""
+    query = """
         SELECT
             s.word,
             s.synonym
         FROM synonyms s
-    """)
+    """
     
     try:
-        result = db.session.execute(query).fetchall()
+        result = read_pool.fetch_all(query)
         
         if not result:  # Verifica se o resultado está vazio
             return {"error": "Nenhum resultado encontrado"}
         
         # Converte o resultado para um dicionário no formato desejado
-        replacements = {row.word: row.synonym for row in result}
+        replacements = {word: synonym for word, synonym in result}
         return replacements
         
     except Exception as e:
-        db.session.rollback()
         return {"error": str(e)}
-    
-    finally:
-        db.session.close()
+
+def _content_signature(connection, queries) -> str:
+    """
+    Hash (sha256) das linhas retornadas pelas consultas. Por depender do conteúdo, detecta também
+    edições que mantêm a quantidade de linhas e o tamanho dos textos (ex.: correção de um erro de digitação).
+    """
+    digest = hashlib.sha256()
+    for query in queries:
+        for row in connection.execute(query):
+            digest.update('\x1f'.join(str(value) for value in row).encode('utf-8'))
+            digest.update(b'\x1e')
+        digest.update(b'\x1d')
+    return digest.hexdigest()
+
+def loads_word_replacements_signature():
+    """Assinatura da tabela de sinônimos, usada para detectar alterações sem montar o dicionário novamente."""
+    queries = [
+        "SELECT s.rowid, s.word, s.synonym FROM synonyms s ORDER BY s.rowid",
+    ]
+
+    try:
+        with read_pool.connection() as connection:
+            return _content_signature(connection, queries)
+
+    except Exception as e:
+        print(f"Erro ao verificar a tabela de sinônimos: {str(e)}")
+        return None
 
 def loads_entity_questions_training() -> pd.DataFrame:
-    query = text("""
+    query = """
         SELECT
             q.question AS question,
             i.intention AS intention,
@@ -40,10 +65,10 @@ def loads_entity_questions_training() -> pd.DataFrame:
         INNER JOIN intentions i ON q.intention_id = i.id
         INNER JOIN objects o ON q.object_id = o.id
 
-    """)
+    """
 
     try:
-        result = db.session.execute(query).fetchall()
+        result = read_pool.fetch_all(query)
         
         if not result:
             return pd.DataFrame({"error": ["Nenhum resultado encontrado"]})
@@ -52,14 +77,10 @@ def loads_entity_questions_training() -> pd.DataFrame:
         return df
         
     except Exception as e:
-        db.session.rollback()
         return pd.DataFrame({"error": [str(e)]})
 
-    finally:
-        db.session.close()
-
 def loads_entity_relationship_training() -> pd.DataFrame:
-    query = text("""
+    query = """
         SELECT
             e.translation as entity,
             w.weight as weight,
@@ -69,10 +90,10 @@ def loads_entity_relationship_training() -> pd.DataFrame:
         LEFT JOIN entities e ON r.entity_id = e.id
         LEFT JOIN weights w on r.weight_id = w.id
         LEFT JOIN entities p ON r.parent_id = p.id
-    """)
+    """
 
     try:
-        result = db.session.execute(query).fetchall()
+        result = read_pool.fetch_all(query)
         
         if not result:
             return pd.DataFrame({"error": ["Nenhum resultado encontrado"]})
@@ -81,22 +102,18 @@ def loads_entity_relationship_training() -> pd.DataFrame:
         return df
         
     except Exception as e:
-        db.session.rollback()
         return pd.DataFrame({"error": [str(e)]})
 
-    finally:
-        db.session.close()
-
 def loads_entity_origins() -> pd.DataFrame:
-    query = text("""
+    query = """
         SELECT
             e.entity as entity,
             e.translation as translation
         FROM entities e 
-    """)
+    """
 
     try:
-        result = db.session.execute(query).fetchall()
+        result = read_pool.fetch_all(query)
         
         if not result:
             return pd.DataFrame({"error": ["Nenhum resultado encontrado"]})
@@ -105,14 +122,27 @@ def loads_entity_origins() -> pd.DataFrame:
         return df
         
     except Exception as e:
-        db.session.rollback()
         return pd.DataFrame({"error": [str(e)]})
 
-    finally:
-        db.session.close()
+def loads_entity_relationship_signature():
+    """Assinatura das tabelas de relacionamento, usada para detectar alterações sem reconstruir o índice."""
+    queries = [
+        "SELECT r.rowid, r.entity_id, r.weight_id, r.parent_id FROM relations r ORDER BY r.rowid",
+        "SELECT e.rowid, e.entity, e.translation, e.word FROM entities e ORDER BY e.rowid",
+        "SELECT w.rowid, w.weight FROM weights w ORDER BY w.rowid",
+    ]
+
+    try:
+        # As três tabelas são lidas no mesmo snapshot
+        with read_pool.snapshot() as connection:
+            return _content_signature(connection, queries)
+
+    except Exception as e:
+        print(f"Erro ao verificar as tabelas de relacionamento: {str(e)}")
+        return None
 
 def loads_questions(object: str) -> pd.DataFrame:
-    query = text("""
+    query = """
         SELECT
             q.question as question,
             i.intention as intention,
@@ -125,11 +155,11 @@ def loads_questions(object: str) -> pd.DataFrame:
         LEFT JOIN objects o ON q.object_id = o.id
         WHERE (0 = 0)
         AND o.object = :object
-    """)
+    """
 
     try:
         # Executando a consulta
-        result = db.session.execute(query, {'object': object}).fetchall()
+        result = read_pool.fetch_all(query, {'object': object})
 
         # Verificando se há resultados
         if not result:
@@ -150,11 +180,10 @@ def loads_questions(object: str) -> pd.DataFrame:
         return df
 
     except Exception as e:
-        db.session.rollback()
         return {"error": str(e)}
 
 def loads_questions_all() -> pd.DataFrame:
-    query = text("""
+    query = """
         SELECT
             q.question as question,
             i.intention as intention,
@@ -164,11 +193,11 @@ def loads_questions_all() -> pd.DataFrame:
         LEFT JOIN intentions i ON q.intention_id = i.id
         LEFT JOIN objects o ON q.object_id = o.id
         WHERE (0 = 0)
-    """)
+    """
 
     try:
         # Executando a consulta
-        result = db.session.execute(query).fetchall()
+        result = read_pool.fetch_all(query)
 
         # Verificando se há resultados
         if not result:
@@ -187,5 +216,4 @@ def loads_questions_all() -> pd.DataFrame:
         return df
 
     except Exception as e:
-        db.session.rollback()
         return {"error": str(e)}
\ No newline at end of file
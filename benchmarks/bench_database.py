@@ -0,0 +1,315 @@
+"""
+Contenção de leitura no data.db: muitos leitores concorrentes (padrão 16) com e sem um "treinamento"
+gravando no mesmo arquivo.
+
+Os leitores chamam as funções reais de app/database/processing.py (assinaturas e cargas usadas no
+atendimento); cada modo troca apenas o objeto read_pool por onde elas executam as consultas:
+
+    session   -> uma sessão Flask-SQLAlchemy por consulta (como era o acesso antes do pool)
+    connect   -> uma conexão sqlite3 nova por consulta (referência sem pool)
+    pool      -> SQLiteReadPool (conexões somente leitura reutilizadas, comandos preparados em cache)
+
+Cada modo roda com o banco em journal_mode=delete e em WAL. O gravador simula um treinamento:
+transações de --write-rows inserções seguidas de uma pausa. Mede consultas/s, latência
+(p50/p95/p99) e erros (ex.: "database is locked") dos leitores, e commits do gravador.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_database --readers 16 --seconds 5 --output database.json
+"""
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+import numpy as np
+from benchmarks.fixtures import build_fixture_db
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from app.database import db, processing
+from app.database.pool import SQLiteReadPool
+
+""" Funções de leitura do atendimento (as mesmas que o servidor chama)"""
+LOADERS = [
+    processing.loads_word_replacements_signature,
+    processing.loads_entity_relationship_signature,
+    processing.loads_word_replacements,
+    processing.loads_entity_relationship_training,
+    processing.loads_entity_origins,
+]
+
+
+def percentiles(samples):
+    samples = np.asarray(samples) * 1000.0
+    if not len(samples):
+        return None
+    return {
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p95_ms": float(np.percentile(samples, 95)),
+        "p99_ms": float(np.percentile(samples, 99)),
+        "mean_ms": float(samples.mean()),
+    }
+
+
+def set_journal_mode(path, mode):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute(f"PRAGMA journal_mode={mode}").fetchone()[0]
+    finally:
+        connection.close()
+
+
+class ConnectReader:
+    """Mesma interface do SQLiteReadPool, abrindo uma conexão sqlite3 nova a cada consulta."""
+
+    def __init__(self, path, busy_timeout_ms):
+        self.path = path
+        self.timeout = busy_timeout_ms / 1000.0
+
+    @contextmanager
+    def connection(self):
+        connection = sqlite3.connect(self.path, timeout=self.timeout)
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    snapshot = connection
+
+    def fetch_all(self, sql, params=None):
+        with self.connection() as connection:
+            return connection.execute(sql, params or {}).fetchall()
+
+    def fetch_one(self, sql, params=None):
+        with self.connection() as connection:
+            return connection.execute(sql, params or {}).fetchone()
+
+    def close(self):
+        pass
+
+
+class SessionReader(ConnectReader):
+    """Mesma interface do SQLiteReadPool sobre o caminho anterior: uma sessão Flask-SQLAlchemy por consulta."""
+
+    def __init__(self, path, busy_timeout_ms):
+        from flask import Flask
+        from sqlalchemy import text
+
+        super().__init__(path, busy_timeout_ms)
+        self.text = text
+        self.app = Flask('bench_database')
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+        self.app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+        self.app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'connect_args': {'timeout': self.timeout}}
+        db.init_app(self.app)
+
+    def execute(self, sql, params=None):
+        return db.session.execute(self.text(sql), params or {})
+
+    @contextmanager
+    def connection(self):
+        """A "conexão" emprestada é o próprio leitor: execute roda na sessão do contexto da aplicação."""
+        with self.app.app_context():
+            try:
+                yield self
+            except Exception:
+                db.session.rollback()
+                raise
+            finally:
+                db.session.close()
+
+    snapshot = connection
+
+    def fetch_all(self, sql, params=None):
+        with self.connection() as session:
+            return session.execute(sql, params).fetchall()
+
+    def fetch_one(self, sql, params=None):
+        with self.connection() as session:
+            return session.execute(sql, params).fetchone()
+
+
+def make_reader(mode, path, args, wal):
+    if mode == 'session':
+        return SessionReader(path, args.busy_timeout_ms)
+    if mode == 'connect':
+        return ConnectReader(path, args.busy_timeout_ms)
+    pool = SQLiteReadPool(size=args.pool_size, busy_timeout_ms=args.busy_timeout_ms, wal=wal)
+    pool.configure(path)
+    return pool
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def writer(path, stop, args, stats):
+    """Simula um treinamento gravando no mesmo arquivo: transações grandes e pausas curtas."""
+    connection = sqlite3.connect(path, timeout=args.busy_timeout_ms / 1000.0, isolation_level=None)
+    counter = 0
+    try:
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                connection.execute("BEGIN IMMEDIATE")
+                connection.executemany(
+                    "INSERT INTO synonyms (word, synonym) VALUES (?, ?)",
+                    [(f'bench{counter}x{i}', 'bench') for i in range(args.write_rows)]
+                )
+                connection.execute("DELETE FROM synonyms WHERE synonym = 'bench'")
+                connection.execute("COMMIT")
+                stats["commits"] += 1
+                stats["commit_seconds"].append(time.perf_counter() - start)
+            except sqlite3.OperationalError as e:
+                if connection.in_transaction:
+                    connection.execute("ROLLBACK")
+                stats["errors"] += 1
+                stats["last_error"] = str(e)
+            counter += 1
+            stop.wait(args.write_pause_ms / 1000.0)
+    finally:
+        connection.close()
+
+
+def loader_error(result):
+    """As funções de carga devolvem o erro no próprio resultado em vez de lançá-lo."""
+    if result is None:
+        return 'assinatura indisponível'
+    if isinstance(result, dict) and 'error' in result:
+        return result['error']
+    if hasattr(result, 'columns') and 'error' in result.columns:
+        return str(result['error'].iloc[0])
+    return None
+
+
+def reader(stop, samples, errors, index):
+    i = index
+    while not stop.is_set():
+        loader = LOADERS[i % len(LOADERS)]
+        start = time.perf_counter()
+        try:
+            error = loader_error(loader())
+        except Exception as e:
+            error = str(e)
+        if error is None:
+            samples.append(time.perf_counter() - start)
+        else:
+            errors.append(error)
+        i += 1
+
+
+def run_scenario(args, path, with_writer):
+    stop = threading.Event()
+    samples_per_thread = [[] for _ in range(args.readers)]
+    errors_per_thread = [[] for _ in range(args.readers)]
+    writer_stats = {"commits": 0, "errors": 0, "commit_seconds": [], "last_error": None}
+
+    threads = [
+        threading.Thread(target=reader, args=(stop, samples_per_thread[i], errors_per_thread[i], i), daemon=True)
+        for i in range(args.readers)
+    ]
+    if with_writer:
+        threads.append(threading.Thread(target=writer, args=(path, stop, args, writer_stats), daemon=True))
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    samples = [sample for thread_samples in samples_per_thread for sample in thread_samples]
+    errors = [error for thread_errors in errors_per_thread for error in thread_errors]
+    result = {
+        "queries": len(samples),
+        "queries_per_second": len(samples) / elapsed,
+        "latency": percentiles(samples),
+        "errors": len(errors),
+        "error_sample": errors[0] if errors else None,
+    }
+    if with_writer:
+        result["writer"] = {
+            "commits": writer_stats["commits"],
+            "errors": writer_stats["errors"],
+            "commit_latency": percentiles(writer_stats["commit_seconds"]),
+            "last_error": writer_stats["last_error"],
+        }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readers', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=5.0, help='Duração de cada cenário')
+    parser.add_argument('--modes', nargs='+', choices=['session', 'connect', 'pool'], default=['session', 'connect', 'pool'])
+    parser.add_argument('--journals', nargs='+', choices=['delete', 'wal'], default=['delete', 'wal'])
+    parser.add_argument('--pool-size', type=int, default=8)
+    parser.add_argument('--busy-timeout-ms', type=int, default=5000)
+    parser.add_argument('--write-rows', type=int, default=5000, help='Inserções por transação do gravador')
+    parser.add_argument('--write-pause-ms', type=float, default=20.0)
+    parser.add_argument('--questions', type=int, default=2000)
+    parser.add_argument('--synonyms', type=int, default=2000)
+    parser.add_argument('--workdir', default=None, help='Diretório de trabalho (padrão: temporário)')
+    parser.add_argument('--output', default=None, help='Arquivo JSON de saída')
+    args = parser.parse_args()
+
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix='bench_database_'))
+    os.makedirs(workdir, exist_ok=True)
+    path = os.path.join(workdir, 'data.db')
+    fixture = build_fixture_db(path, roots=4, actions=4, attributes=6, questions=args.questions, synonyms=args.synonyms)
+
+    results = {
+        "commit": git_commit(),
+        "loaders": [loader.__name__ for loader in LOADERS],
+        "readers": args.readers,
+        "seconds": args.seconds,
+        "fixture": {key: value for key, value in fixture.items() if key != 'samples'},
+        "scenarios": {},
+    }
+
+    production_reader = processing.read_pool
+    for journal in args.journals:
+        for mode in args.modes:
+            # O pool ativa o WAL por conta própria; aqui o modo do arquivo é fixado antes de cada cenário
+            set_journal_mode(path, journal)
+            try:
+                reader_for_mode = make_reader(mode, path, args, wal=journal == 'wal')
+            except ImportError as e:
+                print(f'{mode}: indisponível ({e})')
+                continue
+
+            # As funções de processing.py usam o read_pool do módulo; o modo só troca esse objeto
+            processing.read_pool = reader_for_mode
+            for with_writer in (False, True):
+                name = f'{mode}_{journal}' + ('_writer' if with_writer else '')
+                result = run_scenario(args, path, with_writer)
+                results["scenarios"][name] = result
+                latency = result["latency"] or {}
+                print(f'{name:<22} {result["queries_per_second"]:9.0f} consultas/s  '
+                      f'p50={latency.get("p50_ms", 0):.2f}ms  p99={latency.get("p99_ms", 0):.2f}ms  erros={result["errors"]}'
+                      + (f'  commits={result["writer"]["commits"]}' if with_writer else ''))
+
+            reader_for_mode.close()
+            processing.read_pool = production_reader
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
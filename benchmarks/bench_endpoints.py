@@ -0,0 +1,206 @@
+"""
+Benchmark ponta a ponta dos endpoints sobre um banco sintético.
+
+1. Gera um data.db sintético (benchmarks.fixtures) e uma árvore mod/ temporária.
+2. Treina modelos pequenos pelos próprios endpoints de treinamento (tempo de cada um).
+3. Mede latência (p50/p95/p99) e vazão de /chat/train/model/intention e /chat/train/domain/
+   pelo test client do Flask e por um servidor waitress real.
+
+O resultado (com o commit atual) vai para JSON, para comparar regressões entre commits.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_endpoints --questions 500 --iterations 300 --output endpoints.json
+    python -m benchmarks.bench_endpoints --workdir /tmp/bench --skip-training   # reaproveita modelos
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from benchmarks.fixtures import build_fixture_db
+
+# O benchmark muda o diretório de trabalho; o projeto precisa continuar importável pelo caminho absoluto
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+""" Configurações reduzidas para que o treinamento do benchmark seja rápido"""
+SMALL_TRAINING = {
+    'training.epochs': 1,
+    'processing.target_samples': 20,
+    'processing.max_variations': 1,
+    'serving.preload': False,
+    'serving.reload.poll_seconds': 0,
+}
+
+
+def percentiles(samples):
+    samples = np.asarray(samples) * 1000.0
+    return {
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p95_ms": float(np.percentile(samples, 95)),
+        "p99_ms": float(np.percentile(samples, 99)),
+        "mean_ms": float(samples.mean()),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def measure(send, messages, iterations, concurrency):
+    """Latência sequencial e vazão com `concurrency` clientes simultâneos."""
+    for message in messages[:5]:
+        send(message)  # Aquecimento
+
+    samples, errors = [], 0
+    for i in range(iterations):
+        start = time.perf_counter()
+        status = send(messages[i % len(messages)])
+        samples.append(time.perf_counter() - start)
+        errors += status != 200
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        statuses = list(executor.map(send, (messages[i % len(messages)] for i in range(iterations))))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "latency": percentiles(samples),
+        "throughput_rps": iterations / elapsed if elapsed else None,
+        "concurrency": concurrency,
+        "errors": errors + sum(1 for status in statuses if status != 200),
+    }
+
+
+def test_client_sender(app, path):
+    def send(message):
+        response = app.test_client().post(path, json={'message': message})
+        return response.status_code
+    return send
+
+
+def http_sender(base_url, path):
+    def send(message):
+        request = urllib.request.Request(
+            base_url + path, data=json.dumps({'message': message}).encode('utf-8'),
+            headers={'Content-Type': 'application/json'}, method='POST'
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+    return send
+
+
+def timed(call):
+    start = time.perf_counter()
+    response = call()
+    return {"seconds": time.perf_counter() - start, "status": response.status_code}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workdir', default=None, help='Diretório de trabalho (padrão: temporário)')
+    parser.add_argument('--roots', type=int, default=2)
+    parser.add_argument('--actions', type=int, default=2)
+    parser.add_argument('--attributes', type=int, default=3)
+    parser.add_argument('--questions', type=int, default=500)
+    parser.add_argument('--synonyms', type=int, default=50)
+    parser.add_argument('--epochs', type=int, default=1)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--threads', type=int, default=8, help='Threads do waitress')
+    parser.add_argument('--skip-training', action='store_true')
+    parser.add_argument('--no-result-cache', action='store_true', help='Desliga o cache de resultados')
+    parser.add_argument('--output', default=None, help='Arquivo JSON de saída')
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output) if args.output else None
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix='bench_endpoints_'))
+    os.makedirs(os.path.join(workdir, 'mod', 'app', 'models', 'saved'), exist_ok=True)
+    fixture = build_fixture_db(
+        os.path.join(workdir, 'data.db'), args.roots, args.actions, args.attributes, args.questions, args.synonyms
+    )
+
+    # O app lê o banco de DATA_DB_PATH e grava os modelos em caminhos relativos (mod/...)
+    os.environ['DATA_DB_PATH'] = fixture['path']
+    os.chdir(workdir)
+
+    from config import conf_model
+    overrides = dict(SMALL_TRAINING, **{'training.epochs': args.epochs})
+    if args.no_result_cache:
+        overrides['serving.result_cache.enabled'] = False
+    for key, value in overrides.items():
+        conf_model.update(key, value)
+
+    from app import create_the_application
+    app = create_the_application()
+    client = app.test_client()
+
+    results = {
+        "commit": git_commit(),
+        "workdir": workdir,
+        "fixture": {key: value for key, value in fixture.items() if key != 'samples'},
+        "overrides": overrides,
+        "training": {},
+        "endpoints": {},
+    }
+
+    if not args.skip_training:
+        results["training"]["intention"] = timed(lambda: client.get('/api/v1/chat/train/model/intention?wait=true&force=true'))
+        results["training"]["core"] = timed(lambda: client.get('/api/v1/chat/train/core?wait=true&force=true'))
+        results["training"]["core_incremental"] = timed(lambda: client.get('/api/v1/chat/train/core?wait=true'))
+        results["training"]["object"] = timed(
+            lambda: client.post('/api/v1/chat/train/?wait=true', json={'object': fixture['objects'][0]})
+        )
+        for name, run in results["training"].items():
+            print(f'treinamento {name:<16} {run["seconds"]:.1f}s  status={run["status"]}')
+
+    messages = fixture['samples']
+    paths = {'intention': '/api/v1/chat/train/model/intention', 'domain': '/api/v1/chat/train/domain/'}
+
+    """ Flask test client"""
+    for name, path in paths.items():
+        results["endpoints"][f'{name}_test_client'] = measure(
+            test_client_sender(app, path), messages, args.iterations, args.concurrency
+        )
+
+    """ Servidor waitress real"""
+    from waitress import create_server
+    server = create_server(app, host='127.0.0.1', port=0, threads=args.threads)
+    base_url = f'http://127.0.0.1:{server.effective_port}'
+    threading.Thread(target=server.run, name='bench-waitress', daemon=True).start()
+    try:
+        for name, path in paths.items():
+            results["endpoints"][f'{name}_waitress'] = measure(
+                http_sender(base_url, path), messages, args.iterations, args.concurrency
+            )
+    finally:
+        server.close()
+
+    for name, run in results["endpoints"].items():
+        print(f'{name:<24} p50={run["latency"]["p50_ms"]:.2f}ms  p99={run["latency"]["p99_ms"]:.2f}ms  '
+              f'{run["throughput_rps"]:.0f} req/s  erros={run["errors"]}')
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Compara a latência de model.predict com o caminho de inferência direta (InferenceModel).
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_inference --domain search/customer/buy --iterations 200
+"""
+import argparse
+import json
+import os
+import pickle
+import time
+import numpy as np
+from tensorflow.keras.models import load_model
+from app.core.classify.classify import _domain_files
+from app.core.classify.inference import InferenceModel
+
+
+def percentiles(samples):
+    samples = np.asarray(samples) * 1000.0
+    return {
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p95_ms": float(np.percentile(samples, 95)),
+        "p99_ms": float(np.percentile(samples, 99)),
+        "mean_ms": float(samples.mean()),
+    }
+
+
+def measure(predict, inputs, iterations, warmup=5):
+    for _ in range(warmup):
+        predict(inputs)
+
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        predict(inputs)
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--domain', default='search/customer/buy')
+    parser.add_argument('--message', default='qual o historico de compra do cliente')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--batch-sizes', default='1,8,32')
+    parser.add_argument('--output', default=None, help='Arquivo JSON de saída')
+    args = parser.parse_args()
+
+    # Mesmos arquivos que o atendimento carrega: a versão publicada em CURRENT (ou o layout antigo)
+    model_file, tokenizer_file, _ = _domain_files(args.domain)
+    with open(tokenizer_file, 'rb') as f:
+        tokenizer = pickle.load(f)
+
+    model = load_model(model_file)
+    direct = InferenceModel(model, tokenizer.config['max_length'])
+
+    results = {"domain": args.domain, "path": os.path.dirname(model_file), "iterations": args.iterations, "runs": []}
+    for batch_size in [int(size) for size in args.batch_sizes.split(',')]:
+        inputs = tokenizer.transform([args.message] * batch_size)
+
+        predict_stats = measure(lambda x: model.predict(x, verbose=0), inputs, args.iterations)
+        direct_stats = measure(direct.predict, inputs, args.iterations)
+
+        results["runs"].append({
+            "batch_size": batch_size,
+            "predict": predict_stats,
+            "direct": direct_stats,
+            "speedup_p50": predict_stats["p50_ms"] / direct_stats["p50_ms"],
+        })
+        print(f'batch={batch_size:>4}  predict p50={predict_stats["p50_ms"]:.2f}ms  '
+              f'direct p50={direct_stats["p50_ms"]:.2f}ms  '
+              f'speedup={predict_stats["p50_ms"] / direct_stats["p50_ms"]:.1f}x')
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
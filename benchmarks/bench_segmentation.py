@@ -0,0 +1,120 @@
+"""
+Compara o split_message (regex) com a segmentação pelo senter do spaCy (nlp.pipe em lotes).
+
+Mede o tempo de carga do spaCy, a latência por mensagem, a vazão em lote e a qualidade
+(acerto exato sobre um conjunto rotulado e concordância entre os dois modos).
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_segmentation --iterations 200 --bulk-size 5000
+    python -m benchmarks.bench_segmentation --input mensagens.txt --output segmentation.json
+"""
+import argparse
+import json
+import time
+import numpy as np
+from app.api.v1.utils.split import split_message, split_messages
+from app.core.data.nlp import shared_spacy
+
+""" Mensagens com a segmentação correta, escrita à mão: um trecho por pedido, sem as conjunções que os ligam
+(vírgula ou ponto e vírgula no fim do trecho não contam, ver normalize_segments)"""
+LABELED = [
+    ("qual o saldo do cliente? e o limite do cartão", ["qual o saldo do cliente?", "o limite do cartão"]),
+    ("Quero ver as compras do cliente. Também quero o endereço.", ["Quero ver as compras do cliente.", "Também quero o endereço."]),
+    ("mostre o pedido e a nota fiscal", ["mostre o pedido", "a nota fiscal"]),
+    ("qual o valor do pedido, qual a data da entrega", ["qual o valor do pedido", "qual a data da entrega"]),
+    ("O Sr. Silva comprou ontem? Qual foi o valor?", ["O Sr. Silva comprou ontem?", "Qual foi o valor?"]),
+    ("preciso do relatório de vendas de jan. até mar.", ["preciso do relatório de vendas de jan. até mar."]),
+    ("qual o total de vendas ou o total de devoluções", ["qual o total de vendas", "o total de devoluções"]),
+    ("listar clientes ativos; listar clientes inativos", ["listar clientes ativos", "listar clientes inativos"]),
+    ("relatório de entradas e saídas do estoque", ["relatório de entradas e saídas do estoque"]),
+    ("consultar o saldo e também o limite", ["consultar o saldo", "o limite"]),
+    ("qual o prazo de entrega? qual a forma de pagamento?", ["qual o prazo de entrega?", "qual a forma de pagamento?"]),
+]
+
+
+def percentiles(samples):
+    samples = np.asarray(samples) * 1000.0
+    return {
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p95_ms": float(np.percentile(samples, 95)),
+        "p99_ms": float(np.percentile(samples, 99)),
+        "mean_ms": float(samples.mean()),
+    }
+
+
+def latency(segment, messages, iterations):
+    samples = []
+    for i in range(iterations):
+        message = messages[i % len(messages)]
+        start = time.perf_counter()
+        segment([message])
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+def throughput(segment, messages):
+    start = time.perf_counter()
+    segment(messages)
+    elapsed = time.perf_counter() - start
+    return {"messages": len(messages), "seconds": elapsed, "messages_per_second": len(messages) / elapsed if elapsed else None}
+
+
+def normalize_segments(segments):
+    """Remove vírgula e ponto e vírgula do fim de cada trecho; eles não mudam o pedido."""
+    return [segment.rstrip(' ,;') for segment in segments]
+
+
+def accuracy(segment):
+    predicted = segment([message for message, _ in LABELED])
+    hits = sum(1 for (_, expected), result in zip(LABELED, predicted) if normalize_segments(result) == expected)
+    return hits / len(LABELED)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--input', default=None, help='Arquivo texto com uma mensagem por linha')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--bulk-size', type=int, default=5000)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--output', default=None, help='Arquivo JSON de saída')
+    args = parser.parse_args()
+
+    messages = [message for message, _ in LABELED]
+    if args.input:
+        with open(args.input, 'r', encoding='utf-8') as f:
+            messages = [line.strip() for line in f if line.strip()]
+    bulk = (messages * (args.bulk_size // len(messages) + 1))[:args.bulk_size]
+
+    start = time.perf_counter()
+    shared_spacy.get()
+    load_seconds = time.perf_counter() - start
+
+    modes = {
+        "regex": lambda texts: [split_message(text) for text in texts],
+        "spacy": lambda texts: split_messages(texts, mode='spacy', batch_size=args.batch_size),
+    }
+
+    results = {"spacy_load_seconds": load_seconds, "spacy_pipeline": shared_spacy.get().pipe_names, "modes": {}}
+    for name, segment in modes.items():
+        segment(messages[:5])  # Aquecimento
+        results["modes"][name] = {
+            "latency": latency(segment, messages, args.iterations),
+            "bulk": throughput(segment, bulk),
+            "labeled_accuracy": accuracy(segment),
+        }
+        print(f'{name:>5}  p50={results["modes"][name]["latency"]["p50_ms"]:.3f}ms  '
+              f'bulk={results["modes"][name]["bulk"]["messages_per_second"]:.0f} msg/s  '
+              f'acerto={results["modes"][name]["labeled_accuracy"]:.0%}')
+
+    regex_result, spacy_result = modes["regex"](messages), modes["spacy"](messages)
+    results["agreement"] = sum(1 for a, b in zip(regex_result, spacy_result) if a == b) / len(messages)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
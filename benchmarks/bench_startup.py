@@ -0,0 +1,122 @@
+"""
+Mede o tempo de subida do servidor em processos novos.
+
+    create_app_seconds   -> importar o app e executar create_the_application()
+    listen_seconds       -> até o waitress aceitar conexões na porta
+    ready_seconds        -> até /api/v1/ready responder 200 (aquecimento concluído)
+
+Também registra quais pilhas pesadas já estavam importadas ao final do create_the_application().
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_startup --runs 5 --output startup.json
+"""
+import argparse
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+HEAVY_MODULES = ['tensorflow', 'keras', 'sklearn', 'spacy']
+
+CREATE_APP_SCRIPT = f"""
+import json, sys, time
+start = time.perf_counter()
+from app import create_the_application
+app = create_the_application()
+elapsed = time.perf_counter() - start
+print(json.dumps({{"create_app_seconds": elapsed, "heavy_modules": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+SERVE_SCRIPT = """
+import sys
+from waitress import serve
+from app import create_the_application
+serve(create_the_application(), host='127.0.0.1', port=int(sys.argv[1]))
+"""
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def measure_create_app():
+    output = subprocess.run([sys.executable, '-c', CREATE_APP_SCRIPT], capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def measure_serve(timeout):
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, '-c', SERVE_SCRIPT, str(port)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    listen_seconds = ready_seconds = None
+    try:
+        while time.perf_counter() - start < timeout and listen_seconds is None:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+                listen_seconds = time.perf_counter() - start
+            except OSError:
+                time.sleep(0.02)
+
+        while listen_seconds is not None and time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/api/v1/ready', timeout=1) as response:
+                    if response.status == 200:
+                        ready_seconds = time.perf_counter() - start
+                        break
+            except (urllib.error.URLError, OSError):
+                pass
+            time.sleep(0.1)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+    return {"listen_seconds": listen_seconds, "ready_seconds": ready_seconds}
+
+
+def summarize(values):
+    values = [value for value in values if value is not None]
+    if not values:
+        return None
+    return {"median": statistics.median(values), "min": min(values), "max": max(values)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--timeout', type=float, default=300.0, help='Tempo máximo de espera por execução')
+    parser.add_argument('--output', default=None, help='Arquivo JSON de saída')
+    args = parser.parse_args()
+
+    runs = []
+    for run in range(args.runs):
+        result = measure_create_app()
+        result.update(measure_serve(args.timeout))
+        runs.append(result)
+        print(f'run {run + 1}: create_app={result["create_app_seconds"]:.2f}s  '
+              f'listen={result["listen_seconds"]}  ready={result["ready_seconds"]}  '
+              f'heavy={result["heavy_modules"]}')
+
+    results = {
+        "runs": runs,
+        "create_app_seconds": summarize([run["create_app_seconds"] for run in runs]),
+        "listen_seconds": summarize([run["listen_seconds"] for run in runs]),
+        "ready_seconds": summarize([run["ready_seconds"] for run in runs]),
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
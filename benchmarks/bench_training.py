@@ -0,0 +1,358 @@
+"""
+Benchmark de vazão do treinamento, etapa por etapa, sobre bancos sintéticos de tamanhos crescentes.
+
+Pipelines medidos:
+
+    object          -> TrainingPipeline (questões de um único objeto)
+    core            -> TrainingManangerPipeline (todas as questões)
+    intention       -> TrainingIntentionPipeline (Keras)
+    intention_sgd   -> TrainingIntentionManangerPipeline (TF-IDF + SGD)
+
+Etapas: db_load, balancing (performing_data_balancing*), augmentation (expand_dataset),
+cleaning (TextCleaner.clean_many), tokenization, fit e cross_validation. Cada etapa registra
+linhas de entrada, tempo de parede, linhas/s e pico de RSS. Etapas que um pipeline não possui
+(cross_validation nos pipelines de intenção) não aparecem no resultado; no intention_sgd a
+tokenização é o TfidfVectorizer isolado, e o fit mede o train_model completo (que vetoriza de novo).
+
+Cada tamanho roda em um processo separado, com banco e diretório próprios, para que o pico de RSS
+de um tamanho não contamine o seguinte. O cache de datasets fica desligado.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_training --sizes 1000 10000 100000 --output training.json
+    python -m benchmarks.bench_training --sizes 100000 --pipelines core --skip-fit
+"""
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from benchmarks.fixtures import build_fixture_db
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# O worker muda o diretório de trabalho; o projeto precisa continuar importável pelo caminho absoluto
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+PIPELINES = ['object', 'core', 'intention', 'intention_sgd']
+MODEL_STAGES = ['fit', 'cross_validation']
+MB = 1024.0 * 1024.0
+
+
+def peak_rss():
+    """Pico de RSS do processo desde o início, em bytes."""
+    if resource is None:
+        return 0
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage if sys.platform == 'darwin' else usage * 1024
+
+
+def current_rss():
+    """RSS atual em bytes (Linux); nas demais plataformas cai para o pico do processo."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return peak_rss()
+
+
+class StageRecorder:
+    """
+    Acumula tempo, linhas e pico de RSS por etapa. O pico é amostrado por uma thread enquanto a
+    etapa roda, porque o ru_maxrss do processo só cresce e não isola a etapa.
+    """
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.stages = OrderedDict()
+
+    @contextmanager
+    def stage(self, name, rows=0):
+        stat = {"rows": rows}
+        peak = [current_rss()]
+        start_rss = peak[0]
+        stop = threading.Event()
+
+        def sample():
+            while not stop.wait(self.interval):
+                peak[0] = max(peak[0], current_rss())
+
+        sampler = threading.Thread(target=sample, name=f'rss-{name}', daemon=True)
+        sampler.start()
+        start = time.perf_counter()
+        try:
+            yield stat
+        finally:
+            elapsed = time.perf_counter() - start
+            stop.set()
+            sampler.join()
+            peak[0] = max(peak[0], current_rss())
+
+            entry = self.stages.setdefault(name, {"rows": 0, "seconds": 0.0, "calls": 0, "peak_rss_mb": 0.0, "rss_delta_mb": 0.0})
+            entry["rows"] += stat["rows"]
+            entry["seconds"] += elapsed
+            entry["calls"] += 1
+            entry["peak_rss_mb"] = max(entry["peak_rss_mb"], peak[0] / MB)
+            entry["rss_delta_mb"] = max(entry["rss_delta_mb"], (peak[0] - start_rss) / MB)
+
+    def to_dict(self):
+        stages = OrderedDict()
+        for name, entry in self.stages.items():
+            stages[name] = dict(entry, rows_per_second=entry["rows"] / entry["seconds"] if entry["seconds"] else None)
+        return stages
+
+
+def auto_target(df, column, target_samples):
+    """Sem alvo explícito, balanceia para manter aproximadamente o número de linhas de entrada."""
+    if target_samples:
+        return target_samples
+    return max(1, math.ceil(len(df) / max(df[column].nunique(), 1)))
+
+
+def preprocess(recorder, df, label_column, balance, augmenter, config, target_samples):
+    """Etapas comuns: balanceamento, expansão e limpeza."""
+    from app.core.data.cleaner import TextCleaner
+
+    with recorder.stage('balancing', len(df)):
+        df = balance(df, auto_target(df, label_column, target_samples))
+
+    with recorder.stage('augmentation', len(df)):
+        df = augmenter.expand_dataset(df)
+
+    with recorder.stage('cleaning', len(df)):
+        cleaner = TextCleaner(config['processing']['cleaning'])
+        df['question'] = cleaner.clean_many(df['question'])
+    return df
+
+
+def bench_domain(recorder, pipeline, load, args):
+    """TrainingPipeline / TrainingManangerPipeline: pré-processamento único e treino por domain_address."""
+    from app.core.data.augmentation import DataAugmenter
+    from app.core.data.balancing import performing_data_balancing
+
+    with recorder.stage('db_load') as stat:
+        df = load()
+        stat["rows"] = len(df)
+
+    augmenter = DataAugmenter(max_variations_per_question=pipeline.config['processing']['max_variations'])
+    df = preprocess(recorder, df, 'domain_name', performing_data_balancing, augmenter, pipeline.config, args.target_samples)
+
+    domain_addresses = list(df['domain_address'].drop_duplicates())[:args.domains or None]
+    for domain_address in domain_addresses:
+        rows = int((df['domain_address'] == domain_address).sum())
+        with recorder.stage('tokenization', rows):
+            X, y = pipeline.encode_training_data(df, domain_address)
+        if args.skip_fit:
+            continue
+        with recorder.stage('fit', rows):
+            name, path = pipeline.train_model(X, y, domain_address)
+        with recorder.stage('cross_validation', rows):
+            pipeline.cross_validate(X, y, name, path)
+    return {"domain_addresses": len(domain_addresses)}
+
+
+def bench_intention(recorder, pipeline, args):
+    from app.core.data.augmentation import DataAugmenterIntention
+    from app.core.data.balancing import performing_data_balancing_intention
+    from app.database.processing import loads_entity_questions_training
+
+    with recorder.stage('db_load') as stat:
+        df = loads_entity_questions_training()
+        stat["rows"] = len(df)
+
+    df = preprocess(
+        recorder, df, 'intention', performing_data_balancing_intention, DataAugmenterIntention(), pipeline.config,
+        args.target_samples
+    )
+
+    with recorder.stage('tokenization', len(df)):
+        encoded = pipeline.encode_training_data(df)
+    if not args.skip_fit:
+        with recorder.stage('fit', len(df)):
+            pipeline.train_model(*encoded)
+    return {}
+
+
+def bench_intention_sgd(recorder, pipeline, args):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from app.core.data.augmentation import DataAugmenterIntention
+    from app.core.data.balancing import performing_data_balancing_intention
+    from app.database.processing import loads_entity_questions_training
+
+    with recorder.stage('db_load') as stat:
+        df = loads_entity_questions_training()[['question', 'intention']]
+        stat["rows"] = len(df)
+
+    df = preprocess(
+        recorder, df, 'intention', performing_data_balancing_intention, DataAugmenterIntention(), pipeline.config,
+        args.target_samples
+    )
+
+    with recorder.stage('tokenization', len(df)):
+        TfidfVectorizer(max_features=10000).fit_transform(df['question'])
+    if not args.skip_fit:
+        with recorder.stage('fit', len(df)):
+            pipeline.train_model(df)
+    return {}
+
+
+def run_worker(args):
+    """Roda um único tamanho neste processo e grava o resultado em args.result."""
+    workdir = os.path.abspath(args.workdir)
+    os.makedirs(os.path.join(workdir, 'mod', 'app', 'models', 'saved'), exist_ok=True)
+
+    start = time.perf_counter()
+    fixture = build_fixture_db(
+        os.path.join(workdir, 'data.db'), args.roots, args.actions, args.attributes, args.single, args.synonyms
+    )
+    fixture_seconds = time.perf_counter() - start
+
+    # O app lê o banco de DATA_DB_PATH e grava os modelos em caminhos relativos (mod/...)
+    os.environ['DATA_DB_PATH'] = fixture['path']
+    os.chdir(workdir)
+
+    from config import conf_model
+    overrides = {
+        'training.epochs': args.epochs,
+        'training_cache.enabled': False,
+        'serving.preload': False,
+    }
+    for key, value in overrides.items():
+        conf_model.update(key, value)
+
+    from app import create_the_application
+    app = create_the_application()
+
+    from app.core.trainer.train import TrainingPipeline
+    from app.core.trainer.train_intention import TrainingIntentionPipeline
+    from app.core.trainer.training import TrainingIntentionManangerPipeline, TrainingManangerPipeline
+    from app.database.processing import loads_questions, loads_questions_all
+
+    runners = {
+        'object': lambda recorder: bench_domain(recorder, TrainingPipeline(), lambda: loads_questions(fixture['objects'][0]), args),
+        'core': lambda recorder: bench_domain(recorder, TrainingManangerPipeline(), loads_questions_all, args),
+        'intention': lambda recorder: bench_intention(recorder, TrainingIntentionPipeline(), args),
+        'intention_sgd': lambda recorder: bench_intention_sgd(recorder, TrainingIntentionManangerPipeline(), args),
+    }
+
+    results = OrderedDict()
+    with app.app_context():
+        for name in args.pipelines:
+            recorder = StageRecorder()
+            start = time.perf_counter()
+            error = None
+            try:
+                details = runners[name](recorder)
+            except Exception as e:
+                details = {}
+                error = f'{type(e).__name__}: {e}'
+                print(f'Erro no pipeline {name}: {error}')
+
+            stages = recorder.to_dict()
+            results[name] = dict(
+                details,
+                wall_seconds=time.perf_counter() - start,
+                preprocessing_seconds=sum(s["seconds"] for stage, s in stages.items() if stage not in MODEL_STAGES),
+                model_seconds=sum(s["seconds"] for stage, s in stages.items() if stage in MODEL_STAGES),
+                error=error,
+                stages=stages,
+            )
+
+    with open(args.result, 'w') as f:
+        json.dump({
+            "rows": args.single,
+            "fixture_seconds": fixture_seconds,
+            "fixture": {key: value for key, value in fixture.items() if key != 'samples'},
+            "overrides": overrides,
+            "process_peak_rss_mb": peak_rss() / MB,
+            "pipelines": results,
+        }, f, indent=2)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def worker_command(args, size, workdir, result):
+    command = [
+        sys.executable, '-m', 'benchmarks.bench_training', '--single', str(size), '--workdir', workdir, '--result', result,
+        '--roots', str(args.roots), '--actions', str(args.actions), '--attributes', str(args.attributes),
+        '--synonyms', str(args.synonyms), '--epochs', str(args.epochs), '--domains', str(args.domains),
+        '--pipelines', *args.pipelines,
+    ]
+    if args.target_samples:
+        command += ['--target-samples', str(args.target_samples)]
+    if args.skip_fit:
+        command.append('--skip-fit')
+    return command
+
+
+def print_summary(size, run):
+    print(f'\n== {size} linhas (pico do processo {run["process_peak_rss_mb"]:.0f} MB)')
+    for name, pipeline in run["pipelines"].items():
+        print(f'{name:<14} total={pipeline["wall_seconds"]:.1f}s  pré-processamento={pipeline["preprocessing_seconds"]:.1f}s  '
+              f'modelo={pipeline["model_seconds"]:.1f}s' + (f'  ERRO: {pipeline["error"]}' if pipeline["error"] else ''))
+        for stage, stat in pipeline["stages"].items():
+            rate = f'{stat["rows_per_second"]:.0f} linhas/s' if stat["rows_per_second"] else '-'
+            print(f'    {stage:<17} {stat["rows"]:>9} linhas  {stat["seconds"]:8.2f}s  {rate:>18}  '
+                  f'pico={stat["peak_rss_mb"]:.0f} MB')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help='Quantidade de questões')
+    parser.add_argument('--pipelines', nargs='+', choices=PIPELINES, default=PIPELINES)
+    parser.add_argument('--roots', type=int, default=2)
+    parser.add_argument('--actions', type=int, default=2)
+    parser.add_argument('--attributes', type=int, default=3)
+    parser.add_argument('--synonyms', type=int, default=50)
+    parser.add_argument('--epochs', type=int, default=1)
+    parser.add_argument('--domains', type=int, default=0, help='Limita os domain_address treinados (0 = todos)')
+    parser.add_argument('--target-samples', type=int, default=None,
+                        help='Alvo do balanceamento (padrão: mantém o número de linhas de entrada)')
+    parser.add_argument('--skip-fit', action='store_true', help='Mede apenas o pré-processamento e a tokenização')
+    parser.add_argument('--workdir', default=None, help='Diretório de trabalho (padrão: temporário)')
+    parser.add_argument('--output', default=None, help='Arquivo JSON de saída')
+    parser.add_argument('--single', type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--result', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single is not None:
+        run_worker(args)
+        return
+
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix='bench_training_'))
+    results = {"commit": git_commit(), "workdir": workdir, "sizes": OrderedDict()}
+    for size in args.sizes:
+        size_dir = os.path.join(workdir, f'rows_{size}')
+        result = os.path.join(workdir, f'rows_{size}.json')
+        completed = subprocess.run(worker_command(args, size, size_dir, result), cwd=ROOT)
+        if completed.returncode != 0 or not os.path.exists(result):
+            results["sizes"][str(size)] = {"error": f'worker terminou com código {completed.returncode}'}
+            continue
+        with open(result) as f:
+            results["sizes"][str(size)] = json.load(f)
+        print_summary(size, results["sizes"][str(size)])
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
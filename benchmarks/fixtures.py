@@ -0,0 +1,133 @@
+"""
+Banco sintético com o mesmo esquema do data.db, para benchmarks reproduzíveis.
+
+O grafo gerado segue as regras do projeto:
+
+    raiz (peso 0)  <-  ação (peso 1)  <-  atributo (peso 2)
+
+e cada pergunta recebe o domain_address que o endpoint de domínio resolve para as suas
+entidades ('search' | 'doubt' + caminho das entidades de peso diferente de 2).
+"""
+import json
+import os
+import random
+import sqlite3
+
+SCHEMA = [
+    "CREATE TABLE synonyms (id INTEGER PRIMARY KEY ASC ON CONFLICT ROLLBACK AUTOINCREMENT, word TEXT (255) NOT NULL, synonym TEXT (255) NOT NULL)",
+    "CREATE TABLE intentions (id INTEGER PRIMARY KEY ASC ON CONFLICT ROLLBACK AUTOINCREMENT, intention TEXT (80) NOT NULL)",
+    "CREATE TABLE objects (id INTEGER PRIMARY KEY ASC ON CONFLICT ROLLBACK AUTOINCREMENT, object TEXT (80) NOT NULL)",
+    "CREATE TABLE weights (id INTEGER PRIMARY KEY ASC ON CONFLICT ROLLBACK AUTOINCREMENT, weight INTEGER NOT NULL)",
+    "CREATE TABLE entities (id INTEGER PRIMARY KEY ASC ON CONFLICT ROLLBACK AUTOINCREMENT, entity TEXT (255) NOT NULL UNIQUE, translation TEXT (255) UNIQUE NOT NULL, word TEXT (255))",
+    "CREATE TABLE relations (id INTEGER PRIMARY KEY ASC ON CONFLICT ROLLBACK AUTOINCREMENT, entity_id INTEGER REFERENCES entities (id) NOT NULL, weight_id INTEGER REFERENCES weights (id) NOT NULL, parent_id INTEGER REFERENCES entities (id))",
+    "CREATE TABLE questions (id INTEGER PRIMARY KEY ASC ON CONFLICT ROLLBACK AUTOINCREMENT, question TEXT (500) NOT NULL, intention_id INTEGER (80) REFERENCES intentions (id), object_id REFERENCES objects (id), entities TEXT (4000) NOT NULL, domain_address TEXT (255), domain_name)",
+]
+
+INTENTIONS = {'BUSCAR_DADO': 'search', 'DUVIDA': 'doubt'}
+
+TEMPLATES = {
+    'BUSCAR_DADO': [
+        "qual o {attribute} de {action} do {root}",
+        "mostre o {attribute} da {action} do {root}",
+        "preciso do {attribute} de {action} do {root}",
+        "quero ver o {attribute} de {action} desse {root}",
+    ],
+    'DUVIDA': [
+        "como vejo o {attribute} de {action} do {root}",
+        "onde encontro o {attribute} da {action} do {root}",
+        "como funciona o {attribute} de {action} do {root}",
+    ],
+}
+
+
+def build_fixture_db(path, roots=2, actions=2, attributes=3, questions=500, synonyms=50, seed=42):
+    """
+    Cria o banco em `path` (sobrescrevendo) e retorna um resumo com as mensagens de exemplo.
+
+    :param roots: Entidades raiz (uma por objeto).
+    :param actions: Ações por raiz.
+    :param attributes: Atributos por ação.
+    :param questions: Quantidade aproximada de perguntas.
+    :param synonyms: Quantidade de sinônimos.
+    """
+    rng = random.Random(seed)
+    if os.path.exists(path):
+        os.remove(path)
+
+    connection = sqlite3.connect(path)
+    cursor = connection.cursor()
+    for statement in SCHEMA:
+        cursor.execute(statement)
+
+    cursor.executemany("INSERT INTO intentions (intention) VALUES (?)", [(name,) for name in INTENTIONS])
+    cursor.executemany("INSERT INTO weights (weight) VALUES (?)", [(0,), (1,), (2,)])
+    weight_ids = {0: 1, 1: 2, 2: 3}
+
+    def add_entity(entity, translation):
+        cursor.execute("INSERT INTO entities (entity, translation, word) VALUES (?, ?, ?)", (entity, translation, translation.capitalize()))
+        return cursor.lastrowid
+
+    def add_relation(entity_id, weight, parent_id):
+        cursor.execute("INSERT INTO relations (entity_id, weight_id, parent_id) VALUES (?, ?, ?)", (entity_id, weight_ids[weight], parent_id))
+
+    """ Grafo: raiz <- ação <- atributo"""
+    combinations = []
+    for r in range(roots):
+        root = (f'root{r}', f'raiz{r}')
+        cursor.execute("INSERT INTO objects (object) VALUES (?)", (root[1],))
+        object_id = cursor.lastrowid
+        root_id = add_entity(*root)
+        add_relation(root_id, 0, None)
+
+        for a in range(actions):
+            action = (f'action{r}x{a}', f'acao{r}x{a}')
+            action_id = add_entity(*action)
+            add_relation(action_id, 1, root_id)
+
+            for t in range(attributes):
+                attribute = (f'attribute{r}x{a}x{t}', f'atributo{r}x{a}x{t}')
+                attribute_id = add_entity(*attribute)
+                add_relation(attribute_id, 2, action_id)
+                combinations.append((object_id, root, action, attribute))
+
+    """ Perguntas distribuídas entre as combinações e as intenções"""
+    rows = []
+    samples = []
+    intention_ids = {name: index + 1 for index, name in enumerate(INTENTIONS)}
+    for index in range(questions):
+        object_id, root, action, attribute = combinations[index % len(combinations)]
+        intention = rng.choice(list(INTENTIONS))
+        question = rng.choice(TEMPLATES[intention]).format(root=root[1], action=action[1], attribute=attribute[1])
+        domain_address = f'{INTENTIONS[intention]}/{root[0]}/{action[0]}'
+        rows.append((
+            question,
+            intention_ids[intention],
+            object_id,
+            json.dumps([attribute[1], action[1], root[1]], separators=(',', ':')),
+            domain_address,
+            f"{domain_address.replace('/', '_')}_{attribute[0]}"
+        ))
+        samples.append(question)
+    cursor.executemany(
+        "INSERT INTO questions (question, intention_id, object_id, entities, domain_address, domain_name) VALUES (?, ?, ?, ?, ?, ?)",
+        rows
+    )
+
+    """ Sinônimos: variações das ações e raízes"""
+    words = [translation for _, root, action, _ in combinations for translation in (root[1], action[1])]
+    cursor.executemany(
+        "INSERT INTO synonyms (word, synonym) VALUES (?, ?)",
+        [(f'{words[i % len(words)]}v{i}', words[i % len(words)]) for i in range(synonyms)]
+    )
+
+    connection.commit()
+    connection.close()
+
+    return {
+        "path": path,
+        "objects": sorted({root[1] for _, root, _, _ in combinations}),
+        "entities": roots * (1 + actions * (1 + attributes)),
+        "questions": questions,
+        "synonyms": synonyms,
+        "samples": samples,
+    }
@@ -1,6 +1,8 @@
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import logging
 import configparser
+import queue
+import atexit
 from typing import Dict
 import yaml
 import sys
@@ -18,6 +20,9 @@ class ConfigManager:
         self.url_base = "http://+:2710/ia"
         self.debug_file_level = '0'
         self.debug_file = None
+        self.debug_async = '1'
+        self.debug_queue_size = 10000
+        self.debug_drop_policy = 'new'
         self.environment = None
         
         """Configurações de conexão com o banco de dados Oracle"""
@@ -84,6 +89,15 @@ class ConfigManager:
                 self.debug_file = self._replace_app_path(
                     config.get('Debug', 'DebugFile')
                 )
+
+            if config.has_option('Debug', 'DebugAsync'):
+                self.debug_async = config.get('Debug', 'DebugAsync')
+
+            if config.has_option('Debug', 'DebugQueueSize'):
+                self.debug_queue_size = config.getint('Debug', 'DebugQueueSize')
+
+            if config.has_option('Debug', 'DebugDropPolicy'):
+                self.debug_drop_policy = config.get('Debug', 'DebugDropPolicy')
             
             if config.has_option('Ambiente', 'Ambiente'):
                 self.environment = config.get('Ambiente', 'Ambiente')
@@ -158,6 +172,9 @@ class ConfigManager:
             f"  URL Base: {self.url_base}\n"
             f"  Debug File Level: {self.debug_file_level}\n"
             f"  Debug File: {self.debug_file}\n"
+            f"  Debug Async: {self.debug_async}\n"
+            f"  Debug Queue Size: {self.debug_queue_size}\n"
+            f"  Debug Drop Policy: {self.debug_drop_policy}\n"
             f"  DB Server: {self.db_server}\n"
             f"  DB Username: {self.db_username}\n"
             f"  DB Password: {self.db_password}\n"
@@ -193,7 +210,10 @@ class ConfigManager:
             raise ValueError("As configurações de log não foram carregadas corretamente.")
         return {
             "debug_file_level": self.debug_file_level,
-            "debug_file": self.debug_file
+            "debug_file": self.debug_file,
+            "debug_async": self.debug_async,
+            "debug_queue_size": self.debug_queue_size,
+            "debug_drop_policy": self.debug_drop_policy
         }
     
     def get_env_config(self):
@@ -280,11 +300,73 @@ class ConfigManagerModelTraining:
         self.config = new_config
         self.save_config()
 
+class BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler com fila limitada: a thread que registra apenas enfileira o registro, e a
+    formatação e a escrita ficam com a thread do QueueListener.
+
+    Com a fila cheia, a política define o que acontece:
+        new   -> descarta o registro novo (padrão, nunca bloqueia)
+        old   -> descarta o registro mais antigo da fila para dar lugar ao novo
+        block -> aguarda espaço na fila (não perde registros, mas pode bloquear)
+    """
+
+    DROP_POLICIES = ('new', 'old', 'block')
+
+    def __init__(self, log_queue, drop_policy='new'):
+        super().__init__(log_queue)
+        self.drop_policy = drop_policy
+
+        """Contadores (atualizados dentro do lock do próprio handler, que envolve o emit)"""
+        self.enqueued = 0
+        self.dropped = 0
+
+    def prepare(self, record):
+        """Resolve apenas a mensagem (args podem mudar depois); a formatação completa fica com o listener."""
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if self.drop_policy == 'block':
+                self.queue.put(record)
+            elif self.drop_policy == 'old':
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+                try:
+                    self.queue.put_nowait(record)
+                except queue.Full:
+                    self.dropped += 1
+                    return
+            else:
+                self.dropped += 1
+                return
+        self.enqueued += 1
+
+
+class DrainingQueueListener(QueueListener):
+    """QueueListener que, ao parar, aguarda espaço na fila limitada em vez de falhar com a fila cheia."""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
 class LogManager:
     def __init__(self, conf):
         log_config = conf.get_log_config()
         self.debug_file_level = log_config['debug_file_level']
         self.debug_file = log_config['debug_file']
+        self.debug_async = log_config.get('debug_async', '0')
+        self.debug_queue_size = log_config.get('debug_queue_size', 10000)
+        self.debug_drop_policy = log_config.get('debug_drop_policy', 'new')
+        self.queue_handler = None
+        self.listener = None
         self._validate_config()
         self._setup_logging()
 
@@ -294,6 +376,12 @@ class LogManager:
             raise ValueError("Nível de log inválido: debug_file_level deve ser '0', '1' ou '2'")
         if not isinstance(self.debug_file, str) or not self.debug_file.strip():
             raise ValueError("Caminho do arquivo de log inválido")
+        if self.debug_async not in ['0', '1']:
+            raise ValueError("Modo de log inválido: debug_async deve ser '0' ou '1'")
+        if self.debug_drop_policy not in BoundedQueueHandler.DROP_POLICIES:
+            raise ValueError(f"Política de descarte inválida: debug_drop_policy deve ser uma de {BoundedQueueHandler.DROP_POLICIES}")
+        if not isinstance(self.debug_queue_size, int) or self.debug_queue_size <= 0:
+            raise ValueError("Tamanho da fila de log inválido: debug_queue_size deve ser um inteiro positivo")
 
     def _ensure_log_directory(self):
         """Garante que o diretório de logs exista, criando-o se necessário."""
@@ -330,13 +418,43 @@ class LogManager:
         )
         rotating_handler.setLevel(self._get_handler_level())
         rotating_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
-        logging.getLogger().addHandler(rotating_handler)
 
         # Adiciona um handler para o console
         console_handler = logging.StreamHandler()
         console_handler.setLevel(self._get_handler_level())
         console_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-        logging.getLogger().addHandler(console_handler)
+
+        if self.debug_async == '0':
+            logging.getLogger().addHandler(rotating_handler)
+            logging.getLogger().addHandler(console_handler)
+            return
+
+        # Modo assíncrono: as threads das requisições só enfileiram; uma thread formata, grava e rotaciona
+        self.queue_handler = BoundedQueueHandler(queue.Queue(self.debug_queue_size), self.debug_drop_policy)
+        self.queue_handler.setLevel(self._get_handler_level())
+        logging.getLogger().addHandler(self.queue_handler)
+
+        self.listener = DrainingQueueListener(self.queue_handler.queue, rotating_handler, console_handler, respect_handler_level=True)
+        self.listener.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Grava os registros pendentes e encerra a thread de escrita (chamado na saída do processo)."""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def stats(self):
+        """Contadores do modo assíncrono (vazio no modo síncrono)."""
+        if self.queue_handler is None:
+            return {}
+        return {
+            "queue_size": self.queue_handler.queue.qsize(),
+            "queue_capacity": self.debug_queue_size,
+            "drop_policy": self.debug_drop_policy,
+            "enqueued": self.queue_handler.enqueued,
+            "dropped": self.queue_handler.dropped,
+        }
 
     def log(self, log_type="INFO", description=""):
         """Registra mensagens de log."""
@@ -1,3 +1,4 @@
+import multiprocessing
 from waitress import serve
 from app import create_the_application
 from config import loger, conf
@@ -22,4 +23,6 @@ def start_the_application():
         
 
 if __name__ == '__main__':
+    """Necessário para o treinamento paralelo em processos no executável (Windows)"""
+    multiprocessing.freeze_support()
     start_the_application()
\ No newline at end of file